@@ -0,0 +1,91 @@
+# Loads every image the game uses when the app starts, so no image has to be decoded in the middle of a game. The
+# images are packed into a kivy atlas by build_atlas.py. Sprites refer to the images in the atlas by index (see
+# TextureBank.index) instead of by file path.
+
+# import glob and os to find the images left out of the atlas, and time to measure how long each image takes to load
+import glob
+import os
+import time
+
+# import the atlas, the image cache, the image loader, and the logger from kivy
+from kivy.atlas import Atlas
+from kivy.cache import Cache
+from kivy.core.image import Image as CoreImage
+from kivy.logger import Logger
+
+# the atlas made by build_atlas.py, without the .atlas extension. This is also how image sources refer to it:
+# "atlas://Assets/atlas/popper_pig/<image name>"
+ATLAS_BASENAME = "Assets/atlas/popper_pig"
+# the folder holding the game's images. Every image in it that build_atlas.py left out of the atlas (because it is too
+# large for an atlas page) is loaded on its own.
+ASSETS_FOLDER = "Assets"
+
+
+# every texture of the game, loaded and uploaded once
+class TextureBank:
+    def __init__(self, atlas_basename=ATLAS_BASENAME, assets_folder=ASSETS_FOLDER):
+        self.atlas_basename = atlas_basename
+        self.assets_folder = assets_folder
+        # the file paths of the images that aren't in the atlas, found once the atlas is loaded
+        self.standalone_images = []
+        self.atlas = None
+        # the name of every image in the atlas. The position of a name in this list is the image's index.
+        self.region_ids = []
+        # the u0, v0, u1, v1 part of the atlas texture each image takes up, by index
+        self.regions = []
+        # the textures of the images loaded on their own, by file path
+        self.textures = {}
+        # one (name, milliseconds to decode and upload, bytes of texture memory) entry per file that was loaded
+        self.report = []
+
+    # the atlas page texture every sprite is drawn from
+    @property
+    def texture(self):
+        return self.atlas.original_textures[0]
+
+    # the index of an image in the atlas. name is the image's file name without ".png".
+    def index(self, name):
+        return self.region_ids.index(name)
+
+    # decodes every image and uploads it to the graphics card
+    def load(self):
+        # load the atlas. Every page image is decoded and uploaded here.
+        start = time.perf_counter()
+        self.atlas = Atlas(self.atlas_basename + ".atlas")
+        milliseconds = (time.perf_counter() - start) * 1000
+        # kivy looks up "atlas://" sources in this cache, so image sources use the atlas loaded here instead of loading it
+        # again
+        Cache.append("kv.atlas", self.atlas_basename, self.atlas)
+        for page in self.atlas.original_textures:
+            # the time is for every page together since the atlas loads them all at once
+            self.report.append((self.atlas_basename + ".atlas page", milliseconds, page.width * page.height * 4))
+        # number the images in the atlas
+        for name in sorted(self.atlas.textures):
+            region = self.atlas.textures[name]
+            self.region_ids.append(name)
+            self.regions.append((region.uvpos[0], region.uvpos[1], region.uvpos[0] + region.uvsize[0],
+                                 region.uvpos[1] + region.uvsize[1]))
+        # every sprite is drawn from the first page, so all of their images have to be on it
+        if len(self.atlas.original_textures) > 1:
+            Logger.warning("Assets: the atlas has more than one page. Sprites only draw from the first page.")
+        # load the images that don't fit in the atlas. They are the images in the assets folder the atlas has no name
+        # for, so an image that grows too large for a page is loaded on its own once the atlas is built again.
+        self.standalone_images = sorted(source for source in glob.glob(os.path.join(self.assets_folder, "*.png"))
+                                        if os.path.splitext(os.path.basename(source))[0] not in self.atlas.textures)
+        for source in self.standalone_images:
+            start = time.perf_counter()
+            texture = CoreImage(source).texture
+            milliseconds = (time.perf_counter() - start) * 1000
+            self.textures[source] = texture
+            self.report.append((source, milliseconds, texture.width * texture.height * 4))
+        self.log_report()
+
+    # writes how long each file took to decode and how much texture memory each image takes up to the log
+    def log_report(self):
+        for name, milliseconds, memory in self.report:
+            Logger.info("Assets: %s decoded in %.1f ms, %d KiB of texture memory" % (name, milliseconds,
+                                                                                      memory // 1024))
+        for name in self.region_ids:
+            width, height = self.atlas.textures[name].size
+            Logger.info("Assets:     %s (%dx%d) %d KiB of the atlas" % (name, width, height, width * height * 4 // 1024))
+        Logger.info("Assets: %d KiB of texture memory in total" % (sum(entry[2] for entry in self.report) // 1024))
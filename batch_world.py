@@ -0,0 +1,285 @@
+# Plays many games of Popper Pig at once for tuning the difficulty. BatchWorld follows the same rules as World (the
+# pig's acceleration, the wave of balloons heading to random destinations, popping, missing, the balloons speeding up
+# with every pop, and 10 more misses allowed every 50 pops), but keeps every game in a row of NumPy arrays so one step
+# advances all of them together. Its random choices come from one NumPy generator, so a batch game is not the same
+# game as a World with the same seed; the games are played by the same rules.
+#
+# The difficulty settings (the speed added per pop, the misses allowed, and the bonus lives) can be changed to see how
+# they change the games a player plays:
+#
+#     python batch_world.py --batch 4096 --games 100000
+#     python batch_world.py --games 100000 --speed-ramp .0004 --misses-allowed 5
+
+# import argparse to read the options, math to size the balloon rings, and time to measure the throughput
+import argparse
+import math
+import time
+
+# import numpy for the arrays
+import numpy as np
+
+# import the length of a step of the game
+from world import STEP
+
+# which way the wave of balloons is heading, and which way the pig is accelerating. NONE is the pig floating still
+# before its first press, and the wave before it has a destination.
+NONE = 0
+UP = 1
+DOWN = -1
+
+
+# games of Popper Pig on screens of the same size, advanced together
+class BatchWorld:
+    # games is how many games are played at once. The rest are the difficulty settings World uses: speed_ramp times the
+    # balloon width is added to the balloon speed every pop, misses_allowed is how many misses end a game, and
+    # bonus_lives more misses are allowed every bonus_every pops.
+    def __init__(self, games, width, height, seed=None, speed_ramp=.00025, misses_allowed=10, bonus_every=50,
+                 bonus_lives=10):
+        self.games = games
+        self.width = width
+        self.height = height
+        self.random = np.random.default_rng(seed)
+        self.speed_ramp = speed_ramp
+        self.start_misses_allowed = misses_allowed
+        self.bonus_every = bonus_every
+        self.bonus_lives = bonus_lives
+        # the sizes of the balloons and the pig, the same share of the screen as in World
+        self.balloon_height = height * 0.0693
+        self.balloon_width = (87 / 103) * self.balloon_height
+        self.pig_height = height * 0.1038
+        self.pig_width = (234 / 171) * self.pig_height
+        self.pig_x = self.pig_width / 2
+        # balloons spawn at least 1.2 balloon widths apart and are gone a balloon width past the left side of the
+        # screen, so no more than this many are ever on a screen. Each game keeps its balloons in a ring of that size,
+        # in the order they spawned.
+        self.capacity = math.ceil((width + self.balloon_width * 2) / (self.balloon_width * 1.2)) + 2
+        # the pig of every game
+        self.pig_y = np.full(games, height / 2)
+        self.pig_velocity = np.zeros(games)
+        self.pig_thrust = np.zeros(games, dtype=np.int8)
+        self.was_pressed = np.zeros(games, dtype=bool)
+        # the balloons of every game: one row per game, one column per slot of its ring
+        self.balloon_x = np.zeros((games, self.capacity))
+        self.balloon_y = np.zeros((games, self.capacity))
+        self.balloon_alive = np.zeros((games, self.capacity), dtype=bool)
+        # how many balloons each game spawned. The next balloon goes in slot spawned % capacity.
+        self.spawned = np.zeros(games, dtype=np.int64)
+        # the balloon spawner of every game. The wave starts in the middle of the screen.
+        self.balloon_speed = np.zeros(games)
+        self.dist_since_last_spawn = np.zeros(games)
+        self.heading = np.zeros(games, dtype=np.int8)
+        self.destination = np.zeros(games)
+        self.incline = np.zeros(games)
+        self.y_spawn = np.full(games, height / 2)
+        # the counters of every game
+        self.pop_count = np.zeros(games, dtype=np.int64)
+        self.miss_count = np.zeros(games, dtype=np.int64)
+        self.misses_allowed = np.zeros(games, dtype=np.int64)
+        self.added_lives = np.zeros(games, dtype=bool)
+        # how many steps each game has lasted and the balloon speed it ended with
+        self.steps = np.zeros(games, dtype=np.int64)
+        self.final_speed = np.zeros(games)
+        # True once a game is over. Games that are over don't change until they are reset.
+        self.over = np.ones(games, dtype=bool)
+        # how many steps were played by all the games together
+        self.game_steps = 0
+
+    # starts new rounds in the games where which is True (every game if which is None). Like a World round, the pig
+    # floats in the middle of the screen until the first press and the wave of balloons carries on from its last height.
+    def reset(self, which=None):
+        if which is None:
+            which = np.ones(self.games, dtype=bool)
+        self.pig_y[which] = self.height / 2
+        self.pig_velocity[which] = 0
+        self.pig_thrust[which] = NONE
+        self.was_pressed[which] = False
+        self.balloon_alive[which] = False
+        self.spawned[which] = 0
+        self.balloon_speed[which] = 5 * (self.balloon_width / 48.467)
+        self.dist_since_last_spawn[which] = 0
+        self.heading[which] = NONE
+        self.pop_count[which] = 0
+        self.miss_count[which] = 0
+        self.misses_allowed[which] = self.start_misses_allowed
+        self.added_lives[which] = False
+        self.steps[which] = 0
+        self.final_speed[which] = 0
+        self.over[which] = False
+
+    # advances every game that isn't over by one STEP. pressed is an array of whether the screen is pressed in each
+    # game. Returns how many balloons each game popped and missed, and which games ended during the step.
+    def step(self, pressed):
+        pressed = np.asarray(pressed, dtype=bool)
+        playing = ~self.over
+        # a press makes the pig accelerate up and letting go makes it accelerate down
+        pressed_now = pressed & ~self.was_pressed & playing
+        released_now = self.was_pressed & ~pressed & playing
+        self.was_pressed = np.where(playing, pressed, self.was_pressed)
+        self.pig_thrust[pressed_now] = UP
+        self.pig_thrust[released_now] = DOWN
+        self.move_pigs(playing)
+        # the games lost by too many misses or by the pig flying off the screen end before anything spawns
+        ended = playing & ((self.miss_count >= self.misses_allowed) | (self.pig_y < -self.pig_height) |
+                           (self.pig_y > self.height + self.pig_height))
+        self.final_speed[ended] = self.balloon_speed[ended]
+        self.over |= ended
+        playing &= ~ended
+        self.run_spawners(playing)
+        popped, missed = self.move_balloons(playing)
+        self.check_bonus_lives(playing)
+        self.steps[playing] += 1
+        self.game_steps += int(np.count_nonzero(playing))
+        return popped, missed, ended
+
+    # moves every pig the way it is accelerating. The pigs accelerate faster as the balloons speed up.
+    def move_pigs(self, playing):
+        speed_share = self.balloon_speed / 5
+        up = playing & (self.pig_thrust == UP)
+        down = playing & (self.pig_thrust == DOWN)
+        self.pig_velocity = np.where(up, np.minimum(self.pig_velocity + speed_share * 0.262, speed_share * 10),
+                                     self.pig_velocity)
+        self.pig_velocity = np.where(down, np.maximum(self.pig_velocity - speed_share * 0.262, speed_share * -10),
+                                     self.pig_velocity)
+        moving = up | down
+        self.pig_y[moving] += self.pig_velocity[moving]
+
+    # spawns a balloon in every game that went 1.2 balloon widths since its last one
+    def run_spawners(self, playing):
+        spawning = playing & (self.dist_since_last_spawn >= self.balloon_width * 1.2)
+        waiting = playing & ~spawning
+        self.dist_since_last_spawn[waiting] += self.balloon_speed[waiting]
+        self.dist_since_last_spawn[spawning] = 0
+        if not spawning.any():
+            return
+        # the waves that have no destination yet or went past theirs get a new one, the rest move toward theirs
+        heading = self.heading
+        new_destination = spawning & ((heading == NONE) | ((heading == UP) & (self.y_spawn > self.destination)) |
+                                      ((heading == DOWN) & (self.y_spawn < self.destination)))
+        count = int(np.count_nonzero(new_destination))
+        if count:
+            self.incline[new_destination] = self.random.integers(int(self.balloon_height / 5),
+                                                                 int(self.balloon_height * 0.8) + 1, count)
+            self.destination[new_destination] = self.random.integers(math.floor(self.height * 0.2),
+                                                                     math.floor(self.height * 0.7) + 1, count)
+            heading[new_destination] = np.where(self.y_spawn[new_destination] > self.destination[new_destination],
+                                                DOWN, UP)
+        moving = spawning & ~new_destination
+        self.y_spawn[moving] += heading[moving] * self.incline[moving]
+        # the new balloons go off the right side of the screen in the next slot of each ring
+        games = np.flatnonzero(spawning)
+        slots = self.spawned[games] % self.capacity
+        self.balloon_x[games, slots] = self.width
+        self.balloon_y[games, slots] = self.y_spawn[games]
+        self.balloon_alive[games, slots] = True
+        self.spawned[games] += 1
+
+    # misses the balloons past the left side of the screen, moves every balloon, and pops the balloons touching the
+    # pig. Returns how many balloons each game popped and missed.
+    def move_balloons(self, playing):
+        alive = self.balloon_alive
+        rows = playing[:, None]
+        # a balloon is missed once it is a full balloon's width past the left side of the screen
+        missed = alive & rows & (self.balloon_x < -self.balloon_width)
+        alive &= ~missed
+        self.balloon_x -= np.where(playing, self.balloon_speed, 0)[:, None]
+        # a balloon is popped if it is within the left and right bounds of the pig and on the screen, and within the
+        # top and bottom bounds of the pig
+        bottom = (self.pig_y / 1.1)[:, None]
+        top = (self.pig_y + self.pig_height)[:, None]
+        popped = alive & rows & (self.balloon_x >= 0) & (self.balloon_x <= self.pig_x + self.pig_width) & \
+            (self.balloon_y >= bottom) & (self.balloon_y <= top)
+        alive &= ~popped
+        popped_count = popped.sum(axis=1)
+        missed_count = missed.sum(axis=1)
+        self.miss_count += missed_count
+        self.pop_count += popped_count
+        # every pop speeds the game up
+        self.balloon_speed += popped_count * self.balloon_width * self.speed_ramp
+        return popped_count, missed_count
+
+    # allows more misses every bonus_every pops
+    def check_bonus_lives(self, playing):
+        on_bonus = (self.pop_count % self.bonus_every == 0) & (self.pop_count != 0)
+        adding = playing & on_bonus & ~self.added_lives
+        self.misses_allowed[adding] += self.bonus_lives
+        self.added_lives |= adding
+        self.added_lives &= on_bonus | ~playing
+
+    # the height each game's pig wants to be at: the middle of the next balloon that hasn't passed it, or the middle of
+    # the screen if there is none. The same player as the benchmark's scripted_input.
+    def chase_targets(self):
+        ahead = self.balloon_alive & (self.balloon_x + self.balloon_width >= self.pig_x)
+        nearest_x = np.where(ahead, self.balloon_x, np.inf)
+        nearest = np.argmin(nearest_x, axis=1)
+        rows = np.arange(self.games)
+        return np.where(ahead.any(axis=1), self.balloon_y[rows, nearest] + self.balloon_height / 2, self.height / 2)
+
+
+# players that decide the presses of every game from the batch
+POLICIES = {
+    # holds the screen while the pig is below the next balloon. A World round starts with a press, which also starts
+    # the pig up, so the first step of every round is pressed too.
+    "chase": lambda world: (world.pig_y + world.pig_height / 2 < world.chase_targets()) | (world.steps == 0),
+    # presses at random
+    "random": lambda world: world.random.random(world.games) < .5,
+}
+
+
+# plays total games, batch at a time, with a policy. Finished games are replaced by new ones until total have been
+# played. Games still going after max_steps are ended where they are. Returns the pops, misses, steps, and final speed
+# of every game and the seconds it took.
+def evaluate(world, policy, total, max_steps=60 * 60 * 10):
+    results = {"pops": [], "misses": [], "steps": [], "final_speed": []}
+    started = world.games
+    world.reset()
+    start = time.perf_counter()
+    while not world.over.all() or started < total:
+        world.step(policy(world))
+        # games that go on too long are stopped so a perfect policy can't play forever
+        too_long = ~world.over & (world.steps >= max_steps)
+        world.final_speed[too_long] = world.balloon_speed[too_long]
+        world.over |= too_long
+        finished = world.over & (world.steps > 0)
+        if finished.any():
+            results["pops"].extend(world.pop_count[finished].tolist())
+            results["misses"].extend(world.miss_count[finished].tolist())
+            results["steps"].extend(world.steps[finished].tolist())
+            results["final_speed"].extend(world.final_speed[finished].tolist())
+            # games over are marked as counted by setting their steps to 0, then refilled while games are left to play
+            world.steps[finished] = 0
+            refill = np.flatnonzero(finished)[:max(0, total - started)]
+            if len(refill):
+                which = np.zeros(world.games, dtype=bool)
+                which[refill] = True
+                world.reset(which)
+                started += len(refill)
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play many Popper Pig games at once to tune the difficulty.")
+    parser.add_argument("--batch", type=int, default=4096, help="games played at once")
+    parser.add_argument("--games", type=int, default=100000, help="games to play in total")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="chase", help="how the games are played")
+    parser.add_argument("--seed", type=int, default=1234, help="seed of the random choices")
+    parser.add_argument("--width", type=int, default=1920, help="screen width in pixels")
+    parser.add_argument("--height", type=int, default=1080, help="screen height in pixels")
+    parser.add_argument("--speed-ramp", type=float, default=.00025, help="balloon widths of speed added every pop")
+    parser.add_argument("--misses-allowed", type=int, default=10, help="misses that end a game")
+    parser.add_argument("--bonus-every", type=int, default=50, help="pops between bonus lives")
+    parser.add_argument("--bonus-lives", type=int, default=10, help="misses added by a bonus")
+    options = parser.parse_args()
+    world = BatchWorld(min(options.batch, options.games), options.width, options.height, options.seed,
+                       options.speed_ramp, options.misses_allowed, options.bonus_every, options.bonus_lives)
+    results, seconds = evaluate(world, POLICIES[options.policy], options.games)
+    pops = np.array(results["pops"])
+    steps = np.array(results["steps"])
+    print("%d games in %.2f s: %.0f games/s, %.0f game steps/s" % (len(pops), seconds, len(pops) / seconds,
+                                                                   world.game_steps / seconds))
+    print("pops: mean %.1f, p50 %d, p90 %d, max %d" % (pops.mean(), np.percentile(pops, 50), np.percentile(pops, 90),
+                                                       pops.max()))
+    print("length: mean %.1f s, final speed: mean %.2f" % (steps.mean() * STEP, np.mean(results["final_speed"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+# Measures how long one tick of the game takes without a screen. Every run plays the game through World.step (the
+# balloon spawner, the balloons moving and popping against the pig, and the bonus lives) and builds the label text the
+# HUD would show, with a scripted player and a fixed seed so every run plays the same games:
+#
+#     python benchmark.py                       # 1k, 10k, and 100k ticks, written to benchmark_results.json
+#     python benchmark.py --frames 10000 --output before.json
+#     python benchmark.py --gc-policy rounds    # hold full collections back until a round is over, like the game
+#
+# The results are sorted JSON, so comparing two result files with diff shows what changed. The game counters (games,
+# pops, misses, top speed) only change when the game's rules change; the timings change when the game gets faster or
+# slower.
+
+# import argparse to read the options, gc and sys to count collections and allocated memory blocks, json to save the
+# results, platform to record the machine, and time to time the ticks
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+# resource knows the peak memory of the process, but only exists on unix
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# import the game rules, which run without kivy, and the events they make
+from world import World
+from game_events import BalloonMissed, BalloonPopped, RoundReady, RoundStarted
+# import the policy that decides when the cycle collector runs
+from gc_policy import MODES, GcPolicy
+
+# the tick lengths every run uses unless told otherwise
+DEFAULT_FRAMES = [1000, 10000, 100000]
+DEFAULT_SEED = 1234
+# a 1080p phone held sideways
+DEFAULT_WIDTH = 1920
+DEFAULT_HEIGHT = 1080
+
+
+# the scripted player. Taps to start every round, then holds the screen while the pig is below the next balloon that
+# has not passed it and lets go while it is above. With no balloon ahead it aims for the middle of the screen.
+def scripted_input(world, frame):
+    # a round starts on a new press, so tap on and off while waiting for one
+    if world.waiting_for_tap or world.game_stage == "menu":
+        return frame % 2 == 0
+    field = world.balloons
+    target = world.height / 2
+    nearest = None
+    for slot in field.live_indices():
+        # the balloon is still ahead of the back of the pig
+        if field.x[slot] + field.width[slot] >= world.pig_x and (nearest is None or field.x[slot] < field.x[nearest]):
+            nearest = slot
+    if nearest is not None:
+        target = field.y[nearest] + field.height[nearest] / 2
+    return world.pig_y + world.pig_height / 2 < target
+
+
+# the value below which percent of the sorted values fall (nearest rank)
+def percentile(sorted_values, percent):
+    index = max(0, min(len(sorted_values) - 1, int(round(percent / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+# the mean, 50th percentile, 99th percentile, and max of tick times in nanoseconds, in microseconds
+def summarize(tick_times):
+    ordered = sorted(tick_times)
+    return {"mean_us": round(sum(ordered) / len(ordered) / 1000, 3),
+            "p50_us": round(percentile(ordered, 50) / 1000, 3),
+            "p99_us": round(percentile(ordered, 99) / 1000, 3),
+            "max_us": round(ordered[-1] / 1000, 3)}
+
+
+# the most memory the process has used so far in KiB, or None if it can't be known on this system
+def peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, linux reports KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# how many memory blocks measuring a tick leaves allocated when the tick itself allocates nothing. The same measuring
+# code as run is timed around nothing, and the most common result is kept.
+def measuring_overhead(samples=101):
+    counts = []
+    for _ in range(samples):
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        blocks_after = sys.getallocatedblocks()
+        counts.append(blocks_after - blocks_before)
+    del start
+    return max(set(counts), key=counts.count)
+
+
+# plays frames ticks of the game and returns the results of the run. gc_policy is the mode of the gc policy, which
+# holds full collections back during rounds like MainGame does or leaves the collector alone.
+def run(frames, seed, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, gc_policy="default"):
+    world = World(width, height, seed=seed)
+    world.show_tap_to_start()
+    policy = GcPolicy(gc_policy)
+    policy.freeze()
+    tick_times = []
+    # tick times grouped by how fast the balloons were moving (whole pixels per tick) when the tick started
+    speed_bands = {}
+    # memory blocks still allocated after each tick minus before it. This is the net growth of the live blocks, not how
+    # many allocations the tick made: a block allocated and freed during the same tick doesn't count.
+    block_growth = 0
+    games = 0
+    pops = 0
+    misses = 0
+    top_speed = 0.
+    # the most balloons tested against the pig in one tick
+    most_candidates = 0
+    # the blocks the measuring itself allocates (the number of the timer and the block counter), taken off every tick
+    measuring_blocks = measuring_overhead()
+    collections_before = sum(stat["collections"] for stat in gc.get_stats())
+    for frame in range(frames):
+        pressed = scripted_input(world, frame)
+        band = int(world.balloon_speed)
+        blocks_before = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        events = world.step(pressed)
+        # the HUD builds its label text every tick
+        world.hud_text()
+        blocks_after = sys.getallocatedblocks()
+        elapsed = time.perf_counter_ns() - start
+        block_growth += blocks_after - blocks_before - measuring_blocks
+        tick_times.append(elapsed)
+        speed_bands.setdefault(band, []).append(elapsed)
+        top_speed = max(top_speed, world.balloon_speed)
+        most_candidates = max(most_candidates, world.balloons.candidates)
+        for event in events:
+            if isinstance(event, RoundStarted):
+                games += 1
+                policy.start_round()
+            elif isinstance(event, RoundReady):
+                policy.end_round()
+            elif isinstance(event, BalloonPopped):
+                pops += 1
+            elif isinstance(event, BalloonMissed):
+                misses += 1
+    policy.close()
+    gc_stats = policy.stats()
+    return {"frames": frames,
+            "seed": seed,
+            "tick": summarize(tick_times),
+            "speed_bands": {"%03d" % band: dict(summarize(times), ticks=len(times))
+                            for band, times in sorted(speed_bands.items())},
+            "memory": {"net_live_blocks_per_tick": round(block_growth / frames, 3),
+                       "gc_collections": sum(stat["collections"] for stat in gc.get_stats()) - collections_before,
+                       "gc_policy": gc_policy,
+                       "gc_pause_ms": round(sum(gc_stats["pause_ms"]), 3),
+                       "gc_longest_pause_ms": gc_stats["longest_pause_ms"],
+                       "gc_between_rounds_ms": gc_stats["between_rounds"]["ms"],
+                       "peak_rss_kib": peak_rss_kib()},
+            "collision": {"candidates_per_tick": round(world.balloons.stats()["candidates_per_step"], 3),
+                          "max_candidates": most_candidates},
+            "game": {"games": games, "pops": pops, "misses": misses, "top_speed": round(top_speed, 3),
+                     "balloon_high_water": world.balloons.high_water}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the ticks of headless Popper Pig games.")
+    parser.add_argument("--frames", type=int, nargs="+", default=DEFAULT_FRAMES, help="ticks to play in each run")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of every run")
+    parser.add_argument("--width", type=int, default=DEFAULT_WIDTH, help="screen width in pixels")
+    parser.add_argument("--height", type=int, default=DEFAULT_HEIGHT, help="screen height in pixels")
+    parser.add_argument("--output", default="benchmark_results.json", help="file the results are written to")
+    parser.add_argument("--gc-policy", choices=MODES, default="default",
+                        help="when python's cycle collector may run (see gc_policy.py)")
+    options = parser.parse_args()
+    results = {"python": platform.python_version(),
+               "machine": platform.machine(),
+               "screen": [options.width, options.height],
+               "runs": []}
+    for frames in options.frames:
+        result = run(frames, options.seed, options.width, options.height, options.gc_policy)
+        results["runs"].append(result)
+        tick = result["tick"]
+        memory = result["memory"]
+        print("%7d ticks: mean %.1f us, p50 %.1f us, p99 %.1f us, max %.1f us, %.2f net live blocks/tick, %d games, "
+              "%d pops" % (frames, tick["mean_us"], tick["p50_us"], tick["p99_us"], tick["max_us"],
+                 memory["net_live_blocks_per_tick"], result["game"]["games"], result["game"]["pops"]))
+        print("         gc: %d collections, %.1f ms paused, longest %.2f ms, %.1f ms of it between rounds"
+              % (memory["gc_collections"], memory["gc_pause_ms"], memory["gc_longest_pause_ms"],
+                 memory["gc_between_rounds_ms"]))
+    with open(options.output, "w") as results_file:
+        json.dump(results, results_file, indent=2, sort_keys=True)
+        results_file.write("\n")
+    print("Results written to " + options.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Build step that packs every image in Assets/ into a kivy atlas. Run it from the project folder whenever an image in
+# Assets/ is added or changed, before running or packaging the game:
+#
+#     python build_atlas.py
+#
+# The atlas is written to Assets/atlas/popper_pig.atlas along with its popper_pig-<page>.png images. Images too big to
+# fit on an atlas page (such as the full-screen background) are left out of the atlas and loaded on their own.
+# Building the atlas needs the Pillow package.
+
+# import glob and os to find the images
+import glob
+import os
+
+# import the atlas maker and the image loader from kivy
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+
+# the folder holding the game's images
+ASSETS_FOLDER = "Assets"
+# the atlas files are written to a sub folder so they are never packed into the next atlas
+ATLAS_BASENAME = os.path.join(ASSETS_FOLDER, "atlas", "popper_pig")
+# width and height of each atlas page. 2048 is the largest texture size every phone the game supports can load.
+ATLAS_SIZE = 2048
+# pixels between the images on a page
+ATLAS_PADDING = 2
+
+
+# packs the images and returns the images that were left out because they don't fit on a page
+def build_atlas():
+    sources = sorted(glob.glob(os.path.join(ASSETS_FOLDER, "*.png")))
+    packed = []
+    standalone = []
+    # an image (plus its padding) has to fit on a page to be packed
+    for source in sources:
+        width, height = CoreImage(source).size
+        if width + ATLAS_PADDING > ATLAS_SIZE or height + ATLAS_PADDING > ATLAS_SIZE:
+            standalone.append(source)
+        else:
+            packed.append(source)
+    # make sure the atlas folder exists before writing to it
+    os.makedirs(os.path.dirname(ATLAS_BASENAME), exist_ok=True)
+    Atlas.create(ATLAS_BASENAME, packed, ATLAS_SIZE, padding=ATLAS_PADDING)
+    return standalone
+
+
+if __name__ == "__main__":
+    left_out = build_atlas()
+    print("Atlas written to " + ATLAS_BASENAME + ".atlas")
+    for image in left_out:
+        print("Too large for an atlas page, loaded on its own: " + image)
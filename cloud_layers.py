@@ -0,0 +1,97 @@
+# Draws the clouds as a few scrolling layers instead of one quad per cloud. When the game starts, each layer is baked
+# once: a handful of the cloud_1..4 images are drawn with random sizes, heights, and opacities into a texture that
+# repeats from left to right. Every frame a layer is one full-screen quad whose texture coordinates are slid along, so
+# the clouds cost the same amount to draw no matter how many of them are on the screen. The back layers drift slower
+# than the front layers, which gives the sky some depth.
+
+# import the texture coordinates of a layer
+from cloud_scroll import layer_span
+
+# import the graphics instructions and the widget from kivy
+from kivy.graphics import ClearBuffers, ClearColor, Color, Fbo, Rectangle
+from kivy.uix.widget import Widget
+
+
+# a widget that draws every cloud layer across the whole screen
+class CloudLayers(Widget):
+    # texture is the atlas texture and regions tells where each image is in it. cloud_regions is the index of the 4
+    # cloud images. random decides where the clouds go. layers is how many layers to bake and layer_size is the
+    # height in pixels of each layer's texture (its width is twice that). scale is how many screen pixels the game
+    # calls one pixel of speed.
+    def __init__(self, texture, regions, cloud_regions, random, layers=3, layer_size=512, scale=1., **kwargs):
+        super(CloudLayers, self).__init__(**kwargs)
+        # the frame buffer of each layer. The layer's texture belongs to it, so it has to be kept.
+        self.fbos = []
+        # how many pixels each layer drifts left per step on top of the balloon speed, back layer first
+        self.drifts = []
+        self.quads = []
+        # how many of the front layers are drawn. The quality governor draws fewer of them on slow devices.
+        self.visible_layers = layers
+        for layer in range(layers):
+            # the front layers hold more, bigger, and more visible clouds
+            depth = (layer + 1) / layers
+            self.fbos.append(self.bake_layer(texture, regions, cloud_regions, random, layer_size, depth))
+            # clouds used to drift between 1 and 7.5 pixels per step faster than the balloons. The layers spread out
+            # over the same range.
+            self.drifts.append(scale * (1 + 6.5 * depth))
+        for fbo in self.fbos:
+            self.quads.append(Rectangle(texture=fbo.texture, pos=self.pos, size=self.size))
+        # the opacity of every layer
+        self.color = Color(1, 1, 1, 1)
+        self.set_quality(layers, 1.)
+        self.bind(pos=self.scroll_to_start, size=self.scroll_to_start)
+
+    # draws the clouds of one layer into a texture that repeats from left to right and returns its frame buffer
+    def bake_layer(self, texture, regions, cloud_regions, random, layer_size, depth):
+        width = layer_size * 2
+        height = layer_size
+        fbo = Fbo(size=(width, height))
+        with fbo:
+            # start from a clear sky
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            for _ in range(2 + round(2 * depth)):
+                # a cloud 10-50% of the screen height, keeping the width:height ratio of cloud_1.png, anywhere between
+                # off the bottom and off the top of the screen with an opacity between 1% and 50%
+                cloud_height = height * random.randint(10, int(10 + 40 * depth)) / 100
+                cloud_width = cloud_height * (690 / 343)
+                x = random.uniform(0, width)
+                y = random.uniform(-cloud_height, height)
+                u0, v0, u1, v1 = regions[cloud_regions[random.randint(0, 3)]]
+                Color(1, 1, 1, random.randint(1, 50) / 100)
+                # a cloud hanging off the right edge is drawn again off the left edge so the layer repeats seamlessly
+                for offset in (0, -width):
+                    Rectangle(texture=texture, pos=(x + offset, y), size=(cloud_width, cloud_height),
+                              tex_coords=(u0, v0, u1, v0, u1, v1, u0, v1))
+        fbo.draw()
+        fbo.texture.wrap = "repeat"
+        return fbo
+
+    # draws only the front layers of the clouds at an opacity between 0 and 1. Layers that aren't drawn cost nothing.
+    def set_quality(self, layers, opacity):
+        self.visible_layers = max(0, min(layers, len(self.quads))) if opacity > 0 else 0
+        self.color.a = opacity
+        self.canvas.clear()
+        if not self.visible_layers:
+            return
+        self.canvas.add(self.color)
+        for quad in self.quads[len(self.quads) - self.visible_layers:]:
+            self.canvas.add(quad)
+
+    # puts every layer back at its first position, for example after the screen changed size
+    def scroll_to_start(self, *ignore):
+        for quad in self.quads:
+            quad.pos = self.pos
+            quad.size = self.size
+        self.scroll(0, 0)
+
+    # slides every layer left. balloon_scroll is how far the balloons scrolled and steps is how many steps the world
+    # has run, both in screen pixels and steps since the world was made (see cloud_scroll.py).
+    def scroll(self, balloon_scroll, steps):
+        for quad, fbo, drift in zip(self.quads, self.fbos, self.drifts):
+            # the layer texture is stretched to the screen's height, so its width on screen keeps its shape
+            layer_width = fbo.size[0] * self.height / fbo.size[1]
+            if layer_width <= 0:
+                continue
+            u0, u1 = layer_span(balloon_scroll, steps, drift, layer_width, self.width)
+            quad.tex_coords = (u0, 0, u1, 0, u1, 1, u0, 1)
@@ -0,0 +1,20 @@
+# Works out how far the cloud layers have slid, without any graphics. The clouds follow the balloon scroll and drift
+# on top of it with the world's steps, so they keep moving the same way at any tick rate: a frame of the screen, or an
+# idle tick that covers several steps at once. CloudLayers slides the texture of every layer to these numbers.
+
+# import interpolate to draw the balloon scroll between the last two steps
+from timestep import interpolate
+
+
+# where the clouds are drawn alpha of the way between the last two steps of world. Returns the balloon scroll in pixels
+# and the steps the clouds have drifted, which CloudLayers.scroll takes.
+def cloud_position(world, alpha):
+    return interpolate(world.previous_balloon_scroll, world.balloon_scroll, alpha), world.steps - 1 + alpha
+
+
+# the left and right texture coordinates of a cloud layer that drifts drift pixels per step and repeats every
+# layer_width pixels, on a screen width pixels wide. Only the fraction of a repeat is kept so the coordinates stay
+# small.
+def layer_span(balloon_scroll, steps, drift, layer_width, width):
+    u0 = ((balloon_scroll + steps * drift) / layer_width) % 1.
+    return u0, u0 + width / layer_width
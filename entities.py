@@ -0,0 +1,155 @@
+# Keeps track of every sprite the view puts on the screen (the pig and the tap to start image) and of the callbacks
+# scheduled for them, such as the misses label turning white again. Removing an entity cancels its callbacks and runs
+# its clean up exactly once, however many times it is asked to go, so nothing scheduled for a sprite can fire after the
+# sprite is gone and nothing keeps a removed sprite alive. The end of a round takes every entity of the round off the
+# screen in one pass. The pop images and confetti are particles, which expire by themselves (see particles.py).
+#
+# The registry is given the function that schedules callbacks (kivy's Clock.schedule_once in the game), and
+# RoundEntities is given the functions that make, show, and hide the sprites. tests/test_entities.py plays games
+# without a screen through the same RoundEntities the game uses and checks that every entity and callback is gone
+# after each of them.
+
+# import the events that start and end the rounds
+from game_events import BonusLives, RoundReady, RoundStarted
+
+
+# every entity on the screen and the callbacks scheduled for them
+class EntityRegistry:
+    # schedule is called as schedule(callback, delay) and returns something with a cancel method
+    def __init__(self, schedule):
+        self.schedule_callback = schedule
+        # the (kind, clean up function) of every entity, by entity
+        self.entities = {}
+        # the scheduled callbacks of every entity, by entity
+        self.callbacks = {}
+        # how many entities were removed and how many callbacks fired or were cancelled
+        self.removed = 0
+        self.fired = 0
+        self.cancelled = 0
+
+    # registers an entity. on_remove is called with the entity once it is removed.
+    def add(self, entity, kind, on_remove=None):
+        self.entities[entity] = (kind, on_remove)
+        self.callbacks[entity] = []
+        return entity
+
+    # calls callback(time_passed) after delay seconds unless entity is removed first
+    def schedule(self, entity, callback, delay):
+        if entity not in self.entities:
+            raise KeyError("%r is not a registered entity" % (entity,))
+        pending = self.callbacks[entity]
+        event = None
+
+        def fire(time_passed):
+            # the callback is no longer pending once it runs
+            pending.remove(event)
+            self.fired += 1
+            callback(time_passed)
+        event = self.schedule_callback(fire, delay)
+        pending.append(event)
+        return event
+
+    # takes an entity off the screen: cancels its callbacks and calls its clean up. Returns False if the entity was
+    # already removed.
+    def remove(self, entity):
+        if entity not in self.entities:
+            return False
+        kind, on_remove = self.entities.pop(entity)
+        for event in self.callbacks.pop(entity):
+            event.cancel()
+            self.cancelled += 1
+        self.removed += 1
+        if on_remove is not None:
+            on_remove(entity)
+        return True
+
+    # removes every entity of the given kinds (every entity if kinds is None) in one pass and returns how many
+    def clear(self, kinds=None):
+        doomed = [entity for entity, (kind, on_remove) in self.entities.items() if kinds is None or kind in kinds]
+        for entity in doomed:
+            self.remove(entity)
+        return len(doomed)
+
+    # how many entities of a kind (or of every kind) are registered
+    def count(self, kind=None):
+        if kind is None:
+            return len(self.entities)
+        return sum(1 for entity_kind, on_remove in self.entities.values() if entity_kind == kind)
+
+    # how many callbacks are waiting to fire
+    def pending(self):
+        return sum(len(events) for events in self.callbacks.values())
+
+    # the registry's counters as a dictionary
+    def stats(self):
+        kinds = {}
+        for kind, on_remove in self.entities.values():
+            kinds[kind] = kinds.get(kind, 0) + 1
+        return {"live": kinds, "pending_callbacks": self.pending(), "removed": self.removed, "fired": self.fired,
+                "cancelled": self.cancelled}
+
+
+# puts the entities of a game on the screen and takes them off again as the world's events say: the HUD for the whole
+# game, and the pig and the tap to start image of every round. Every one of them goes through the registry.
+class RoundEntities:
+    # registry is the EntityRegistry and world the World whose rounds are shown. make_pig() and make_tap_to_start()
+    # make a new sprite, show(sprite) puts it on the screen, and hide(sprite) takes it off.
+    def __init__(self, registry, world, make_pig, make_tap_to_start, show, hide):
+        self.registry = registry
+        self.world = world
+        self.make_pig = make_pig
+        self.make_tap_to_start = make_tap_to_start
+        self.show = show
+        self.hide = hide
+        # the HUD, the pig, and the tap to start image, while they are on the screen
+        self.hud = None
+        self.pig = None
+        self.tap_to_start = None
+
+    # subscribes to the events that change what is on the screen
+    def subscribe(self, bus):
+        bus.subscribe(RoundStarted, self.hide_tap_to_start)
+        bus.subscribe(RoundReady, self.next_round)
+        bus.subscribe(BonusLives, self.flash_bonus_lives)
+
+    # the game is starting. hud stays for the whole game and has show_bonus and ungreen_label methods.
+    def start(self, hud):
+        self.hud = self.registry.add(hud, "hud")
+        self.add_round_sprites()
+
+    # called every tick. Removes the pig once the world says it popped and returns the pig left on the screen (None if
+    # there is none).
+    def update(self):
+        if self.pig is not None and not self.world.pig_alive:
+            self.registry.remove(self.pig)
+        return self.pig
+
+    # removes the tap to start image once the round starts
+    def hide_tap_to_start(self, event):
+        self.registry.clear(("tap_to_start",))
+
+    # the last round is over: takes what is left of it off the screen in one pass and adds the pig and the tap to
+    # start image of the next one
+    def next_round(self, event):
+        self.registry.clear(("pig", "tap_to_start"))
+        self.add_round_sprites()
+
+    # flashes the HUD's misses label green when lives are added and turns it back 0.1 seconds later
+    def flash_bonus_lives(self, event):
+        self.hud.show_bonus()
+        self.registry.schedule(self.hud, self.hud.ungreen_label, 0.1)
+
+    # adds the pig and the tap to start image of a new round
+    def add_round_sprites(self):
+        self.pig = self.registry.add(self.make_pig(), "pig", self.remove_round_sprite)
+        self.tap_to_start = self.registry.add(self.make_tap_to_start(), "tap_to_start", self.remove_round_sprite)
+        self.show(self.pig)
+        self.show(self.tap_to_start)
+
+    # takes the pig or the tap to start image off the screen and forgets it
+    def remove_round_sprite(self, sprite):
+        self.hide(sprite)
+        if sprite is self.pig:
+            self.pig = None
+        elif sprite is self.tap_to_start:
+            self.tap_to_start = None
@@ -0,0 +1,66 @@
+# The things that happen in a game, as typed events, and the bus that hands them to whoever is interested. World
+# makes an event at the moment its state changes (a balloon pops, a game is lost) instead of the rest of the game
+# checking its state every frame. The view subscribes a handler per part of the game (the HUD, the sounds, the effects
+# on screen, and the score history) to the events it cares about, so a part with nothing to do costs nothing.
+
+# import time to time the handlers and namedtuple to make the events
+import time
+from collections import namedtuple
+
+# a balloon was added to the balloon field. moved is the old slots of every balloon if the field grew, otherwise None.
+BalloonSpawned = namedtuple("BalloonSpawned", ["slot", "moved"])
+# the pig popped the balloon in slot, which was at x, y and width by height big
+BalloonPopped = namedtuple("BalloonPopped", ["slot", "x", "y", "width", "height"])
+# the balloon in slot flew off the left side of the screen
+BalloonMissed = namedtuple("BalloonMissed", ["slot"])
+# every balloon was taken off the screen without a pop
+BalloonsCleared = namedtuple("BalloonsCleared", [])
+# 10 more misses are allowed
+BonusLives = namedtuple("BonusLives", [])
+# a round started
+RoundStarted = namedtuple("RoundStarted", [])
+# the game was lost. new_best is True if the pop count is a new best.
+GameOver = namedtuple("GameOver", ["new_best"])
+# a new pig is waiting for a press to start the next round
+RoundReady = namedtuple("RoundReady", [])
+# the quality governor moved from tier old to tier new. average_ms is the average frame time that made it move.
+QualityChanged = namedtuple("QualityChanged", ["old", "new", "average_ms"])
+
+
+# hands every event published to the handlers subscribed to its type, in the order they subscribed
+class EventBus:
+    def __init__(self):
+        # the handlers of every event type
+        self.handlers = {}
+        # while a profiler is set, the time every event type's handlers take is added to its frame as
+        # events.<type name>
+        self.profiler = None
+
+    # calls handler(event) for every event of event_type published from now on
+    def subscribe(self, event_type, handler):
+        self.handlers.setdefault(event_type, []).append(handler)
+
+    # stops calling handler for event_type
+    def unsubscribe(self, event_type, handler):
+        self.handlers[event_type].remove(handler)
+
+    # calls the handlers of the event's type. An event nobody subscribed to costs a single dictionary lookup.
+    def publish(self, event):
+        handlers = self.handlers.get(type(event))
+        if not handlers:
+            return
+        # the handlers are only timed while the profiler is on
+        profiler = self.profiler
+        if profiler is None:
+            for handler in handlers:
+                handler(event)
+            return
+        start = time.perf_counter()
+        for handler in handlers:
+            handler(event)
+        profiler.add_section("events." + type(event).__name__, time.perf_counter() - start)
+
+    # publishes every event of a list in order
+    def publish_all(self, events):
+        for event in events:
+            self.publish(event)
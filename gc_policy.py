@@ -0,0 +1,115 @@
+# Keeps python's cycle collector out of the rounds. Reference counting frees almost everything the game lets go of, but
+# the cycle collector also runs every so many allocations, and a full (generation 2) collection walks every object the
+# app ever made: kivy's widgets, the atlas, the sounds. That takes milliseconds, and it happens when the game allocates
+# the most, which is when the balloons are fastest.
+#
+# In the "rounds" mode the objects made while the game is set up (up to the title menu going away) are frozen once, so
+# no collection walks them again. While a round is played the generation 2 threshold is raised so high that a full
+# collection doesn't happen, and the full collection is run between rounds instead, where a pause can't be seen. The
+# "default" mode leaves the collector alone. In both modes every collection is timed and every frame reports the
+# pauses and the net growth of the live memory blocks since the frame before, so a slow frame can be told apart from a
+# collection.
+
+# import gc to control the collector, sys to count the allocated memory blocks, and time to time the pauses
+import gc
+import sys
+import time
+
+# the modes of the policy
+MODES = ("default", "rounds")
+# the generation 2 threshold while a round is played. A full collection needs this many generation 1 collections
+# first, which a round never gets to.
+ROUND_THRESHOLD = 1000000
+
+
+# decides when the cycle collector may run and measures its pauses
+class GcPolicy:
+    # mode is one of MODES
+    def __init__(self, mode="rounds"):
+        if mode not in MODES:
+            raise ValueError("unknown gc policy %r, expected one of %s" % (mode, ", ".join(MODES)))
+        self.mode = mode
+        # python's thresholds, put back between rounds
+        self.default_threshold = gc.get_threshold()
+        self.in_round = False
+        # the moment the collection running started
+        self.collection_start = None
+        # the collections and the seconds they paused the game for since the last frame, by generation
+        self.frame_collections = [0, 0, 0]
+        self.frame_pause = [0., 0., 0.]
+        # the same since the policy was made, and the longest pause
+        self.collections = [0, 0, 0]
+        self.pause = [0., 0., 0.]
+        self.longest_pause = 0.
+        # the objects collected and the seconds taken by the full collections between rounds
+        self.round_collections = 0
+        self.round_collected = 0
+        self.round_pause = 0.
+        # the memory blocks allocated when the last frame ended
+        self.blocks = sys.getallocatedblocks()
+        gc.callbacks.append(self.on_collection)
+
+    # called by the collector at the start and stop of every collection
+    def on_collection(self, phase, info):
+        if phase == "start":
+            self.collection_start = time.perf_counter()
+        elif self.collection_start is not None:
+            seconds = time.perf_counter() - self.collection_start
+            self.collection_start = None
+            generation = info["generation"]
+            self.frame_collections[generation] += 1
+            self.frame_pause[generation] += seconds
+            self.collections[generation] += 1
+            self.pause[generation] += seconds
+            self.longest_pause = max(self.longest_pause, seconds)
+
+    # collects everything made so far and moves the survivors out of the collector's sight. Called once the game is set
+    # up.
+    def freeze(self):
+        if self.mode == "rounds":
+            gc.collect()
+            gc.freeze()
+
+    # called when a round starts. No full collection runs until the round ends.
+    def start_round(self):
+        self.in_round = True
+        if self.mode == "rounds":
+            gc.set_threshold(self.default_threshold[0], self.default_threshold[1], ROUND_THRESHOLD)
+
+    # called between rounds. Puts python's thresholds back and runs the full collection held back during the round.
+    # Nothing more is frozen, so whatever was made after the set up (and any cycle that died since) is collected.
+    def end_round(self):
+        self.in_round = False
+        if self.mode == "rounds":
+            gc.set_threshold(*self.default_threshold)
+            start = time.perf_counter()
+            self.round_collected += gc.collect()
+            self.round_pause += time.perf_counter() - start
+            self.round_collections += 1
+
+    # called at the end of every frame. Returns the milliseconds the collector paused the game for during the frame,
+    # how many collections of each generation ran, and the net growth of the live memory blocks during the frame (blocks
+    # allocated and freed in the same frame don't count).
+    def end_frame(self):
+        blocks = sys.getallocatedblocks()
+        frame = {"gc_ms": round(sum(self.frame_pause) * 1000, 3), "gc_collections": list(self.frame_collections),
+                 "net_live_blocks": blocks - self.blocks}
+        self.blocks = blocks
+        self.frame_collections = [0, 0, 0]
+        self.frame_pause = [0., 0., 0.]
+        return frame
+
+    # stops measuring and gives the collector back its thresholds and the frozen objects
+    def close(self):
+        gc.callbacks.remove(self.on_collection)
+        gc.set_threshold(*self.default_threshold)
+        gc.unfreeze()
+
+    # the policy's counters as a dictionary
+    def stats(self):
+        return {"mode": self.mode, "in_round": self.in_round, "frozen": gc.get_freeze_count(),
+                "collections": list(self.collections),
+                "pause_ms": [round(seconds * 1000, 3) for seconds in self.pause],
+                "longest_pause_ms": round(self.longest_pause * 1000, 3),
+                "between_rounds": {"collections": self.round_collections, "collected": self.round_collected,
+                                   "ms": round(self.round_pause * 1000, 3)}}
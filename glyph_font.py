@@ -0,0 +1,76 @@
+# Draws HUD text from a texture of pre-drawn characters instead of kivy Labels. A Label draws its whole text into a new
+# texture through the font provider and uploads it every time its text changes. Here every character a label can show
+# is drawn once into a single glyph texture when the HUD is built, and changing the text only rewrites the corners and
+# texture coordinates of a few quads in a Mesh, so no texture is drawn or uploaded while the game runs.
+
+# import the text renderer and the graphics instructions from kivy
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import Color, Mesh
+from kivy.uix.widget import Widget
+
+# every character the HUD shows
+HUD_CHARACTERS = "0123456789/:Best "
+
+
+# every character of a font at one size, drawn side by side into one texture. The font must be monospaced (like
+# PressStart2P) so every character takes up the same width.
+class GlyphAtlas:
+    # how many glyph textures were drawn and uploaded by every atlas made so far. Drawing the atlas is the only place
+    # the HUD makes a texture, so this only goes up when a HUD is built.
+    uploads = 0
+
+    def __init__(self, font_name, font_size, characters=HUD_CHARACTERS):
+        label = CoreLabel(text=characters, font_name=font_name, font_size=font_size)
+        label.refresh()
+        self.texture = label.texture
+        GlyphAtlas.uploads += 1
+        # how far apart characters are drawn and how tall they are, in pixels
+        self.advance = self.texture.width / len(characters)
+        self.height = self.texture.height
+        # the 8 texture coordinates (4 corners) of each character
+        self.tex_coords = {}
+        for index, character in enumerate(characters):
+            region = self.texture.get_region(index * self.advance, 0, self.advance, self.height)
+            self.tex_coords[character] = region.tex_coords
+
+
+# one line of text drawn from a glyph atlas with one Mesh. The text is centered vertically in the widget.
+class BitmapLabel(Widget):
+    def __init__(self, atlas, text="", color=(1, 1, 1, 1), **kwargs):
+        super(BitmapLabel, self).__init__(**kwargs)
+        self.atlas = atlas
+        self.text = None
+        # how many times the text changed
+        self.updates = 0
+        with self.canvas:
+            self.color = Color(*color)
+            self.mesh = Mesh(mode="triangles", texture=atlas.texture)
+        self.set_text(text)
+        self.bind(pos=self.redraw, size=self.redraw)
+
+    # shows new text. Nothing is redrawn if the text didn't change. Returns True if the text changed.
+    def set_text(self, text):
+        if text == self.text:
+            return False
+        self.text = text
+        self.updates += 1
+        self.redraw()
+        return True
+
+    # writes one quad per character
+    def redraw(self, *ignore):
+        atlas = self.atlas
+        y = self.y + (self.height - atlas.height) / 2
+        vertices = []
+        indices = []
+        for index, character in enumerate(self.text):
+            x = self.x + index * atlas.advance
+            u0, v0, u1, v1, u2, v2, u3, v3 = atlas.tex_coords[character]
+            vertices.extend((x, y, u0, v0,
+                             x + atlas.advance, y, u1, v1,
+                             x + atlas.advance, y + atlas.height, u2, v2,
+                             x, y + atlas.height, u3, v3))
+            first = index * 4
+            indices.extend((first, first + 1, first + 2, first + 2, first + 3, first))
+        self.mesh.vertices = vertices
+        self.mesh.indices = indices
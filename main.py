@@ -3,542 +3,107 @@
 # acts as css. Kivy also allows this project to be exported to files compatible with iOS and android, which would not
 # be possible since they require Swift and Java, respectively.
 
-# import the math and random packages
-import math
-import random
+# import the start up trace first and start it, so the time every other import takes is measured
+from startup import StartupTrace
+startup_trace = StartupTrace()
 
-# import App, Window, Clock, SoundLoader, JsonStore, NumericProperty, ObjectProperty, StringProperty, Button,
-# FloatLayout, Image, Label, and Widget from kivy
+# import math to size the idle ticks and os to read the environment and build file paths
+import math
+import os
+
+# import the game rules, which run without kivy
+from world import STEP, World
+# import the fixed timestep that steps the world 60 times per second whatever the frame rate
+from timestep import FixedTimestep, interpolate
+# import the renderer that draws every balloon and pop image with a few draw calls
+from sprite_batch import BatchRenderer
+# import the sprites that draw the pig and the tap to start image without widget properties
+from sprite import Sprite, SpriteLayer
+# import the scrolling cloud layers drawn behind the balloons
+from cloud_layers import CloudLayers
+# import where the clouds are drawn between the last two steps
+from cloud_scroll import cloud_position
+# import the bitmap font labels of the HUD
+from glyph_font import BitmapLabel, GlyphAtlas
+# import the events of the game and the bus that hands them out
+from game_events import (BalloonMissed, BalloonPopped, BalloonsCleared, BalloonSpawned, BonusLives, EventBus, GameOver,
+                         QualityChanged, RoundReady, RoundStarted)
+# import the registry that removes every sprite and its scheduled callbacks exactly once
+from entities import EntityRegistry, RoundEntities
+# import the texture bank that loads every image when the app starts. Everything only needed once the game is played
+# (the sound bank, the score history, the particle emitter, the round recorder, the quality governor, and the gc
+# policy) is imported after the title menu is on the screen (see load_gameplay). The profiler, the replay player, and
+# the scene buffer are only imported when they are turned on.
+from assets import TextureBank
+
+# import App, Window, Clock, Logger, Rectangle, Button, FloatLayout, Image, Widget, and sp from kivy
 from kivy.app import App
 from kivy.core.window import Window
 from kivy.clock import Clock
-from kivy.core.audio import SoundLoader
-from kivy.storage.jsonstore import JsonStore
-from kivy.properties import NumericProperty, StringProperty
+from kivy.logger import Logger
+from kivy.graphics import Rectangle
 from kivy.uix.button import Button
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.image import Image
-from kivy.uix.label import Label
 from kivy.uix.widget import Widget
+from kivy.metrics import sp
 # import Config from kivy (recommended for testing app in a desired screen size)
 # used for testing: from kivy.config import Config
 
-# GLOBAL VARIABLES
-# creates a json file named 'popper_pig.json' in the device's local memory and can be referenced by code with the
-# variable store
-store = JsonStore('popper_pig.json')
-# balloonSpeed tells the balloons how many pixels it should move per frame
-balloonSpeed = 5
-# the amount of pixels balloons are vertically spaced apart
-balloonIncline = 0
-# balloons travel toward a y destination set by the balloon spawner. Once a balloon reaches the y destination
-# a new random destination is selected. This creates a wave of balloons always heading to a destination.
-# Tells the balloon spawner if the balloon should head "down", "up", or "initialize" the spawner with a starting
-# direction
-balloonSpawnHeading = "initialize"
-# the y coordinate the wave of balloons move to
-balloonYDestination = 0
-# keeps record of the last the y position of the last balloon spawned
-balloonYSpawn = 0
-# height of balloons
-balloonHeight = 0
-# width of balloons
-balloonWidth = 0
-# distance since the last balloon spawned. Allows for spacing between balloon spawns.
-distSinceLastSpawn = 0
-# x and y positions of the pig (player)
-pigX = 0
-pigY = 0
-# height of the pig
-pigHeight = 0
-# pops the player accumulates during gameplay by colliding the pig with the balloons
-popCount = 0
-# best pop count ever achieved in a single game. This value is set from the 'popper_pig.json' file
-bestPopCount = 0
-# amount of balloons missed during gameplay. Raised by balloons moving off the left side of the screen.
-missCount = 0
-# number of misses allowed. Once misses reaches this allowance the game ends.
-missesAllowed = 10
-# tells the game if the user clicked out of the main menu and can start the gameplay action
-gameStage = "menu"
-
-
-# STEP 3: Create classes that build objects within the game
-# inherits the background as a Widget. See the corresponding main.kv file.
+startup_trace.mark("imports")
+
+
+# STEP 3: Create classes that draw objects within the game. What the objects do is decided by the World in world.py.
+# the sky behind everything. It used to be a rule in main.kv, but parsing kv files slowed down the start of the app,
+# so the rectangle is made here.
 class Background(Widget):
-    # the background does nothing so this class is passed. However, kivy still requires the structure of a widget
-    # so this class is still necessary.
-    pass
+    # texture is the background image loaded by the texture bank. It is stretched over the whole widget.
+    def __init__(self, texture, **kwargs):
+        super().__init__(**kwargs)
+        with self.canvas.before:
+            self.rectangle = Rectangle(texture=texture, size=self.size)
+        self.bind(size=self.resize)
 
+    # the background fills the screen whatever its size
+    def resize(self, *ignore):
+        self.rectangle.size = self.size
 
-# structures a FloatLayout layer that is spawned above the background. The clouds are spawned in this layout to ensure
-# the clouds spawn behind important objects such as the pig and balloons
-class CloudLayout(FloatLayout):
-    # initialize the CloudLayout with the parameters defined by the parent FloatLayout class. **kwargs allows for kivy
-    # to pass an undefined number of arguments
-    def __init__(self, **kwargs):
-        # enables access to properties and methods to its parent class
-        super(CloudLayout, self).__init__(**kwargs)
-        # starts a clock the spawns a cloud every 2 seconds
-        Clock.schedule_interval(self.spawn_cloud, 2.)
-
-    # method that spawns a cloud. time_passed is a required parameter that is always passed by kivy in any Clock
-    def spawn_cloud(self, time_passed):
-        # creates a cloud object
-        cloud = Cloud()
-        # adds the cloud object to the CloudLayout canvas
-        self.add_widget(cloud)
-
-
-# structures a Widget as clouds. See the corresponding cloud.kv file.
-class Cloud(Widget):
-    # defaults width, height, x, and y attributes to 0 with the type NumericProperty. Attributes that are referenced in
-    # .kv files must be NumericProperty or StringProperty type to be recognized
-    myWidth = NumericProperty(0)
-    myHeight = NumericProperty(0)
-    position_x = NumericProperty(0)
-    position_y = NumericProperty(0)
-    # defaults the base cloud movement speed to 0
-    moveSpeed = NumericProperty(0)
-    # defaults the cloud's image source to a blank file. StringProperty tells .kv that the attribute is a string that
-    # is updated with python code
-    mySource = StringProperty("")
-
-    # all new Cloud objects are initialized with the following:
-    def __init__(self, **kwargs):
-        # enables access to properties and methods to its parent class
-        super(Cloud, self).__init__(**kwargs)
-        # enables access to the global variable, balloonSpeed
-        global balloonSpeed
-        # randomly sets the cloud's height between 10-50% of the screen height
-        self.myHeight = Window.height * random.randint(10, 50) / 100  # .01 0.5 very small to half the screen
-        # preserves the height and width ratio of the original cloud_1.ong file. cloud_2.png has similar dimension that
-        # it can be set to the same ratio as cloud_1.png
-        self.myWidth = self.myHeight * (690 / 343)
-        # the position at the bottom-left of a widget is (0,0). Spawns the cloud off the right side of the screen.
-        self.position_x = Window.width
-        # sets a random y position between off the bottom of the screen to off the top of the screen
-        self.position_y = random.randint(int(-self.myHeight), int(Window.height))
-        # sets the base movement speed of the clouds to and random number between 10% and 150% the of initial balloon
-        # speed. This number does not accelerate with the game.
-        self.moveSpeed = random.randint(int((balloonWidth / 48.467) * 1), int((balloonWidth / 48.467) * 7.5))
-        # randomly sets the image of the cloud to 1 of 4 cloud images
-        self.mySource = "Assets/cloud_" + str(random.randint(1, 4)) + ".png"
-        # randomly sets opacity of the cloud between 1% and 50%
-        self.opacity = random.randint(1, 50) / 100
-        # starts a personal clock that moves the cloud 60 frames per second
-        Clock.schedule_interval(self.move_cloud, 1 / 60.)
-
-    # method executed 60fps to move the cloud widget
-    def move_cloud(self, time_passed):
-        global balloonSpeed
-        # moves the cloud left the amount the balloons are moving plus the default movement speed of the cloud
-        self.position_x -= (balloonSpeed + self.moveSpeed)
-        # if the cloud is off the left of the screen
-        if self.position_x <= -self.myWidth:
-            # stop running the clock. Clocks are demanding to the computer and becomes very laggy if clocks continue
-            # to run.
-            Clock.unschedule(self.move_cloud)
-            # remove the cloud off the screen
-            self.parent.remove_widget(self)
-            # delete this object from memory
-            del self
-
-
-# structures a widget as the tutorial image showing the user how to raise the pig. Additionally, this object is used
-# to start the game action. See taptostart.kv
-class TapToStart(Widget):
-    # define and default to 0 the attributes that are used in this class's .kv file
-    myWidth = NumericProperty(0)
-    myHeight = NumericProperty(0)
-    position_x = NumericProperty(0)
-    position_y = NumericProperty(0)
-
-    # all new TapToStart objects are initialized with the following:
-    def __init__(self, **kwargs):
-        # enables access to properties and methods of the parent class
-        super(TapToStart, self).__init__(**kwargs)
-        # sets the height of the image to half of the screen height
-        self.myHeight = Window.height * 0.5
-        # makes the image a square by setting it to the same width as the height
-        self.myWidth = self.myHeight
+
+# the tutorial image showing the user how to raise the pig. The round starts with the next press on the screen. It is
+# a sprite drawn by MainGame's sprite layer.
+class TapToStart(Sprite):
+    __slots__ = ()
+
+    # texture is the atlas texture and region the part of it with the tutorial image
+    def __init__(self, texture, region):
+        # sets the height of the image to half of the screen height and makes the image a square by setting it to the
+        # same width as the height
+        height = Window.height * 0.5
         # centers the object in the middle of the screen
-        self.position_x = Window.width / 2 - self.myWidth / 2
-        self.position_y = Window.height / 2 - self.myHeight / 2
+        super().__init__(texture, region, Window.width / 2 - height / 2, Window.height / 2 - height / 2, height, height)
 
-    # When the screen is touched anywhere: resets game if game was played before. Sets up variables if first game.
-    def on_touch_down(self, touch):
-        # give access to modify the following global variables:
-        global gameStage, balloonSpeed, popCount, missCount, missesAllowed, distSinceLastSpawn, balloonSpawnHeading
-        # reset the balloons to move 5px 60fps. This portion -> (balloonWidth / 48.467) <- equals 1 in the testing
-        # environment and changes proportional to the size of the reformatted game window. This lets the game play
-        # the same on numerous devices. This tactic is used frequently throughout all code below.
-        balloonSpeed = 5 * (balloonWidth / 48.467)
-        # reset global variables
-        popCount = 0
-        missCount = 0
-        missesAllowed = 10
-        distSinceLastSpawn = 0
-        # start spawning using the method ask_balloon_spawner
-        Clock.schedule_interval(self.parent.ask_balloon_spawner, 1 / 60.)
-        # allow for the destination to be randomly chosen when the game starts
-        balloonSpawnHeading = "initialize"
-        # set the gameStage to be in game
-        gameStage = "inGame"
-        # remove this object from the parent widget
-        self.parent.remove_widget(self)
-        # delete this object from memory
-        del self
-
-
-# This is the main character. It is a widget that corresponds to the pig.kv file.
-class Pig(Widget):
-    # define and default to 0 the attributes that are used in this class's .kv file
-    myHeight = NumericProperty(0)
-    myWidth = NumericProperty(0)
-    position_x = NumericProperty(0)
-    position_y = NumericProperty(0)
-    # how fast the pig moves. Positive velocity = up. Negative = down.
-    velocity = NumericProperty(0)
-
-    # all new pig objects are initialized with the following:
-    def __init__(self, **kwargs):
-        # sets the height of the pig to be 10.38% of the screen's height. This multiplier was obtained by drawing out
-        # the desired final product in photoshop and calculating how much the pig took up of the screen's height.
-        self.myHeight = Window.height * 0.1038
-        # access global variables
-        global pigHeight, pigX, pigY
-        # set the global variable pig height to the pig's height. This lets other objects access the pig's height.
-        pigHeight = self.myHeight
-        # ensures the width and height of the pig maintain the same ratio as the pig.png file
-        self.myWidth = (234 / 171) * self.myHeight
-        # places the left side of the pig half of a pig's width from the left side of the screen
-        self.position_x = self.myWidth / 2
-        # tells the rest of the game where the pig's x position is
-        pigX = self.position_x
-        # sets the starting y position of the pig to the middle
-        self.position_y = Window.height / 2
-        # tells the rest of the game where the pig's y position is
-        pigY = self.position_y
-        # enables access to properties and methods of the parent class
-        super().__init__(**kwargs)
 
-    # runs 60fps if touch is up. Lowers the velocity of the pig.
-    def accelerate_down(self, time_passed):
-        # gain access to global variables
-        global balloonSpeed, gameStage, balloonHeight, pigY
-        # if balloonSpeed is 0. (flooring balloonSpeed is required because extra frames could be run in clocks making
-        # balloonSpeed actually 0.002ish.
-        if math.floor(balloonSpeed) == 0:
-            # game must be over. Call the destroy pig method.
-            self.destroy_pig()
-        # Pig was not destroyed. Two things impact pig's ability to accelerate: balloonSpeed and screenSize. The first
-        # part of the max function subtracts 0.262 at the starting game speed of 5. As the game speeds up, the ability
-        # for the pig to accelerate increases proportionally, allowing for the same game to be played a faster speed.
-        # The second part of the max function acts as a cap to how fast the pig can accelerate, otherwise the pig will
-        # shoot to the center of the earth.
-        self.velocity = max(self.velocity - (balloonSpeed / 5) * 0.262,
-                            (balloonSpeed / 5) * -10)
-        # now that the new velocity is calculated, add the velocity to y. Velocity can be positive or negative
-        # depending on how far one way the pig was moving.
-        self.position_y += self.velocity
-        # update the global variable pigY
-        pigY = self.position_y
-
-    # runs 60fps if touch is down. Raises the velocity of the pig.
-    def accelerate_up(self, time_passed):
-        # gain access to global variables
-        global balloonSpeed, gameStage, pigY
-        # if balloonSpeed is 0. (flooring balloonSpeed is required because extra frames could be run in clocks making
-        # balloonSpeed actually 0.002ish.
-        if math.floor(balloonSpeed) == 0:
-            # game must be over. Call the destroy pig method.
-            self.destroy_pig()
-        # Pig was not destroyed. Two things impact pig's ability to accelerate: balloonSpeed and screenSize. The first
-        # part of the max function adds 0.262 at the starting game speed of 5. As the game speeds up, the ability
-        # for the pig to accelerate increases proportionally, allowing for the same game to be played a faster speed.
-        # The second part of the max function acts as a cap to how fast the pig can accelerate, otherwise the pig will
-        # shoot to the moon.
-        self.velocity = min(self.velocity + (balloonSpeed / 5) * 0.262, (balloonSpeed / 5) * 10)
-        # now that the new velocity is calculated, add the velocity to y. Velocity can be positive or negative
-        # depending on how far one way the pig was moving.
-        self.position_y += self.velocity
-        # update the global variable pigY
-        pigY = self.position_y
-
-    # method that always listens for a touch to be down and executes once a touch is placed anywhere on screen
-    def on_touch_down(self, touch):
-        # if the game is not over
-        if math.floor(balloonSpeed) != 0:
-            # stop the clock causing the pig to accelerate down
-            Clock.unschedule(self.accelerate_down)
-            # start the clock that causes the pig to accelerate up
-            Clock.schedule_interval(self.accelerate_up, 1 / 60)
-
-    # method that always listens for a touch to be released and executes upon release
-    def on_touch_up(self, touch):
-        # if the game is not over
-        if math.floor(balloonSpeed) != 0:
-            # stop the clock that causes the pig to accelerate up
-            Clock.unschedule(self.accelerate_up)
-            # start the clock that causes the pig to accelerate down
-            Clock.schedule_interval(self.accelerate_down, 1 / 60)
-
-    # destroys the pig when the game is over
-    def destroy_pig(self):
-        # stop accelerating clocks if they're running
-        Clock.unschedule(self.accelerate_down)
-        Clock.unschedule(self.accelerate_up)
-        # remove the pig from the parent layout
-        self.parent.remove_widget(self)
-        # delete the pig object from memory
-        del self
-
-
-# constructs balloons that can be popped by the main character. It is a widget that corresponds to the balloon.kv file
-class Balloon(Widget):
-    # defaults attributes to 0 or an empty string that are referenced by balloon.kv
-    position_x = NumericProperty(0)
-    position_y = NumericProperty(0)
-    myHeight = NumericProperty(0)
-    myWidth = NumericProperty(0)
-    mySource = StringProperty("")
-
-    # initialize balloon objects
-    def __init__(self, **kwargs):
-        # global variables used in this method
-        global balloonYSpawn, balloonWidth, balloonHeight
-        # set their x position to be off the screen on the right
-        self.position_x = Window.width
-        # sets y position to the global variable balloonYSpawn
-        self.position_y = balloonYSpawn
-        # makes balloon 1 of 4 colors
-        self.mySource = "Assets/balloon_" + str(random.randint(1, 4)) + ".png"
-        # sets width and height based on already calculated values
-        self.myWidth = balloonWidth
-        self.myHeight = balloonHeight
-        # check if the balloons surpassed their destination or do not have a target
-        if balloonSpawnHeading == "initialize":
-            # not yet defined a direction where their destination is so get a new destination
-            self.get_new_destination()
-        elif (balloonSpawnHeading == "up") and (balloonYSpawn > balloonYDestination):
-            # balloon surpassed destination going up so get a new destination
-            self.get_new_destination()
-        elif (balloonSpawnHeading == "down") and (balloonYSpawn < balloonYDestination):
-            # balloon surpassed destination going down so get a new target
-            self.get_new_destination()
-        else:
-            # balloon did not surpass a destination so move the balloon Y toward the destination
-            self.move_y_toward_destination()
-        # set the y position of the balloon to be accessed globally
-        self.position_y = balloonYSpawn
-        # start clock to move the balloon 60fps.
-        Clock.schedule_interval(self.move_balloon, 1 / 60.)
-        # enable access to properties and methods of the parent class
-        super().__init__(**kwargs)
+# This is the main character. It is a sprite drawn by MainGame's sprite layer where the world says the pig is.
+class Pig(Sprite):
+    __slots__ = ()
 
-    # method ran 60fps that moves the balloon
-    def move_balloon(self, time_passed):
-        global balloonSpeed
-        # is the game over?
-        if math.floor(balloonSpeed) == 0:
-            # clear the balloon from the screen without a pop effect
-            Clock.schedule_once(self.destroy_without_pop, 0.5)
-        # is this balloon visible?
-        if self.position_x < -self.myWidth:
-            # This is how only balloon objects must reference their parent since the self.parent method flipped back to
-            # referencing None rather than the actual parent FloatLayout from main.kv
-            # define a variable set to be blank
-            my_parent = None
-            # if the parent is not none
-            if self.parent is not None:
-                # set the parent variable to it
-                my_parent = self.parent
-            # if the parent variable is not none
-            if my_parent is not None:
-                # This balloon was missed. Add it to the misses.
-                global missCount
-                missCount += 1
-                # load the pop sound
-                sound = SoundLoader.load("Audio/miss.wav")
-                # the sound shouldn't play on a loop
-                sound.loop = False
-                # play the sound full volume
-                sound.volume = 1
-                # play the sound through the device
-                sound.play()
-                # stop the clock responsible for moving the balloon
-                Clock.unschedule(self.move_balloon)
-                # remove the balloon from the screen
-                my_parent.remove_widget(self)
-                # remove the balloon object from memory
-                del self
-        # balloon is not off the screen
-        else:
-            # move the balloon left
-            self.position_x -= balloonSpeed
-            # check if the balloon is popped by the pig
-            self.check_balloon_pop()
-
-    # checks if the balloon collided with the pig
-    def check_balloon_pop(self):
-        # global variables used in this method
-        global pigX, pigHeight, balloonSpeed, popCount
-        # is the balloon within the left and right bounds of the pig Widget?
-        if (self.position_x <= (pigX + (234 / 171) * pigHeight)) and (self.position_x >= 0):
-            # is the balloon within the top and bottom bounds of the pig Widget?
-            if (pigY / 1.1 <= self.position_y <= pigY + pigHeight) * 1.1:
-                # speed up the game. Multiplying by balloonWidth ensures the game accelerates proportionally to device
-                # size
-                balloonSpeed += balloonWidth * .00025
-                # load the pop sound
-                sound = SoundLoader.load("Audio/pop2.wav")
-                # don't loop the sound
-                sound.loop = False
-                # add a variety to popping noises by making the pitch a random level between .8 and 2. The default
-                # pitch is 1.
-                sound.pitch = random.randint(8, 20) / 10
-                # set the volume of the sound
-                sound.volume = 1
-                # play the sound through the device
-                sound.play()
-                # add 1 to the pop count
-                popCount += 1
-                # remove the balloon with the following steps. Set the parent variable to none.
-                my_parent = None
-                # if the parent isn't none
-                if self.parent is not None:
-                    # set the variable to the parent
-                    my_parent = self.parent
-                # if the parent isn't none
-                if my_parent is not None:
-                    # stop the clock responisble for moving the balloon
-                    Clock.unschedule(self.move_balloon)
-                    # create the pop image that appears where the balloon is popped. The balloon's x, y, width, and
-                    # height are passed into the constructor.
-                    pop = PopImage(self.position_x, self.position_y, self.myWidth, self.myHeight)
-                    # add the pop object to the parent
-                    my_parent.add_widget(pop)
-                    # remove the balloon from the parent
-                    my_parent.remove_widget(self)
-                # delete this object from memory
-                del self
-
-    # method called when a balloon surpasses its destination or the destination needs initialized
-    def get_new_destination(self):
-        global balloonYDestination, balloonYSpawn, balloonSpawnHeading, balloonIncline
-        # to get to the next destination how steep should the balloons climb? They can climb from a random number
-        # between 20-80% of the balloon's height
-        balloonIncline = random.randint(int(self.myHeight / 5), int(self.myHeight * 0.8))
-        # sets a new balloon destination
-        balloonYDestination = random.randint(math.floor(Window.height * 0.2), math.floor(Window.height * 0.7))
-        # if the destination is greater than where the balloons are currently spawning, spawn down
-        if balloonYSpawn > balloonYDestination:
-            # balloon is higher than the destination, start spawning down
-            balloonSpawnHeading = "down"
-        else:
-            # balloon is lower than the destination, start spawning up
-            balloonSpawnHeading = "up"
-
-    # method called when the balloon has not reached its destination yet
-    def move_y_toward_destination(self):
-        global balloonYSpawn
-        # if the balloons are moving up to the destination
-        if balloonSpawnHeading == "up":
-            # increase in y position
-            balloonYSpawn += balloonIncline
-        # balloons are moving down toward the destination
-        else:
-            # move down in y position
-            balloonYSpawn -= balloonIncline
-
-    # method called and after 0.5 seconds triggers the balloon to be destroyed without a pop icon or sound
-    def destroy_without_pop(self, time_passed):
-        # creates an empty variable
-        my_parent = None
-        # if the parent isn't none
-        if self.parent is not None:
-            # set the parent variable to the parent
-            my_parent = self.parent
-        # if the parent variable isn't none
-        if my_parent is not None:
-            # unschedule the clock to move the balloon
-            Clock.unschedule(self.move_balloon)
-            # remove the balloon from the layout
-            self.parent.remove_widget(self)
-            # delete the object from memory
-            del self
-
-
-# image that displays the cartoon-like pop for a split-second after a balloon pops. See the corresponding popimage.kv
-# file.
-class PopImage(Widget):
-    # create attribute referenced in popimage.kv
-    position_x = NumericProperty(0)
-    position_y = NumericProperty(0)
-    myHeight = NumericProperty(0)
-    myWidth = NumericProperty(0)
-    myAngle = NumericProperty(0)
-
-    # initialize new balloon objects. Receives the x, y, width, and height of the balloon that is calling on the
-    # creation of this pop image.
-    def __init__(self, parent_pos_x, parent_pos_y, parent_width, parent_height, **kwargs):
-        # enables access to the parent class's methods and properties
-        super().__init__(**kwargs)
-        # Height of the balloon image multiplied by the ratio of pixelHeight_pop_image:pixelHeight_balloon_image
-        # gives the adjusted height of the pop image. Keeps original width:height ratio.
-        self.myHeight = parent_height * (84 / 103)
-        self.myWidth = parent_width * (92 / 87)
-        # spawn the object in the same position the parent balloon was popped
-        self.position_x = parent_pos_x
-        self.position_y = parent_pos_y
-        # move the pop image at the rate the balloons are moving
-        Clock.schedule_interval(self.move, 1 / 60.)
-        # destroy after .1 second
-        Clock.schedule_once(self.destroy, 0.1)
-
-    # method for moving the balloon called 60fps.
-    def move(self, time_passed):
-        # move the balloon left at the rate the balloons are moving
-        self.position_x -= balloonSpeed
-
-    # method for destroy the image after 0.1 seconds
-    def destroy(self, time_passed):
-        # stop running the clock for moving the balloon pop image
-        Clock.unschedule(self.move)
-        # tell the parent to remove this widget
-        self.parent.remove_widget(self)
-        # delete this object from memory
-        del self
+    # all new pigs are initialized with the size and position of the world's pig. texture is the atlas texture and
+    # region the part of it with the pig.
+    def __init__(self, world, texture, region):
+        super().__init__(texture, region, world.pig_x, world.pig_y, world.pig_width, world.pig_height)
 
 
 # this class builds the status bar at the top of the screen. It displays icons and labels of the pop count, best pop
-# count, and the amount of balloons missed. See the corresponding popcount.kv file.
+# count, and the amount of balloons missed. The icons never move, so they are plain rectangles (they used to be a rule
+# in popcount.kv).
 class PopCount(Widget):
-    # create attributes referenced in the popcount.kv files
-    # attributes for the pop count icon
-    pop_position_x = NumericProperty(0)
-    pop_position_y = NumericProperty(0)
-    popWidth = NumericProperty(0)
-    popHeight = NumericProperty(0)
-    # attributes for the miss count icon
-    miss_position_x = NumericProperty(0)
-    miss_position_y = NumericProperty(0)
-    missWidth = NumericProperty(0)
-    missHeight = NumericProperty(0)
-    # attribute for how wide the textbox for the pop count is
-    pop_label_width = NumericProperty(0)
-
-    # initialize the widget and add labels to it
-    def __init__(self, **kwargs):
+    # initialize the widget and add labels to it. world is the game whose counts are shown. pop_icon and miss_icon are
+    # the textures of the icons in the atlas.
+    def __init__(self, world, pop_icon, miss_icon, **kwargs):
         # access methods and properties of the parent class
         super(PopCount, self).__init__(**kwargs)
-        global popCount, missCount, missesAllowed, bestPopCount
+        self.world = world
 
-        # every 50 pops, 10 more misses are allowed. When these lives are added this variable because True to prevent
-        # the game from adding more lives since a clock checks if the pig popped 50 balloons 60fps and would continue
-        # adding lives until another balloon is popped.
-        self.added_lives = False
         # the pop icon y position is located roughly 8% down from the top of the screen
         self.pop_position_y = Window.height - Window.height * .0846
         # the pop icon height is 7% of screen height
@@ -551,30 +116,16 @@ class PopCount(Widget):
         # sets the width of the pop count text box proportional to the its icon's width, which is proportional to the
         # device size
         self.pop_label_width = 350 * self.popWidth / 54.5836
-        # create a Label object with pre-set attributes
-        self.pop_label = Label(
-            # the label is located to the right of the pop icon with a 40% margin. It has the same y pos as the icon.
-            pos=(self.pop_position_x + self.popWidth * 1.4, self.pop_position_y),
-            # the text this label says is the pop count
-            text=str(popCount),
-            # set the text box to the size of the calculated label width and the height the same height as the icon.
-            size=(self.pop_label_width, self.popHeight),
-            # the size of the text is the same as the line above. These two lines create the text box.
-            text_size=(self.pop_label_width, self.popHeight),
-            # since the game is written in a FloatLayout kivy likes to know if the object should be position between
-            # 0-100% from the right size of the screen, this is the size hint. Since we know the exact x position,
-            # that is already proportional to device size pass in None.
-            size_hint_x=None,
-            # 23sp size of the text in the testing environment. This text size is proportional to the height of
-            # of the screen.
-            font_size=str(23 * self.popWidth / 54.5836) + "sp",
-            # sets the font to a pixelated arcade font located in this projects directory
-            font_name="PressStart2P.ttf",
-            # align text to the left of the text area horizontally
-            halign='left',
-            # align text to the center of the text area vertically
-            valign='center'
-        )
+        # draw every character the labels show once, in a pixelated arcade font located in this projects directory.
+        # 23sp size of the text in the testing environment for the counts and 14sp for the best pop count. The text
+        # size is proportional to the height of the screen.
+        self.count_glyphs = GlyphAtlas("PressStart2P.ttf", sp(23 * self.popWidth / 54.5836))
+        self.best_glyphs = GlyphAtlas("PressStart2P.ttf", sp(14 * self.popWidth / 54.5836))
+        # create the pop count label. It is located to the right of the pop icon with a 40% margin and has the same y
+        # pos as the icon. The text box is the calculated label width wide and the same height as the icon.
+        self.pop_label = BitmapLabel(self.count_glyphs, pos=(self.pop_position_x + self.popWidth * 1.4,
+                                                             self.pop_position_y),
+                                     size=(self.pop_label_width, self.popHeight))
 
         # spawns the miss icon left of the label with a 20% margin
         self.miss_position_x = self.pop_position_x + self.pop_label_width * 1.2
@@ -584,119 +135,147 @@ class PopCount(Widget):
         self.missWidth = self.popWidth
         # sets the miss icon height to the same value as the pop height
         self.missHeight = self.popHeight
-
-        # creates a label with pre-set attributes
-        self.misses_label = Label(
-            # the label is located to the right of the pop label with a 40% margin. It has the same y pos as the icon.
-            pos=(self.miss_position_x + self.missWidth * 1.4, self.miss_position_y),
-            # concatenates the miss count with a "/" and the miss allowed
-            text=str(missCount) + "/" + str(missesAllowed),
-            # width and height of textbox set to the same value as the pop count text box.
-            size=(self.pop_label_width, self.popHeight),
-            # same as size of the label. Creates the textbox.
-            text_size=(self.pop_label_width, self.popHeight),
-            # since the game is written in a FloatLayout kivy likes to know if the object should be position between
-            # 0-100% from the right size of the screen, this is the size hint. Since we know the exact x position,
-            # that is already proportional to device size pass in None.
-            size_hint_x=None,
-            # 23sp size of the text in the testing environment. This text size is proportional to the height of
-            # of the screen.
-            font_size=str(23 * self.popWidth / 54.5836) + "sp",
-            # sets the font to a pixelated arcade font located in this projects directory
-            font_name="PressStart2P.ttf",
-            # align text to the left of the text area horizontally
-            halign='left',
-            # align text to the center of the text area vertically
-            valign='center'
-        )
-        # creates the best pop count label
-        self.best_label = Label(
-            # located at the same x position at the pop icon and beneath the pop icon.
-            pos=(self.pop_position_x, self.pop_position_y - self.popHeight),
-            # displays the text Best: bestPopCount
-            text=str("Best:" + str(bestPopCount)),
-            # creates the textbox size as the same as the pop count label's textbox
-            size=(self.pop_label_width, self.popHeight),
-            # creates the textbox size as the same as the pop count label's textbox
-            text_size=(self.pop_label_width, self.popHeight),
-            # do not place the x position proportional to the device size since it is already hard-coded into an x
-            # value
-            size_hint_x=None,
-            # set the font size to be smaller than the pop count label and make it proportional to the device size
-            font_size=str(14 * self.popWidth / 54.5836) + "sp",
-            # sets the font to a pixelated arcade font located in this projects directory
-            font_name="PressStart2P.ttf",
-            # align text to the left of the text area horizontally
-            halign='left',
-            # align text to the center of the text area vertically
-            valign='center',
-            # set the color of the font to white
-            color=(1, 1, 1, 1)
-        )
+        # draw the pop icon and the miss icon
+        with self.canvas.before:
+            Rectangle(texture=pop_icon, pos=(self.pop_position_x, self.pop_position_y),
+                      size=(self.popWidth, self.popHeight))
+            Rectangle(texture=miss_icon, pos=(self.miss_position_x, self.miss_position_y),
+                      size=(self.missWidth, self.missHeight))
+
+        # creates the misses label to the right of the miss icon with a 40% margin. Same text box as the pop count.
+        self.misses_label = BitmapLabel(self.count_glyphs, pos=(self.miss_position_x + self.missWidth * 1.4,
+                                                                self.miss_position_y),
+                                        size=(self.pop_label_width, self.popHeight))
+        # creates the best pop count label at the same x position at the pop icon and beneath the pop icon
+        self.best_label = BitmapLabel(self.best_glyphs, pos=(self.pop_position_x, self.pop_position_y - self.popHeight),
+                                      size=(self.pop_label_width, self.popHeight))
         # add the labels and icons to the canvas
         self.add_widget(self.best_label)
         self.add_widget(self.pop_label)
         self.add_widget(self.misses_label)
-        # start a clock to continuously update the text of the labels
-        Clock.schedule_interval(self.update_text, 1 / 60.)
-
-    # clock that updates the labels 60fps.
-    def update_text(self, time_passed):
-        global popCount, bestPopCount, missesAllowed
+        # show the counts the game starts with
+        self.best_label.set_text("Best:" + str(world.best_pop_count))
+        self.refresh()
+
+    # called when a balloon is popped or missed, lives are added, or a round starts or ends to update the labels. Only
+    # the labels whose text changed are redrawn. Returns how many labels changed.
+    def refresh(self):
+        world = self.world
         # if the game is just starting/reset
-        if popCount == 0:
+        if world.pop_count == 0:
             # set the best label text to white
-            self.best_label.color = (1, 1, 1, 1)
-        # update the pop count label to the pop count
-        self.pop_label.text = str(popCount)
-        # update the miss count label to the misscount
-        self.misses_label.text = str(missCount) + "/" + str(missesAllowed)
-        # gain 10 misses allowed every 50 pops
-        if popCount % 50 == 0 and popCount != 0 and not self.added_lives:
-            # prevent extra lives from adding since this is looped 60fps
-            self.added_lives = True
-            # play a bonus sound when lives are added
-            sound = SoundLoader.load("Audio/bonus.wav")
-            sound.loop = False
-            sound.volume = 1
-            sound.play()
-            # add lives
-            missesAllowed += 10
-            # set the misses label color to green
-            self.misses_label.color = (0, .85, 0, 1)
-            # schedule the mises label color to revert back to white 0.1 seconds later
-            Clock.schedule_once(self.ungreen_label, 0.1)
-        # if lives were added and the pop count no longer is a multiple of 50
-        if popCount % 50 != 0 and self.added_lives:
-            # change added lives back to False
-            self.added_lives = False
+            self.best_label.color.rgba = (1, 1, 1, 1)
+        pop_text, misses_text, best_text = world.hud_text()
+        # update the pop count label to the pop count and the miss count label to the misscount
+        changed = self.pop_label.set_text(pop_text) + self.misses_label.set_text(misses_text)
         # if the pop count is greater than the best score
-        if popCount > bestPopCount:
+        if best_text is not None:
             # change the best pop count label to gold
-            self.best_label.color = (.9, .85, .05, 1)
+            self.best_label.color.rgba = (.9, .85, .05, 1)
             # update the best pop count label to update with the pop count
-            self.best_label.text = "Best:" + str(popCount)
+            changed += self.best_label.set_text(best_text)
+        return changed
+
+    # the glyph textures drawn for HUDs so far and how many times this HUD's labels changed
+    def stats(self):
+        return {"texture_uploads": GlyphAtlas.uploads,
+                "text_updates": self.pop_label.updates + self.misses_label.updates + self.best_label.updates}
+
+    # called when 10 more misses are allowed. Flashes the misses label green. MainGame schedules ungreen_label to turn
+    # it back 0.1 seconds later.
+    def show_bonus(self):
+        # set the misses label color to green
+        self.misses_label.color.rgba = (0, .85, 0, 1)
 
     # method that reverts the misses label color back to white
     def ungreen_label(self, time_passed):
         # change text back to white
-        self.misses_label.color = (1, 1, 1, 1)
+        self.misses_label.color.rgba = (1, 1, 1, 1)
 
 
-# STEP 2: Create the game window. See the corresponding main.kv file.
+# STEP 2: Create the game window. The app has no kv files: every widget and rectangle is made in python, so no kv
+# rules are parsed while the app starts.
 class MainGame(FloatLayout):
     # initializes the game when the app is started
     def __init__(self, **kwargs):
         # accesses properties and methods from FloatLayout
         super().__init__(**kwargs)
-        global bestPopCount, store
-        # create a cloud layout layer where all the clouds will be spawned (this will be above the sky background)
-        cloud_layout = CloudLayout()
-        self.add_widget(cloud_layout)
-        # in the json file set as store in global variables, get the best score value saved to local memory in at the
-        # key 'bestScore'
-        bestPopCount = store.get('bestScore')[
-            'best']
+        # the game itself. MainGame draws what the world says and tells it when the screen is touched.
+        self.world = World(Window.width, Window.height)
+        # every game finished on this device is saved in the score history, which knows the best score, and every sound
+        # effect is played by the sound bank. Neither is needed by the title menu, so they are loaded once it is on the
+        # screen (see load_gameplay).
+        self.score_history = None
+        self.sound_bank = None
+        self.gameplay_loaded = False
+        # True while the screen is touched. Passed to the world every step.
+        self.touch_pressed = False
+        # True if the screen was touched since the last step, so a tap shorter than a step still reaches the world
+        self.touch_started = False
+        # decides how many times the world steps each frame
+        self.timestep = FixedTimestep()
+        # every image was loaded by the app before the game was built. Sprites are drawn from the atlas texture and
+        # refer to their image by its index in the atlas.
+        texture_bank = App.get_running_app().texture_bank
+        self.sprite_regions = texture_bank.regions
+        # the atlas index of each balloon color and of the pop image
+        self.balloon_regions = [texture_bank.index("balloon_" + str(colour)) for colour in range(1, 5)]
+        self.pop_region = texture_bank.index("pop")
+        # bake the cloud layers drawn above the sky background and behind important objects such as the pig and
+        # balloons. How many layers and how sharp they are is set in the graphics section of the app's settings.
+        config = App.get_running_app().config
+        # the sky is drawn behind everything
+        self.background = Background(texture_bank.textures[os.path.join("Assets", "background.png")])
+        self.add_widget(self.background)
+        self.cloud_layers = CloudLayers(texture_bank.texture, self.sprite_regions,
+                                        [texture_bank.index("cloud_" + str(number)) for number in range(1, 5)],
+                                        self.world.cosmetic_random, config.getint("graphics", "cloud_layers"),
+                                        config.getint("graphics", "cloud_layer_size"), self.world.balloon_width / 48.467)
+        self.add_widget(self.cloud_layers)
+        # create the sprite renderer above the clouds. The balloons are drawn at the back, then the particles.
+        self.sprite_renderer = BatchRenderer(texture_bank.texture)
+        self.balloon_batch = self.sprite_renderer.add_batch("balloons", 64)
+        # the pop images and the bonus confetti are particles of one emitter, and its batch. Nothing pops on the title
+        # menu, so they are made by load_gameplay.
+        self.particles = None
+        self.particle_batch = None
+        self.add_widget(self.sprite_renderer)
+        # the pig and the tap to start image are drawn above the balloons by a sprite layer. The atlas index of each.
+        self.sprite_layer = SpriteLayer()
+        self.add_widget(self.sprite_layer)
+        self.atlas_texture = texture_bank.texture
+        self.pig_region = self.sprite_regions[texture_bank.index("pig")]
+        self.tap_start_region = self.sprite_regions[texture_bank.index("press_tutorial_icon_nobg")]
+        # the textures of the HUD's pop icon and miss icon
+        self.hud_icons = (texture_bank.atlas.textures["balloons_popped_icon"],
+                          texture_bank.atlas.textures["balloons_missed_icon"])
+        # every sprite on the screen and the callbacks scheduled for it. Removing a sprite through the registry cancels
+        # its callbacks, so nothing fires for a sprite that is gone.
+        self.entities = EntityRegistry(Clock.schedule_once)
+        # the HUD, the pig, and the tap to start image are put on the screen and taken off through the registry as the
+        # world's events say. They are created when the game starts.
+        self.round_entities = RoundEntities(self.entities, self.world,
+                                            lambda: Pig(self.world, self.atlas_texture, self.pig_region),
+                                            lambda: TapToStart(self.atlas_texture, self.tap_start_region),
+                                            self.sprite_layer.add, self.sprite_layer.remove)
+        self.pop_count_widget = None
+        # True when the HUD has to be refreshed at the end of the tick, and how many of its labels changed and how many
+        # glyph textures were uploaded during the last tick
+        self.hud_dirty = False
+        self.hud_updates = 0
+        self.hud_uploads = 0
+        # the glyph textures uploaded up to the end of the last tick
+        self.glyph_uploads = GlyphAtlas.uploads
+        # what happens in the world is handed to the parts of the view that show it
+        self.event_bus = EventBus()
+        self.subscribe_events()
+        # the profiler and its overlay, while the profiler is on. Setting POPPER_PIG_PROFILE turns it on at start; its
+        # value is the trace file if it isn't "1".
+        self.profiler = None
+        self.profiler_overlay = None
+        Window.bind(on_key_down=self.on_key_down)
+        # the one clock event that runs the world tick. None while the world is paused or stopped.
+        self.world_clock = None
         # create a new float layout for menu items
         self.menu_layout = FloatLayout()
         # create the start button
@@ -720,99 +299,600 @@ class MainGame(FloatLayout):
         # the title image is centered horizontally and located 70% up screen vertically
         title.pos_hint = {'center_x': .5, 'center_y': .7}
         # changes the title image to the title image .png file
-        title.source = "Assets/popper_pig_title.png"
+        title.source = "atlas://Assets/atlas/popper_pig/popper_pig_title"
         # add the start button and the title to the menu layout
         self.menu_layout.add_widget(start_button)
         self.menu_layout.add_widget(title)
         # add the menu layout
         self.add_widget(self.menu_layout)
+        # every round played is recorded so it can be played back. The recorder is made by load_gameplay. Setting
+        # POPPER_PIG_REPLAY to a replay file plays it back as soon as the game starts.
+        self.recorder = None
+        self.replay_track = None
+        replay_path = os.environ.get("POPPER_PIG_REPLAY")
+        if replay_path:
+            from replay import load_replay
+            Clock.schedule_once(lambda time_passed: self.play_replay(load_replay(replay_path)))
+        # draw the game at the height set in the graphics settings (0 for the screen's own resolution). F11 switches
+        # between the screen's resolution, 720 pixels, and the 414 pixel height the game was designed at. The scene
+        # buffer is only made the first time the game is drawn below the screen's resolution.
+        self.scene_buffer = None
+        # the quality governor turns the clouds, pop images, sounds, and render resolution down when the frames are too
+        # slow and back up when they are fast again. It can be turned off in the graphics settings. It is made by
+        # load_gameplay.
+        self.quality_governor = None
+        # decides when python's cycle collector may run and times its pauses. Set in the memory section of the
+        # settings and made by load_gameplay.
+        self.gc_policy = None
+        # the most sounds at once (known once the sound bank is loaded) and the cloud layers the settings allow at the
+        # best quality
+        self.max_voices = None
+        self.max_cloud_layers = len(self.cloud_layers.quads)
+        # the game only has the window's size once it is added to the window, so the render height of the settings is
+        # applied then (see on_size)
+        self.render_height = config.getint("graphics", "render_height")
+        self.sized = False
+        # turn the profiler on from the start if asked to
+        profile = os.environ.get("POPPER_PIG_PROFILE")
+        if profile:
+            self.toggle_profiler(None if profile == "1" else profile)
+        # while nobody is playing (on the title menu, after game over, and on the tap to start screen) the world ticks
+        # only idle_fps times per second, so only the clouds move and kivy redraws that often. 0 never idles.
+        self.idle_fps = config.getint("graphics", "idle_fps")
+        self.idle = False
+        # True for the first tick after the game stopped idling, whose time is mostly time spent idle
+        self.woke_up = False
+        # the most steps a tick may catch up on at the full frame rate
+        self.max_steps = self.timestep.max_steps
+        # the balloon scroll last drawn
+        self.drawn_scroll = None
+        # start the world tick so the clouds move behind the menu
+        self.start_world()
+
+    # starts (or resumes) the world tick. Every entity in the game is advanced by this single clock, which runs once
+    # per frame of the screen, or idle_fps times per second while idle.
+    def start_world(self):
+        # only one world tick may ever be running
+        if self.world_clock is None:
+            self.world_clock = Clock.schedule_interval(self.world_tick, 1. / self.idle_fps if self.idle else 0)
+
+    # True when nobody is playing: on the title menu, after game over, and on the tap to start screen, once the last
+    # pop image is gone. A replay is never idle.
+    def is_idle(self):
+        if not self.idle_fps or self.replay_track is not None:
+            return False
+        return self.world.game_stage in ("menu", "endGame") and (self.particles is None or not self.particles.live)
+
+    # switches the world tick between the full frame rate and idle_fps
+    def set_idle(self, idle):
+        if idle == self.idle:
+            return
+        self.idle = idle
+        if idle:
+            # an idle tick is several steps long. The steps are caught up on so the world's timers keep real time.
+            self.timestep.max_steps = math.ceil(1. / (self.idle_fps * STEP)) + 1
+        else:
+            self.woke_up = True
+        if self.world_clock is not None:
+            self.pause_world()
+            self.start_world()
+
+    # pauses the world tick. Every entity freezes in place until start_world is called again.
+    def pause_world(self):
+        if self.world_clock is not None:
+            self.world_clock.cancel()
+            self.world_clock = None
+
+    # stops the world for good: cancels the world tick, forgets the time the timestep has not stepped yet, and takes
+    # every entity off the screen, which cancels their scheduled callbacks. Called when the app closes.
+    def stop_world(self):
+        self.pause_world()
+        self.timestep.reset()
+        self.entities.clear()
+
+    # remembers if the screen is touched. The world reads it on the next step.
+    def on_touch_down(self, touch):
+        self.touch_pressed = True
+        self.touch_started = True
+        # tick at the full frame rate again, so the next tick (which may start a round) comes on the next frame
+        self.set_idle(False)
+        # let the menu buttons see the touch too
+        return super().on_touch_down(touch)
+
+    # remembers the screen is no longer touched
+    def on_touch_up(self, touch):
+        self.touch_pressed = False
+        return super().on_touch_up(touch)
+
+    # ran every frame. Steps the world as many times as fit in the time that passed, plays the sounds and shows the
+    # effects of what happened in each step, and finally draws the pig, balloons, pop images, clouds, and labels where
+    # the world says they are. Things are drawn between their last two steps so they move smoothly at any frame rate.
+    def world_tick(self, time_passed):
+        world = self.world
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+        steps = self.timestep.advance(time_passed)
+        # the tick that woke the game up caught up on the idle time. From now on a tick catches up on the usual steps.
+        if self.woke_up:
+            self.timestep.max_steps = self.max_steps
+        for _ in range(steps):
+            # a replay being played presses the screen instead of the player
+            if self.replay_track is not None:
+                pressed = self.replay_track.next()
+            else:
+                pressed = self.touch_pressed or self.touch_started
+            # nothing is recorded before the game is loaded, which is before any round can start
+            recorder = self.recorder
+            if recorder is not None:
+                recorder.before_step(world, pressed)
+            events = world.step(pressed)
+            if recorder is not None:
+                recorder.after_step(world, events)
+            self.event_bus.publish_all(events)
+            self.touch_started = False
+        alpha = self.timestep.alpha
+        # move the pig. A pig that didn't move isn't touched, so nothing is redrawn for it. Once the game is over the
+        # pig was popped and is taken off the screen.
+        pig = self.round_entities.update()
+        if pig is not None:
+            pig_y = interpolate(world.previous_pig_y, world.pig_y, alpha)
+            if pig_y != pig.y:
+                pig.move_to(pig.x, pig_y)
+        # scroll the balloons and pop images on screen the distance the balloons moved. While idle there is nothing on
+        # the screen to scroll, so it is left for the tick that wakes the game up.
+        scroll = interpolate(world.previous_balloon_scroll, world.balloon_scroll, alpha)
+        if not self.idle and scroll != self.drawn_scroll:
+            self.drawn_scroll = scroll
+            self.balloon_batch.translate.x = -scroll
+            if self.particle_batch is not None:
+                self.particle_batch.translate.x = -scroll
+        # age, move, and expire every pop image and piece of confetti, then draw them
+        particles = self.particles
+        if particles is not None:
+            particles.update(time_passed)
+            particles.draw(self.particle_batch)
+        # the clouds drift with the steps on top of the balloon scroll. While idle they still move, only idle_fps times
+        # per second, so they stay where the world says and don't jump when the game wakes up.
+        self.cloud_layers.scroll(*cloud_position(world, alpha))
+        self.refresh_hud()
+        # upload the sprites that changed this tick
+        self.sprite_renderer.flush()
+        # the quality tier is picked by how long the frames take. Idle ticks (and the one after them) are meant to be
+        # long, so they aren't counted.
+        if self.quality_governor is not None and not self.idle and not self.woke_up:
+            self.event_bus.publish_all(self.quality_governor.update(time_passed))
+        self.woke_up = False
+        # the cycle collector's pauses and the net growth of the live memory blocks since the last tick, once the gc
+        # policy is loaded
+        gc_frame = self.gc_policy.end_frame() if self.gc_policy is not None else {}
+        if profiler is not None:
+            # a collection shows up as a part of the frame, so a slow frame can be blamed on it
+            if gc_frame.get("gc_ms"):
+                profiler.add_section("gc.collect", gc_frame["gc_ms"] / 1000, sum(gc_frame["gc_collections"]))
+            # the collision candidates, entities, draw calls, and uploads of the frame are counted with the things in
+            # the game
+            profiler.end_frame(time_passed, {"steps": steps, "balloons": world.balloons.live_count(),
+                                             "particles": particles.live if particles is not None else 0,
+                                             **self.pool_stats(), **self.entity_stats(), **self.render_stats(),
+                                             **gc_frame})
+            self.profiler_overlay.update(profiler)
+        # slow down once nobody is playing
+        self.set_idle(self.is_idle())
+
+    # the HUD only changes when something happened to its counts. Also counts the glyph textures uploaded since the last
+    # tick, which is only ever more than 0 on the tick the HUD was built.
+    def refresh_hud(self):
+        self.hud_updates = 0
+        if self.hud_dirty and self.pop_count_widget is not None:
+            self.hud_updates = self.pop_count_widget.refresh()
+        self.hud_dirty = False
+        self.hud_uploads = GlyphAtlas.uploads - self.glyph_uploads
+        self.glyph_uploads = GlyphAtlas.uploads
+
+    # turns the profiler on or off. While it is on every part of the world tick is timed, an overlay shows the recent
+    # frames, and every frame is written to the trace file. trace_path defaults to profile_trace.jsonl in the app's
+    # data folder.
+    def toggle_profiler(self, trace_path=None):
+        if self.profiler is None:
+            # the profiler is only imported the first time it is turned on
+            from profiler import Profiler
+            from profiler_overlay import ProfilerOverlay
+            if trace_path is None:
+                trace_path = os.path.join(App.get_running_app().user_data_dir, "profile_trace.jsonl")
+            self.profiler = Profiler(trace_path)
+            self.profiler.instrument(self.world, ["handle_input", "move_pig", "ask_balloon_spawner", "move_balloons",
+                                                  "check_bonus_lives"], "world")
+            self.profiler.instrument(self, ["refresh_hud"], "view")
+            # the particles are timed from the start if the profiler is turned on before the game is loaded (see
+            # load_gameplay)
+            if self.particles is not None:
+                self.profiler.instrument(self.particles, ["update", "draw"], "particles")
+            # the handlers of every event type are timed by the event bus
+            self.event_bus.profiler = self.profiler
+            self.profiler.instrument(self.cloud_layers, ["scroll"], "clouds")
+            self.profiler.instrument(self.sprite_renderer, ["flush"], "sprites")
+            # the overlay takes up the bottom-right corner of the screen
+            self.profiler_overlay = ProfilerOverlay(size=(Window.width * .35, Window.height * .3),
+                                                    pos=(Window.width * .65, 0))
+            self.add_widget(self.profiler_overlay)
+            Logger.info("Profiler: on, writing the trace to " + trace_path)
+        else:
+            self.profiler.close()
+            self.profiler = None
+            self.event_bus.profiler = None
+            self.remove_widget(self.profiler_overlay)
+            self.profiler_overlay = None
+            Logger.info("Profiler: off")
+
+    # plays a recorded round on the screen. The presses come from the replay until the round is over.
+    def play_replay(self, replay):
+        world = self.world
+        if (replay["width"], replay["height"]) != (world.width, world.height):
+            Logger.warning("Replay: recorded on a %dx%d screen but played on a %dx%d screen, so it may not play the same"
+                           % (replay["width"], replay["height"], world.width, world.height))
+        # a round can only start from the tap to start screen
+        if world.game_stage == "menu" and not world.waiting_for_tap:
+            self.remove_layout()
+        if not world.waiting_for_tap:
+            Logger.warning("Replay: a replay can only start when the game is waiting for a tap")
+            return False
+        from replay import start_replay
+        self.replay_track = start_replay(world, replay)
+        self.event_bus.publish(RoundStarted())
+        return True
+
+    # F12 is a hidden key that turns the profiler on or off and F11 switches the render resolution
+    def on_key_down(self, window, key, *ignore):
+        if key == 293:
+            self.toggle_profiler()
+            return True
+        if key == 292:
+            heights = [0, 720, 414]
+            current = self.render_height
+            self.set_render_height(heights[(heights.index(current) + 1) % len(heights)] if current in heights else 0)
+            return True
+
+    # the game was resized. The first resize gives it the window's size, so the render height of the settings is set
+    # (and the resolution it draws at logged) then. After that the scene buffer follows the size.
+    def on_size(self, *ignore):
+        if not self.sized:
+            self.sized = True
+            self.set_render_height(self.render_height)
+        else:
+            self.apply_render_height()
+
+    # draws the game render_height pixels tall and scales it up to the screen, or at the screen's own resolution if
+    # render_height is 0
+    def set_render_height(self, render_height):
+        # kept so the buffer can be remade at the same height when the screen changes size
+        self.render_height = render_height
+        self.apply_render_height()
+        Logger.info("Render: %s, %d pixels filled per frame" % (self.render_resolution(), self.fill_pixels()))
+
+    # draws the game at the lower of the chosen render height and the quality tier's render height
+    def apply_render_height(self):
+        heights = [self.render_height]
+        if self.quality_governor is not None:
+            heights.append(self.quality_governor.settings["render_height"])
+        heights = [height for height in heights if height > 0]
+        if self.scene_buffer is None:
+            # nothing to do while the game is drawn at the screen's resolution
+            if not heights:
+                return
+            from scaled_render import SceneBuffer
+            self.scene_buffer = SceneBuffer(self)
+        self.scene_buffer.set_render_height(min(heights) if heights else 0)
+
+    # the height the game is drawn at, or 0 for the screen's own resolution
+    def render_height_drawn(self):
+        return self.scene_buffer.render_height if self.scene_buffer is not None else 0
+
+    # the name of the quality tier being played at
+    def quality_tier(self):
+        if self.quality_governor is None:
+            return "off"
+        return self.quality_governor.settings["name"]
+
+    # turns the clouds, pop images, sounds, and render resolution up or down to the quality governor's tier. Never
+    # goes past what the settings allow.
+    def apply_quality(self):
+        settings = self.quality_governor.settings
+        self.cloud_layers.set_quality(min(settings["cloud_layers"], self.max_cloud_layers), settings["cloud_opacity"])
+        self.particles.limit = min(settings["particles"], self.particles.capacity)
+        if self.sound_bank is not None:
+            self.sound_bank.max_voices = min(settings["voices"], self.max_voices)
+        self.apply_render_height()
+
+    # the resolution the game is drawn at
+    def render_resolution(self):
+        fbo = self.scene_buffer.fbo if self.scene_buffer is not None else None
+        width, height = fbo.size if fbo is not None else self.size
+        return "%dx%d" % (width, height)
+
+    # the pixels filled per frame by the full screen layers: the background and every cloud layer
+    def fill_pixels(self):
+        layers = 1 + self.cloud_layers.visible_layers
+        if self.scene_buffer is None:
+            return int(self.width * self.height * layers)
+        return self.scene_buffer.fill_pixels(layers)
+
+    # children draw into the scene buffer while the game is drawn at a lower resolution
+    def add_widget(self, widget, *args, **kwargs):
+        scene_buffer = getattr(self, "scene_buffer", None)
+        if scene_buffer is None or scene_buffer.fbo is None:
+            return super().add_widget(widget, *args, **kwargs)
+        canvas = self.canvas
+        self.canvas = scene_buffer.fbo
+        try:
+            return super().add_widget(widget, *args, **kwargs)
+        finally:
+            self.canvas = canvas
+
+    # removes a child from the scene buffer while the game is drawn at a lower resolution
+    def remove_widget(self, widget, *args, **kwargs):
+        scene_buffer = getattr(self, "scene_buffer", None)
+        if scene_buffer is None or scene_buffer.fbo is None:
+            return super().remove_widget(widget, *args, **kwargs)
+        canvas = self.canvas
+        self.canvas = scene_buffer.fbo
+        try:
+            return super().remove_widget(widget, *args, **kwargs)
+        finally:
+            self.canvas = canvas
+
+    # subscribes every part of the view to the events it shows. The parts subscribe in the order an event has to be
+    # handled in: sounds, then effects on screen, then the HUD, then the score history.
+    def subscribe_events(self):
+        bus = self.event_bus
+        # sounds
+        bus.subscribe(BalloonPopped, self.play_pop_sound)
+        bus.subscribe(BalloonMissed, self.play_miss_sound)
+        bus.subscribe(BonusLives, self.play_bonus_sound)
+        bus.subscribe(GameOver, self.play_game_over_sound)
+        # effects on screen
+        bus.subscribe(BalloonSpawned, self.show_spawned_balloon)
+        bus.subscribe(BalloonPopped, self.show_popped_balloon)
+        bus.subscribe(BalloonMissed, self.hide_missed_balloon)
+        bus.subscribe(BalloonsCleared, self.hide_every_balloon)
+        bus.subscribe(GameOver, self.show_popped_pig)
+        bus.subscribe(BonusLives, self.show_bonus_confetti)
+        bus.subscribe(RoundReady, self.build_end_game_menu)
+        # the HUD, the pig, and the tap to start image
+        self.round_entities.subscribe(bus)
+        bus.subscribe(QualityChanged, self.change_quality)
+        # the HUD. Every event but a balloon spawning or the quality changing changes a count it shows.
+        for event_type in (BalloonPopped, BalloonMissed, BonusLives, RoundStarted, GameOver, RoundReady,
+                           BalloonsCleared):
+            bus.subscribe(event_type, self.mark_hud_dirty)
+        # the score history
+        bus.subscribe(GameOver, self.save_game)
+        # the cycle collector
+        bus.subscribe(RoundStarted, self.hold_full_collections)
+
+    # no full collection runs while a round is played. build_end_game_menu runs it once the round is over.
+    def hold_full_collections(self, event):
+        self.gc_policy.start_round()
+
+    # play the pop sound through the device. Add a variety to popping noises by making the pitch a random level
+    # between .8 and 2. The default pitch is 1.
+    def play_pop_sound(self, event):
+        self.sound_bank.play("pop", self.world.cosmetic_random.randint(8, 20) / 10)
+
+    # play the miss sound full volume through the device
+    def play_miss_sound(self, event):
+        self.sound_bank.play("miss")
+
+    # play a bonus sound when lives are added
+    def play_bonus_sound(self, event):
+        self.sound_bank.play("bonus")
+
+    # play a quiet pop sound as the pig gets popped
+    def play_game_over_sound(self, event):
+        self.sound_bank.play("pop", self.world.cosmetic_random.randint(8, 20) / 10, 0.1)
+
+    # draws a balloon that was spawned
+    def show_spawned_balloon(self, event):
+        # if the field grew its balloons were moved to new slots, so redraw every balloon in its new slot
+        if event.moved is not None:
+            self.balloon_batch.clear()
+            for live_slot in self.world.balloons.live_indices():
+                self.draw_balloon(live_slot)
+        # draw the new balloon in its slot
+        else:
+            self.draw_balloon(event.slot)
+
+    # spawns the pop image where the balloon was popped and removes the balloon from the screen
+    def show_popped_balloon(self, event):
+        self.spawn_pop_image(event.x, event.y, event.width, event.height)
+        self.balloon_batch.hide_quad(event.slot)
+
+    # removes a missed balloon from the screen
+    def hide_missed_balloon(self, event):
+        self.balloon_batch.hide_quad(event.slot)
+
+    # removes every balloon from the screen
+    def hide_every_balloon(self, event):
+        self.balloon_batch.clear()
+
+    # spawns a pop image at the location of the pig with the same height as the pig
+    def show_popped_pig(self, event):
+        world = self.world
+        self.spawn_pop_image(world.pig_x * 1.2, world.pig_y, world.pig_height * (84 / 92), world.pig_height)
+
+    # throws a burst of tiny balloons out of the pig when lives are added
+    def show_bonus_confetti(self, event):
+        world = self.world
+        self.particles.burst(world.pig_x + world.pig_width / 2 + world.balloon_scroll,
+                             world.pig_y + world.pig_height / 2, 24, world.balloon_width * .3,
+                             world.balloon_height * .3, self.balloon_regions, .8, world.height * .6,
+                             world.cosmetic_random)
+
+    # the HUD is refreshed at the end of the tick
+    def mark_hud_dirty(self, event):
+        self.hud_dirty = True
+
+    # turns the graphics to the quality governor's new tier
+    def change_quality(self, event):
+        from quality import TIERS
+        self.apply_quality()
+        # the log shows which tier every device ends up spending its time in
+        Logger.info("Quality: %s -> %s at an average frame of %.1f ms, %s"
+                    % (TIERS[event.old]["name"], TIERS[event.new]["name"], event.average_ms,
+                       self.quality_governor.stats()))
+
+    # writes the quad of the balloon in a slot of the balloon field into the balloon batch
+    def draw_balloon(self, slot):
+        field = self.world.balloons
+        # balloons scroll together, so they are placed at their position plus the balloon scroll
+        self.balloon_batch.set_quad(slot, float(field.x[slot]) + self.world.balloon_scroll, float(field.y[slot]),
+                                    float(field.width[slot]), float(field.height[slot]),
+                                    self.sprite_regions[self.balloon_regions[field.colour[slot]]])
+
+    # shows the cartoon-like pop for a split-second where something popped. Receives the x, y, width, and height of
+    # the balloon (or pig) that popped.
+    def spawn_pop_image(self, x, y, width, height):
+        # Height of the balloon image multiplied by the ratio of pixelHeight_pop_image:pixelHeight_balloon_image
+        # gives the adjusted height of the pop image. Keeps original width:height ratio.
+        pop_height = height * (84 / 103)
+        pop_width = width * (92 / 87)
+        # the pop image's bottom-left corner is where the balloon's was. It scrolls with the balloons, so it is placed
+        # at its position plus the balloon scroll. It is shown for 0.1 seconds. At lower quality tiers fewer
+        # particles are allowed at once, so some pops aren't shown.
+        self.particles.emit(x + self.world.balloon_scroll + pop_width / 2, y + pop_height / 2, pop_width, pop_height,
+                            self.pop_region, 0.1)
+
+    # the resolution and quality the game is drawn at, and the draw calls issued, vertices uploaded, and HUD labels and
+    # glyph textures updated during the last world tick. Added to every profiled frame.
+    def render_stats(self):
+        return {"render_height": self.render_height_drawn(),
+                "render_resolution": self.render_resolution(),
+                "fill_pixels": self.fill_pixels(),
+                "draw_calls": self.sprite_renderer.draw_calls,
+                "vertices_uploaded": self.sprite_renderer.vertices_uploaded,
+                "hud_text_updates": self.hud_updates,
+                "hud_texture_uploads": self.hud_uploads,
+                "quality_tier": self.quality_tier()}
+
+    # the entities on the screen and the callbacks waiting to fire. Added to every profiled frame, so an entity or a
+    # callback a round leaves behind shows up as a count that keeps growing from round to round.
+    def entity_stats(self):
+        return {"entities": self.entities.count(), "pending_callbacks": self.entities.pending()}
+
+    # the cycle collector's collections and pauses under the gc policy, or None before the gc policy is loaded
+    def gc_stats(self):
+        return self.gc_policy.stats() if self.gc_policy is not None else None
+
+    # the balloons tested against the pig during the last step and per step so far, the most balloons and particles
+    # alive at once, and the particles dropped because too many were alive. Added to every profiled frame.
+    def pool_stats(self):
+        balloons = self.world.balloons.stats()
+        stats = {"candidates": balloons["candidates"],
+                 "candidates_per_step": round(balloons["candidates_per_step"], 3),
+                 "balloon_high_water": balloons["high_water"], "balloon_capacity": balloons["capacity"]}
+        if self.particles is not None:
+            particles = self.particles.stats()
+            stats["particle_high_water"] = particles["high_water"]
+            stats["particles_dropped"] = particles["dropped"]
+        return stats
 
     # removes the menu layout. *ignore is needed on button release commands since they pass an additional argument
     # to the function they call.
     def remove_layout(self, *ignore):
-        global balloonSpeed, balloonYSpawn, balloonHeight, balloonWidth
-        # game is now starting
-        # start the initial y position of the balloons to the middle of the screen
-        balloonYSpawn = Window.height / 2
-        # create a pop count widget
-        pop_count_widget = PopCount()
-        # create a tap to start widget that shows the user when they tap the screen the pig goes up
-        tap_start_widget = TapToStart()
-        # create the main character pig
-        pig = Pig()
-        # add the objects created
-        self.add_widget(tap_start_widget)
-        self.add_widget(pop_count_widget)
-        self.add_widget(pig)
-
-        # set the balloon height to  6.93% of the screen
-        balloonHeight = Window.height * 0.0693
-        # persevere the width:height ratio of the balloon.png file
-        balloonWidth = (87 / 103) * balloonHeight
-        # set the starting balloon speed. This will be added increased, making the game faster over time.
-        balloonSpeed = balloonWidth * 0.1
+        # the sounds and the score history are usually loaded by now, but the start button can be pressed before
+        self.load_gameplay()
+        # game is now starting. The next press on the screen starts the first round.
+        self.world.show_tap_to_start()
+        # create a pop count widget. It stays for the whole game.
+        self.pop_count_widget = PopCount(self.world, *self.hud_icons)
+        self.add_widget(self.pop_count_widget)
+        # register it, and create a tap to start widget that shows the user when they tap the screen the pig goes up,
+        # and the main character pig
+        self.round_entities.start(self.pop_count_widget)
         # remove the menu layout and its children
         self.remove_widget(self.menu_layout)
-
-    # after 0.5 seconds after the game ends prepare for the next game
-    def build_end_game_menu(self, time_passed):
-        # create a new pig and tap to start tutorial image
-        pig = Pig()
-        tap_start_widget = TapToStart()
-        # add the objects to the layout
-        self.add_widget(pig)
-        self.add_widget(tap_start_widget)
-
-    # when the game is over by the pig flying off the screen or getting too many misses
-    def end_game(self):
-        global balloonSpeed, bestPopCount, gameStage, pigX, pigY, pigHeight, store
-        # stop the balloons from moving (this also tells the rest of the game the player lost)
-        balloonSpeed = 0
-        # play a pop sound as the pig gets popped
-        sound = SoundLoader.load("Audio/pop2.wav")
-        sound.loop = False
-        sound.pitch = random.randint(8, 20) / 10
-        sound.volume = 0.1
-        sound.play()
-        # change the game stage to end game
-        gameStage = "endGame"
-        # create a pop image at the location of the pig with the same height as the pig
-        pop = PopImage(pigX * 1.2, pigY, pigHeight * (84 / 92), pigHeight)
-        # add the pop image to the layout
-        self.add_widget(pop)
-        # if the user got a new high score
-        if popCount > bestPopCount:
-            # update the high score to the pop count
-            bestPopCount = popCount
-            # Writes high score to local memory in the JSON file, popper_pig.json. "best" is the key and bestPopCount
-            # is the value.
-            store.put('bestScore', best=int(bestPopCount))
-        # after 0.5 build the end game menu to prepare for the next game
-        Clock.schedule_once(self.build_end_game_menu, 0.5)
-
-    # ran 60fps to check if a balloon should be spawned and if the game is over
-    def ask_balloon_spawner(self, time_passed):
-        global pigY, pigHeight, balloonSpeed, balloonWidth, distSinceLastSpawn
-        # did the player lose by getting too many misses or flying off the screen?
-        if (missCount >= missesAllowed) or (pigY < -pigHeight) or (pigY > Window.height + pigHeight):
-            # stop the clock that runs this method
-            Clock.unschedule(self.ask_balloon_spawner)
-            # end the game
-            self.end_game()
-        # if the space between the last balloon spawned is greater than 120% of a balloons width
-        if distSinceLastSpawn >= balloonWidth * 1.2 and gameStage == "inGame":
-            # then spawn a balloon
-            balloon = Balloon()
-            self.add_widget(balloon)
-            # reset the distance since last spawning a balloon back to 0
-            distSinceLastSpawn = 0
+        self.menu_layout = None
+        # the game is set up and the title menu is gone. Everything left lives as long as the app, so the cycle
+        # collector stops looking at it.
+        self.gc_policy.freeze()
+
+    # takes the sound bank and the score history the app loads after the title menu is shown. Called right after the
+    # first frame and again when the game starts, in case the start button was pressed first. Loads them only once.
+    def load_gameplay(self, *ignore):
+        if self.gameplay_loaded:
+            return
+        self.gameplay_loaded = True
+        from particles import ParticleEmitter
+        from replay import Recorder
+        from quality import QualityGovernor
+        from gc_policy import GcPolicy
+        app = App.get_running_app()
+        app.load_gameplay()
+        self.score_history = app.score_history
+        self.world.best_pop_count = self.score_history.best
+        self.sound_bank = app.sound_bank
+        self.max_voices = self.sound_bank.max_voices
+        # the pop images and the bonus confetti are particles of one emitter. They only live for a moment, so 64 of
+        # them at once is plenty. Confetti falls a screen height and a half faster every second. Their batch is drawn
+        # above the balloons.
+        self.particles = ParticleEmitter(64, self.sprite_regions, self.world.height * 1.5)
+        self.particle_batch = self.sprite_renderer.add_batch("particles", self.particles.capacity)
+        self.particle_batch.translate.x = self.balloon_batch.translate.x
+        if self.profiler is not None:
+            self.profiler.instrument(self.particles, ["update", "draw"], "particles")
+        self.recorder = Recorder(os.path.join(app.user_data_dir, "replays"))
+        config = app.config
+        if config.getint("graphics", "adaptive_quality"):
+            self.quality_governor = QualityGovernor()
+            self.apply_quality()
+        self.gc_policy = GcPolicy(config.get("memory", "gc_policy"))
+        app.report_startup()
+
+    # 0.5 seconds after the game ends prepare for the next game. The round entities swap the pig and the tap to start
+    # image for new ones.
+    def build_end_game_menu(self, event=None):
+        # take the pop images and confetti left of the last round off the screen in one pass
+        self.particles.clear()
+        # the round is over, so run the full collection held back during it. The log shows how long the collections
+        # between rounds take and what the collector did during the rounds.
+        self.gc_policy.end_round()
+        gc_stats = self.gc_stats()
+        between_rounds = gc_stats["between_rounds"]
+        Logger.info("Memory: %d objects collected after %d round(s) in %.2f ms, %s collections by generation, "
+                    "%.2f ms paused (longest %.2f ms), %d objects frozen"
+                    % (between_rounds["collected"], between_rounds["collections"], between_rounds["ms"],
+                       gc_stats["collections"], sum(gc_stats["pause_ms"]), gc_stats["longest_pause_ms"],
+                       gc_stats["frozen"]))
+
+    # when the game is over by the pig flying off the screen or getting too many misses, the game is saved
+    def save_game(self, event):
+        world = self.world
+        # a replayed round is over. Its score isn't the player's, so the player's best score is put back.
+        if self.replay_track is not None:
+            self.replay_track = None
+            world.best_pop_count = self.score_history.best
+        # save the game to the score history. It is written to the device's memory in the background so the game doesn't
+        # wait for it.
         else:
-            # add the distance the balloons moved this frame to the distance since a balloon was last spawned
-            distSinceLastSpawn += balloonSpeed
+            self.score_history.record(world.pop_count, world.miss_count, world.final_speed, world.round_duration,
+                                      world.seed)
 
 
 # STEP 1: Create the app by inheriting from the class App made by kivy.
 class MainApp(App):
+    # the default settings of the app. Kivy saves them to main.ini next to main.py.
+    def build_config(self, config):
+        # the amount of cloud layers and the height in pixels of each layer's texture (a power of 2 so it can repeat).
+        # render_height is the height in pixels the game is drawn at before it is scaled up to the screen. 0 draws it
+        # at the screen's own resolution. adaptive_quality lets the quality governor turn the graphics down on slow
+        # devices. idle_fps is how many times per second the game ticks while nobody is playing (0 to always tick at
+        # the full frame rate).
+        config.setdefaults("graphics", {"cloud_layers": 3, "cloud_layer_size": 512, "render_height": 0,
+                                            "adaptive_quality": 1, "idle_fps": 10})
+        # gc_policy is "rounds" to hold python's full cycle collections back until a round is over, or "default" to
+        # leave the collector alone (see gc_policy.py)
+        config.setdefaults("memory", {"gc_policy": "rounds"})
+
     # as the app is being built
     def build(self):
         # this is how I tested the game. Every proportion to adjust graphics and movemnt proportionally to the device's
@@ -821,11 +901,78 @@ class MainApp(App):
         # Config.set('graphics', 'width', 2688 / 3)
         # Config.set('graphics', 'height', 1242 / 3)
         # - - -
-        # create the window where the game will take place
+        # the app has read its settings
+        startup_trace.mark("settings")
+        # decode every image and upload it to the graphics card before the first frame so no image is loaded in the
+        # middle of a game
+        self.texture_bank = TextureBank()
+        self.texture_bank.load()
+        startup_trace.mark("textures")
+        # the sounds and the score history are loaded by load_gameplay once the title menu is on the screen
+        self.sound_bank = None
+        self.score_history = None
+        # create the window where the game will take place. It starts at the title menu.
         game = MainGame()
+        startup_trace.mark("title menu")
+        # the rest of the game is loaded right after the title menu is first drawn
+        Window.bind(on_flip=self.on_first_frame)
         # return the game to the device
         return game
 
-
-# run the app
-MainApp().run()
+    # called after the first frame is drawn. The game is loaded on the next frame, so the title menu shows first.
+    def on_first_frame(self, window):
+        Window.unbind(on_flip=self.on_first_frame)
+        startup_trace.mark("first frame")
+        Clock.schedule_once(self.root.load_gameplay)
+
+    # loads everything only needed to play: the sound effects and the score history. They are imported here so the
+    # audio backend and sqlite are not loaded before the title menu is drawn.
+    def load_gameplay(self):
+        from sound_bank import SoundBank
+        from score_history import ScoreHistory
+        # load every sound effect once. Up to 8 sounds play at once. The pop sound is pre-rendered at every pitch
+        # between .8 and 2 it can be played at, in the background. It pops at its own pitch until they are ready.
+        self.sound_bank = SoundBank(self.user_data_dir + "/pitch_cache", 8)
+        self.sound_bank.load("pop", "Audio/pop2.wav", 2, [pitch / 10 for pitch in range(8, 21)])
+        self.sound_bank.load("miss", "Audio/miss.wav", 3)
+        self.sound_bank.load("bonus", "Audio/bonus.wav", 1)
+        startup_trace.mark("sounds")
+        # open the score history. The first time, the best score saved by older versions in popper_pig.json is copied
+        # into it.
+        self.score_history = ScoreHistory(os.path.join(self.user_data_dir, "scores.db"))
+        self.score_history.migrate_json_store("popper_pig.json")
+        startup_trace.mark("score history")
+
+    # setting POPPER_PIG_STARTUP_TRACE writes how long every phase of the start up took to the log. Its value is also
+    # the file the times are added to if it isn't "1".
+    def report_startup(self):
+        trace_path = os.environ.get("POPPER_PIG_STARTUP_TRACE")
+        if not trace_path:
+            return
+        for line in startup_trace.lines():
+            Logger.info("Startup: " + line)
+        if trace_path != "1":
+            startup_trace.write(trace_path)
+
+    # the device paused the app (for example the user switched apps). Freeze the whole world.
+    def on_pause(self):
+        self.root.pause_world()
+        # tell kivy the app can be resumed
+        return True
+
+    # the device resumed the app. Start the world tick again.
+    def on_resume(self):
+        self.root.start_world()
+
+    # the app is closing. Stop the world and write the games and the replays still waiting to be saved.
+    def on_stop(self):
+        self.root.stop_world()
+        if self.score_history is not None:
+            self.score_history.close()
+        if self.root.recorder is not None:
+            self.root.recorder.close()
+
+
+# run the app (but not when main.py is imported, for example by a benchmark)
+if __name__ == "__main__":
+    MainApp().run()
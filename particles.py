@@ -0,0 +1,140 @@
+# Short-lived effects (the pop shown where a balloon or the pig popped, and confetti when lives are added) are particles
+# in one emitter instead of objects with their own callbacks. The emitter keeps a fixed amount of particles in NumPy
+# arrays: where each one is, how big, how old, how long it lives, how it moves and spins, and which image it shows.
+# Every frame one pass ages, moves, and expires all of them, and the live ones are written into a sprite batch as one
+# block of vertices, so a burst of 30 particles costs about the same as a single pop. The emitter only writes into the
+# batch it is given.
+
+# import numpy for the arrays
+import numpy as np
+
+# the corners of a quad around its center as fractions of its size, counter-clockwise from the bottom-left
+CORNERS_X = np.array([-.5, .5, .5, -.5])
+CORNERS_Y = np.array([-.5, -.5, .5, .5])
+
+
+# a fixed amount of particles
+class ParticleEmitter:
+    # capacity is how many particles can be alive at once. regions is the u0, v0, u1, v1 part of the atlas texture of
+    # every image, by atlas index. gravity is how many pixels per second the particles' fall speeds up every second.
+    def __init__(self, capacity, regions, gravity=0.):
+        self.capacity = capacity
+        self.regions = np.array(regions, dtype=float)
+        self.gravity = gravity
+        # the center, size, and velocity in pixels and pixels per second of every particle
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.width = np.zeros(capacity)
+        self.height = np.zeros(capacity)
+        self.velocity_x = np.zeros(capacity)
+        self.velocity_y = np.zeros(capacity)
+        # the angle in degrees and the degrees per second it turns
+        self.angle = np.zeros(capacity)
+        self.spin = np.zeros(capacity)
+        # seconds since the particle was emitted and seconds it lives for
+        self.age = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity)
+        # True if the particle fades out over its life instead of staying fully visible
+        self.fades = np.zeros(capacity, dtype=bool)
+        # the atlas index of the image every particle shows
+        self.region = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # the most particles that may be alive at once. The quality governor lowers it on slow devices.
+        self.limit = capacity
+        # how many particles were emitted, how many couldn't be because the emitter was full, and the most alive at once
+        self.emitted = 0
+        self.dropped = 0
+        self.high_water = 0
+        # True when the particles changed since they were last drawn
+        self.dirty = False
+
+    # how many particles are alive
+    @property
+    def live(self):
+        return int(np.count_nonzero(self.alive))
+
+    # emits a particle centered on x, y. Returns its slot, or None if the emitter is full.
+    def emit(self, x, y, width, height, region, lifetime, velocity_x=0., velocity_y=0., angle=0., spin=0.,
+             fades=False):
+        free = np.flatnonzero(~self.alive)
+        if not len(free) or self.live >= self.limit:
+            self.dropped += 1
+            return None
+        slot = free[0]
+        self.x[slot] = x
+        self.y[slot] = y
+        self.width[slot] = width
+        self.height[slot] = height
+        self.velocity_x[slot] = velocity_x
+        self.velocity_y[slot] = velocity_y
+        self.angle[slot] = angle
+        self.spin[slot] = spin
+        self.age[slot] = 0.
+        self.lifetime[slot] = lifetime
+        self.fades[slot] = fades
+        self.region[slot] = region
+        self.alive[slot] = True
+        self.emitted += 1
+        self.high_water = max(self.high_water, self.live)
+        self.dirty = True
+        return slot
+
+    # emits count particles from x, y flying out in every direction at between speed / 2 and speed pixels per second,
+    # each showing one of the images in regions. random decides their directions, speeds, images, and spins.
+    def burst(self, x, y, count, width, height, regions, lifetime, speed, random):
+        for _ in range(count):
+            direction = random.uniform(0, 2 * np.pi)
+            velocity = random.uniform(speed / 2, speed)
+            self.emit(x, y, width, height, random.choice(regions), lifetime, velocity * np.cos(direction),
+                      velocity * np.sin(direction), random.uniform(0, 360), random.uniform(-720, 720), True)
+
+    # ages, moves, and turns every particle, and expires the ones that lived out their lifetime, in one pass
+    def update(self, time_passed):
+        alive = self.alive
+        if not alive.any():
+            return
+        self.age[alive] += time_passed
+        self.velocity_y[alive] -= self.gravity * time_passed
+        self.x[alive] += self.velocity_x[alive] * time_passed
+        self.y[alive] += self.velocity_y[alive] * time_passed
+        self.angle[alive] += self.spin[alive] * time_passed
+        alive &= self.age < self.lifetime
+        self.dirty = True
+
+    # removes every particle
+    def clear(self):
+        if self.alive.any():
+            self.alive[:] = False
+            self.dirty = True
+
+    # writes every live particle into batch as one block of quads. Nothing is written if nothing changed.
+    def draw(self, batch):
+        if not self.dirty:
+            return
+        self.dirty = False
+        slots = np.flatnonzero(self.alive)
+        if not len(slots):
+            batch.clear()
+            return
+        # turn the corners of every quad around its center
+        radians = np.radians(self.angle[slots])[:, None]
+        cos = np.cos(radians)
+        sin = np.sin(radians)
+        offset_x = CORNERS_X * self.width[slots][:, None]
+        offset_y = CORNERS_Y * self.height[slots][:, None]
+        vertices = np.empty((len(slots), 4, 5))
+        vertices[:, :, 0] = self.x[slots][:, None] + offset_x * cos - offset_y * sin
+        vertices[:, :, 1] = self.y[slots][:, None] + offset_x * sin + offset_y * cos
+        # the texture coordinates of the corners, in the same order
+        u0, v0, u1, v1 = self.regions[self.region[slots]].T
+        vertices[:, :, 2] = np.stack([u0, u1, u1, u0], axis=1)
+        vertices[:, :, 3] = np.stack([v0, v0, v1, v1], axis=1)
+        # particles that fade are fully visible when emitted and gone at the end of their life
+        alpha = np.where(self.fades[slots], 1. - self.age[slots] / self.lifetime[slots], 1.)
+        vertices[:, :, 4] = alpha[:, None]
+        batch.set_quads(vertices.ravel().tolist())
+
+    # the emitter's counters as a dictionary
+    def stats(self):
+        return {"emitted": self.emitted, "dropped": self.dropped, "live": self.live, "high_water": self.high_water,
+                "limit": self.limit, "capacity": self.capacity}
@@ -0,0 +1,134 @@
+# An opt-in frame profiler. It times every part of a frame by wrapping the methods that make it up (the world's pig,
+# spawner, balloon, and bonus steps, and the view's event handling, pop images, clouds, HUD, and sprite uploads) and
+# keeps the time and call count of each per frame. The frames are kept for the overlay and written to a trace file for
+# later: a .csv trace has one row per part and one per count of every frame, anything else is written as one JSON object
+# per frame.
+#
+# Nothing is wrapped until the profiler is made, and unwrapping puts the original methods back, so a game that is not
+# being profiled runs exactly the same code as before.
+
+# import json and os to write the trace, time to time the frames, and deque to keep the recent frames
+import json
+import os
+import time
+from collections import deque
+
+
+# times wrapped methods and collects them into frames
+class Profiler:
+    # trace_path is the file the frames are written to, or None to not write them. history is how many frames are kept
+    # for the overlay. Once rotate_frames frames are written the trace is moved to trace_path + ".1" and started over,
+    # so the trace never grows past two files.
+    def __init__(self, trace_path=None, history=180, rotate_frames=36000):
+        self.trace_path = trace_path
+        self.rotate_frames = rotate_frames
+        # the recent frames, oldest first
+        self.frames = deque(maxlen=history)
+        # the [seconds, calls] of every part of the frame being recorded, by name
+        self.sections = {}
+        # the (object, method name) of every wrapped method
+        self.wrapped = []
+        self.frame_count = 0
+        self.frame_start = None
+        self.trace = None
+        self.trace_frames = 0
+        if trace_path is not None:
+            self.open_trace()
+
+    # wraps the named methods of obj so every call is timed under prefix.name
+    def instrument(self, obj, names, prefix):
+        for name in names:
+            # the wrapper is put on the instance, so it is found before the class's method and can simply be deleted
+            setattr(obj, name, self.timed(getattr(obj, name), prefix + "." + name))
+            self.wrapped.append((obj, name))
+
+    # a function that calls function and adds how long it took to the section called label
+    def timed(self, function, label):
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.add_section(label, perf_counter() - start)
+        return wrapper
+
+    # adds a call that took seconds to the section called label of the frame being recorded
+    def add_section(self, label, seconds, calls=1):
+        section = self.sections.get(label)
+        if section is None:
+            section = self.sections[label] = [0., 0]
+        section[0] += seconds
+        section[1] += calls
+
+    # puts back every wrapped method and closes the trace
+    def close(self):
+        for obj, name in self.wrapped:
+            delattr(obj, name)
+        self.wrapped = []
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    # called at the start of a frame
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        self.sections = {}
+
+    # called at the end of a frame. frame_time is the seconds since the last frame started (which includes drawing the
+    # last frame) and counts is a dictionary of how many of each thing are in the game.
+    def end_frame(self, frame_time, counts):
+        tick_time = time.perf_counter() - self.frame_start
+        frame = {"frame": self.frame_count,
+                 "time": round(time.time(), 3),
+                 "frame_ms": round(frame_time * 1000, 3),
+                 "tick_ms": round(tick_time * 1000, 3),
+                 "sections": {label: [round(seconds * 1000, 4), calls]
+                              for label, (seconds, calls) in self.sections.items()},
+                 "counts": counts}
+        self.frames.append(frame)
+        self.frame_count += 1
+        if self.trace is not None:
+            self.write_frame(frame)
+        return frame
+
+    # the labels and total milliseconds of the count parts that took the longest over the recent frames
+    def worst(self, count=3):
+        totals = {}
+        for frame in self.frames:
+            for label, (milliseconds, calls) in frame["sections"].items():
+                totals[label] = totals.get(label, 0.) + milliseconds
+        return sorted(totals.items(), key=lambda total: total[1], reverse=True)[:count]
+
+    # opens a new trace file, writing the column names first if it is a csv file
+    def open_trace(self):
+        folder = os.path.dirname(self.trace_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.trace = open(self.trace_path, "w")
+        self.trace_frames = 0
+        if self.trace_path.endswith(".csv"):
+            self.trace.write("frame,time,frame_ms,tick_ms,section,ms,calls\n")
+
+    # writes a frame to the trace and starts a new trace file when this one is full
+    def write_frame(self, frame):
+        if self.trace_path.endswith(".csv"):
+            prefix = "%d,%.3f,%.3f,%.3f," % (frame["frame"], frame["time"], frame["frame_ms"], frame["tick_ms"])
+            # a frame where nothing was timed still gets a row so every frame time is in the trace
+            sections = frame["sections"] or {"": [0., 0]}
+            for label, (milliseconds, calls) in sections.items():
+                self.trace.write(prefix + "%s,%.4f,%d\n" % (label, milliseconds, calls))
+            # the counts of the frame (the draw calls, the balloons, ...) have no time. Their value is in the calls
+            # column, with the numbers of a list (like the collections of each generation) split by spaces.
+            for name, count in frame["counts"].items():
+                if isinstance(count, (list, tuple)):
+                    count = " ".join(str(number) for number in count)
+                self.trace.write(prefix + "count.%s,,%s\n" % (name, count))
+        else:
+            self.trace.write(json.dumps(frame) + "\n")
+        self.trace_frames += 1
+        if self.trace_frames >= self.rotate_frames:
+            self.trace.close()
+            os.replace(self.trace_path, self.trace_path + ".1")
+            self.open_trace()
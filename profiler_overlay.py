@@ -0,0 +1,69 @@
+# A small panel in the bottom-right corner of the screen that shows what the profiler measured: a graph of the recent
+# frame times, how many things are in the game, and the parts of the frame that took the longest.
+
+# import the graphics instructions, Label, and Widget from kivy
+from kivy.graphics import Color, Line, Rectangle
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+
+# the frame time at the top of the graph, in milliseconds. The line across the graph marks one 60 fps frame.
+GRAPH_MS = 50.
+FRAME_MS = 1000 / 60.
+
+
+# draws the profiler's recent frames
+class ProfilerOverlay(Widget):
+    def __init__(self, **kwargs):
+        super(ProfilerOverlay, self).__init__(**kwargs)
+        # the overlay is placed by hand, so a layout must not stretch it
+        self.size_hint = (None, None)
+        with self.canvas:
+            # a see-through dark panel
+            Color(0, 0, 0, .6)
+            self.panel = Rectangle()
+            # the 60 fps line
+            Color(1, 1, 1, .4)
+            self.budget_line = Line(width=1)
+            # the frame times
+            Color(.2, 1, .2, 1)
+            self.graph = Line(width=1)
+        self.label = Label(font_size="11sp", halign="left", valign="top")
+        self.add_widget(self.label)
+        # the text is only rewritten every few frames since drawing a label is slow
+        self.frames_since_text = 0
+        self.bind(pos=self.layout, size=self.layout)
+
+    # places the panel, the graph, and the text inside the overlay
+    def layout(self, *ignore):
+        self.panel.pos = self.pos
+        self.panel.size = self.size
+        graph_height = self.height / 2
+        budget_y = self.y + graph_height * FRAME_MS / GRAPH_MS
+        self.budget_line.points = [self.x, budget_y, self.right, budget_y]
+        self.label.pos = (self.x + 4, self.y + graph_height)
+        self.label.size = (self.width - 8, self.height - graph_height - 4)
+        self.label.text_size = self.label.size
+
+    # shows the profiler's latest frames
+    def update(self, profiler):
+        frames = profiler.frames
+        if not frames:
+            return
+        # the graph fills the bottom half of the panel with one point per frame
+        graph_height = self.height / 2
+        step = self.width / max(frames.maxlen - 1, 1)
+        points = []
+        for index, frame in enumerate(frames):
+            points.extend((self.x + index * step,
+                           self.y + graph_height * min(frame["frame_ms"], GRAPH_MS) / GRAPH_MS))
+        self.graph.points = points
+        self.frames_since_text += 1
+        if self.frames_since_text < 15:
+            return
+        self.frames_since_text = 0
+        latest = frames[-1]
+        lines = ["frame %.1f ms  tick %.2f ms" % (latest["frame_ms"], latest["tick_ms"]),
+                 "  ".join("%s %s" % (name, count) for name, count in latest["counts"].items())]
+        for label, milliseconds in profiler.worst():
+            lines.append("%s %.3f ms/frame" % (label, milliseconds / len(frames)))
+        self.label.text = "\n".join(lines)
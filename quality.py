@@ -0,0 +1,109 @@
+# Keeps the game at 60 frames per second on slow devices by turning down the parts of the frame that are only there to
+# look nice. The governor is told how long every frame took. When the recent frames are too slow it steps down one
+# quality tier: fewer and fainter cloud layers, fewer particles, fewer sounds at once, and a lower render resolution.
+# When the frames have been fast enough for a while it steps back up. Stepping up waits much longer than stepping down,
+# and waits twice as long again every time a step up had to be undone, so the quality doesn't flicker between two
+# tiers.
+
+# import deque to keep the recent frame times
+from collections import deque
+
+# import the event made when the tier changes
+from game_events import QualityChanged
+
+# the quality tiers, best first. cloud_layers is how many of the front cloud layers are drawn and cloud_opacity how
+# visible they are, particles is how many pop images and pieces of confetti may be on screen at once, voices is how
+# many sounds may play at once, and render_height is the most pixels tall the game is drawn at (0 for no limit).
+TIERS = [
+    {"name": "high", "cloud_layers": 3, "cloud_opacity": 1., "particles": 64, "voices": 8, "render_height": 0},
+    {"name": "medium", "cloud_layers": 2, "cloud_opacity": .8, "particles": 32, "voices": 6, "render_height": 720},
+    {"name": "low", "cloud_layers": 1, "cloud_opacity": .6, "particles": 8, "voices": 4, "render_height": 540},
+    {"name": "lowest", "cloud_layers": 0, "cloud_opacity": 0., "particles": 0, "voices": 2, "render_height": 414},
+]
+
+
+# picks the quality tier from the measured frame times
+class QualityGovernor:
+    # budget is the seconds one frame may take. window is how many frames the average frame time is taken over.
+    # The tier steps down once that average is over slow times the budget and steps up once it has stayed under
+    # fast times the budget for up_seconds.
+    def __init__(self, budget=1 / 60., window=30, slow=1.2, fast=1.05, up_seconds=5., max_up_seconds=60.):
+        self.budget = budget
+        self.slow = slow
+        self.fast = fast
+        self.up_seconds = up_seconds
+        self.max_up_seconds = max_up_seconds
+        # the recent frame times and their sum
+        self.frame_times = deque(maxlen=window)
+        self.frame_time_sum = 0.
+        # the tier being played at, as an index into TIERS
+        self.tier = 0
+        # the seconds the frames have been fast enough in a row
+        self.fast_seconds = 0.
+        # the tier last stepped up from and how long it had been since. Falling back to it soon after doubles the wait.
+        self.stepped_up_from = None
+        self.seconds_since_step_up = 0.
+        # the seconds spent at every tier and how many times the tier changed
+        self.tier_seconds = [0.] * len(TIERS)
+        self.changes = 0
+
+    # the settings of the tier being played at
+    @property
+    def settings(self):
+        return TIERS[self.tier]
+
+    # the average of the recent frame times in seconds
+    def average(self):
+        if not self.frame_times:
+            return 0.
+        return self.frame_time_sum / len(self.frame_times)
+
+    # called once per frame with the seconds the frame took. Returns the QualityChanged events of the tier changing.
+    def update(self, frame_time):
+        # a frame after the app was paused or while it was loading says nothing about how fast the game draws
+        if frame_time > .25:
+            return []
+        self.tier_seconds[self.tier] += frame_time
+        self.seconds_since_step_up += frame_time
+        frame_times = self.frame_times
+        if len(frame_times) == frame_times.maxlen:
+            self.frame_time_sum -= frame_times[0]
+        frame_times.append(frame_time)
+        self.frame_time_sum += frame_time
+        # only judge the frames once the window is full
+        if len(frame_times) < frame_times.maxlen:
+            return []
+        average = self.average()
+        if average > self.budget * self.slow:
+            if self.tier + 1 < len(TIERS):
+                # the last step up didn't hold, so wait longer before trying it again
+                if self.stepped_up_from == self.tier + 1 and self.seconds_since_step_up < self.up_seconds * 2:
+                    self.up_seconds = min(self.up_seconds * 2, self.max_up_seconds)
+                return [self.change_tier(self.tier + 1, average)]
+            self.fast_seconds = 0.
+        elif average <= self.budget * self.fast:
+            self.fast_seconds += frame_time
+            if self.fast_seconds >= self.up_seconds and self.tier > 0:
+                self.stepped_up_from = self.tier
+                self.seconds_since_step_up = 0.
+                return [self.change_tier(self.tier - 1, average)]
+        else:
+            self.fast_seconds = 0.
+        return []
+
+    # moves to a tier and starts measuring the frames over
+    def change_tier(self, tier, average):
+        event = QualityChanged(self.tier, tier, round(average * 1000, 2))
+        self.tier = tier
+        self.changes += 1
+        self.fast_seconds = 0.
+        self.frame_times.clear()
+        self.frame_time_sum = 0.
+        return event
+
+    # the governor's state as a dictionary
+    def stats(self):
+        return {"tier": self.settings["name"], "changes": self.changes,
+                "average_frame_ms": round(self.average() * 1000, 2), "up_seconds": self.up_seconds,
+                "seconds_per_tier": {tier["name"]: round(seconds, 1)
+                                     for tier, seconds in zip(TIERS, self.tier_seconds)}}
@@ -0,0 +1,195 @@
+# Records games so they can be played again exactly. Every round of a World is decided by its round seed and by the
+# steps the screen was pressed and let go on, so a replay only keeps the seed, the screen size, the best score at the
+# start (which decides when the best label turns gold), the height the last round's wave of balloons ended at, and the
+# step of every press and release. The world steps the same way when it is given the same presses, so playing a replay
+# back ends with the same pops, misses, and speed.
+#
+# Replays can be played back on the screen by starting the game with POPPER_PIG_REPLAY=<replay file>, or without a
+# screen as fast as the computer can go:
+#
+#     python replay.py replays/replay_1700000000_12345.json
+#     python replay.py replays/replay_1700000000_12345.json --repeat 20 --profile trace.csv
+#
+# A finished replay is handed to a background thread that writes it and deletes the oldest ones, so the world tick that
+# ends a round never waits on the disk.
+
+# import argparse to read the options, glob, json, and os to save and load replays, queue and threading for the
+# writer, and time to name them and time the playback
+import argparse
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+# import the game rules and the events they make. The profiler is only imported when a playback is profiled.
+from world import STEP, World
+from game_events import GameOver, RoundStarted
+
+# replays are saved in this format. Bump it if the rules of the game change so old replays aren't played wrongly.
+REPLAY_VERSION = 1
+# the world steps the profiler times during a headless playback
+PROFILED_STEPS = ["handle_input", "move_pig", "ask_balloon_spawner", "move_balloons", "check_bonus_lives"]
+
+
+# writes down every round of a world while it is played
+class Recorder:
+    # folder is where the replays are saved. Only the keep most recent replays are kept. The writer thread starts right
+    # away.
+    def __init__(self, folder, keep=20):
+        self.folder = folder
+        self.keep = keep
+        # the replay of the round being played, or None between rounds
+        self.replay = None
+        # the steps played since the round started and whether the screen was pressed during the last one
+        self.step = 0
+        self.pressed = False
+        # the path of the last replay saved, set by the writer thread
+        self.last_saved = None
+        # the finished replays waiting to be written with the time they finished, then None to stop the writer
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_replays, name="ReplayWriter", daemon=True)
+        self.writer.start()
+
+    # called with what is passed to world.step, before it is called
+    def before_step(self, world, pressed):
+        if self.replay is not None:
+            self.step += 1
+            if pressed != self.pressed:
+                self.replay["inputs"].append(self.step)
+                self.pressed = pressed
+
+    # called with the events world.step returned. A round starts and ends on its events.
+    def after_step(self, world, events):
+        for event in events:
+            if isinstance(event, RoundStarted):
+                # the press that started the round is the first step of the replay
+                self.replay = {"version": REPLAY_VERSION, "width": world.width, "height": world.height,
+                               "seed": world.seed, "best_pop_count": world.best_pop_count,
+                               # the wave of balloons carries on from where the last round left it
+                               "balloon_y_spawn": world.balloon_y_spawn, "inputs": [0]}
+                self.step = 0
+                self.pressed = True
+            elif isinstance(event, GameOver) and self.replay is not None:
+                self.replay["steps"] = self.step + 1
+                self.replay["result"] = result_of(world)
+                # written by the writer thread, so the step never waits on the disk
+                self.pending.put((self.replay, time.time()))
+                self.replay = None
+
+    # writes every replay still waiting and stops the writer thread
+    def close(self):
+        self.pending.put(None)
+        self.writer.join()
+
+    # runs on the writer thread. Saves every replay handed to it until it is told to stop.
+    def write_replays(self):
+        while True:
+            finished = self.pending.get()
+            if finished is None:
+                return
+            self.save(*finished)
+
+    # writes a replay that finished at finished_at to a new file and deletes the oldest replays past keep
+    def save(self, replay, finished_at):
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, "replay_%d_%d.json" % (finished_at, replay["seed"]))
+        with open(path, "w") as replay_file:
+            json.dump(replay, replay_file, separators=(",", ":"))
+        self.last_saved = path
+        for old in sorted(glob.glob(os.path.join(self.folder, "replay_*.json")), key=os.path.getmtime)[:-self.keep]:
+            os.remove(old)
+
+
+# the counts a round ended with. Playing a replay back has to end with the same ones.
+def result_of(world):
+    return {"pop_count": world.pop_count, "miss_count": world.miss_count,
+            "balloon_speed": round(world.balloon_speed, 6)}
+
+
+# reads a replay file
+def load_replay(path):
+    with open(path) as replay_file:
+        replay = json.load(replay_file)
+    if replay.get("version") != REPLAY_VERSION:
+        raise ValueError("%s is a version %s replay, this game plays version %d replays"
+                         % (path, replay.get("version"), REPLAY_VERSION))
+    return replay
+
+
+# tells whether the screen is pressed on each step of a replay. Steps have to be asked for in order.
+class InputTrack:
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.next_change = 0
+        self.pressed = False
+        self.step = 0
+
+    # whether the screen is pressed on the next step
+    def next(self):
+        while self.next_change < len(self.inputs) and self.inputs[self.next_change] <= self.step:
+            self.pressed = not self.pressed
+            self.next_change += 1
+        self.step += 1
+        return self.pressed
+
+
+# starts the round of a replay on world. The world has to be waiting for a press to start a round.
+def start_replay(world, replay):
+    world.best_pop_count = replay["best_pop_count"]
+    world.balloon_y_spawn = replay["balloon_y_spawn"]
+    world.start_round(replay["seed"])
+    # the press that started the round is seen again on the first step so the pig accelerates up
+    world.was_pressed = False
+    return InputTrack(replay["inputs"])
+
+
+# plays a replay without a screen as fast as possible and returns the world it was played on. If a profiler is given
+# every step is timed as one of its frames.
+def play(replay, profiler=None):
+    world = World(replay["width"], replay["height"])
+    world.show_tap_to_start()
+    track = start_replay(world, replay)
+    if profiler is None:
+        for _ in range(replay["steps"]):
+            world.step(track.next())
+        return world
+    profiler.instrument(world, PROFILED_STEPS, "world")
+    for _ in range(replay["steps"]):
+        profiler.begin_frame()
+        world.step(track.next())
+        profiler.end_frame(0., {"balloons": world.balloons.live_count()})
+    return world
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play back a Popper Pig replay without a screen.")
+    parser.add_argument("replay", help="replay file to play")
+    parser.add_argument("--repeat", type=int, default=1, help="how many times to play it")
+    parser.add_argument("--profile", help="write a profiler trace of the last playback to this file")
+    options = parser.parse_args()
+    replay = load_replay(options.replay)
+    start = time.perf_counter()
+    for _ in range(options.repeat - 1):
+        play(replay)
+    if options.profile:
+        from profiler import Profiler
+        profiler = Profiler(options.profile)
+        world = play(replay, profiler)
+        profiler.close()
+    else:
+        world = play(replay)
+    seconds = time.perf_counter() - start
+    steps = replay["steps"] * options.repeat
+    print("%d steps in %.3f s, %.0fx real time" % (steps, seconds, steps * STEP / seconds))
+    result = result_of(world)
+    print("result: %s" % result)
+    if "result" in replay and result != replay["result"]:
+        print("the replay did not end the same way it was recorded: %s" % replay["result"])
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+# Draws a widget's whole scene at a lower resolution and stretches it over the screen. Every image in the game is
+# pixel art, so on a high resolution phone most of the pixels drawn are just copies of their neighbours. Drawing the
+# scene into a frame buffer that is only render_height pixels tall and scaling it up with nearest neighbour filtering
+# keeps the pixel art sharp while filling far fewer pixels. Widgets keep their screen sizes and positions (and so does
+# touch input); the frame buffer only scales what they draw.
+
+# import the graphics instructions from kivy
+from kivy.graphics import (ClearBuffers, ClearColor, Color, Fbo, InstructionGroup, PopMatrix, PushMatrix, Rectangle,
+                           Scale)
+
+
+# moves a widget's drawing into a smaller frame buffer and back
+class SceneBuffer:
+    # widget is the widget whose children are drawn into the frame buffer. Its add_widget and remove_widget have to put
+    # children into canvas (see MainGame.add_widget).
+    def __init__(self, widget):
+        self.widget = widget
+        # the frame buffer the children draw into, or None while they draw straight to the screen
+        self.fbo = None
+        self.scale = None
+        # the instructions that draw the frame buffer over the screen, and the rectangle among them
+        self.blit = None
+        self.blit_rectangle = None
+        # the height the scene is drawn at, or 0 for the full screen height
+        self.render_height = 0
+
+    # where the children's canvases are added: the frame buffer while scaling, otherwise the widget's own canvas
+    @property
+    def canvas(self):
+        return self.fbo if self.fbo is not None else self.widget.canvas
+
+    # draws the scene render_height pixels tall. 0 (or a height at least as tall as the widget) draws it at full
+    # resolution straight to the screen.
+    def set_render_height(self, render_height):
+        widget = self.widget
+        if render_height <= 0 or render_height >= widget.height:
+            render_height = 0
+        self.render_height = render_height
+        if not render_height:
+            if self.fbo is not None:
+                self.move_children(self.fbo, widget.canvas)
+                widget.canvas.remove(self.blit)
+                self.fbo = None
+            return
+        scale = render_height / widget.height
+        size = (max(1, round(widget.width * scale)), render_height)
+        if self.fbo is None:
+            self.fbo = Fbo(size=size)
+            with self.fbo.before:
+                # start every frame from black
+                ClearColor(0, 0, 0, 1)
+                ClearBuffers()
+                # widgets keep drawing in screen pixels, which are shrunk into the frame buffer
+                PushMatrix()
+                self.scale = Scale(scale, scale, 1)
+            with self.fbo.after:
+                PopMatrix()
+            self.move_children(widget.canvas, self.fbo)
+            self.blit = self.make_blit()
+            widget.canvas.add(self.blit)
+        else:
+            self.fbo.size = size
+            self.scale.xyz = (scale, scale, 1)
+            self.blit_rectangle.texture = self.fbo.texture
+        # keep the pixels square when the frame buffer is stretched over the screen
+        self.fbo.texture.mag_filter = "nearest"
+        self.blit_rectangle.pos = widget.pos
+        self.blit_rectangle.size = widget.size
+
+    # the frame buffer followed by a rectangle that draws its texture over the whole widget
+    def make_blit(self):
+        blit = InstructionGroup()
+        blit.add(self.fbo)
+        blit.add(Color(1, 1, 1, 1))
+        self.blit_rectangle = Rectangle(texture=self.fbo.texture)
+        blit.add(self.blit_rectangle)
+        return blit
+
+    # moves every child's canvas from one canvas to the other, keeping their order
+    def move_children(self, source, destination):
+        for child in reversed(self.widget.children):
+            source.remove(child.canvas)
+            destination.add(child.canvas)
+
+    # the pixels filled per frame by the full screen layers (layers of them drawn in the scene) plus the blit
+    def fill_pixels(self, layers):
+        widget = self.widget
+        if self.fbo is None:
+            return int(widget.width * widget.height * layers)
+        width, height = self.fbo.size
+        return int(width * height * layers + widget.width * widget.height)
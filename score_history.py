@@ -0,0 +1,134 @@
+# Keeps every finished game in a SQLite database instead of a single best score in a JSON file. Saving a game never
+# waits on the disk: games are handed to a background thread that writes them in batches, with the database in WAL
+# mode so reading the scores never waits on a write. The best score is also kept in memory so the game never has to
+# read the database while it is being played.
+
+# import json and os to migrate the old JSON save, queue, sqlite3, and threading for the writer, and time to date games
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# bump when the tables change and add the change to SCHEMA under the new number
+SCHEMA_VERSION = 1
+SCHEMA = {
+    1: """
+        CREATE TABLE games (
+            id INTEGER PRIMARY KEY,
+            finished_at REAL NOT NULL,
+            score INTEGER NOT NULL,
+            misses INTEGER,
+            speed REAL,
+            duration REAL,
+            seed INTEGER
+        );
+        CREATE INDEX games_by_score ON games (score DESC, finished_at DESC);
+        CREATE INDEX games_by_finished_at ON games (finished_at DESC);
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+    """,
+}
+# the most games the writer commits at once, and how many seconds it waits for more games before committing
+BATCH_SIZE = 64
+BATCH_WAIT = 0.5
+# the columns of a game, in order
+COLUMNS = ("finished_at", "score", "misses", "speed", "duration", "seed")
+
+
+# opens the database at path, creating or upgrading its tables
+def connect(path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    # readers don't wait on the writer, and a commit doesn't wait for the disk to finish every write
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    for upgrade in range(version + 1, SCHEMA_VERSION + 1):
+        connection.executescript(SCHEMA[upgrade])
+        connection.execute("PRAGMA user_version = %d" % upgrade)
+        connection.commit()
+    return connection
+
+
+# every game ever finished on this device
+class ScoreHistory:
+    # path is the database file. The writer thread starts right away.
+    def __init__(self, path):
+        self.path = path
+        # the connection of the thread that made the history, used to read the scores
+        self.connection = connect(path)
+        # the games waiting to be written, then None to stop the writer
+        self.pending = queue.Queue()
+        # the best score, kept up to date as games are recorded
+        self.best = self.connection.execute("SELECT MAX(score) FROM games").fetchone()[0] or 0
+        self.writer = threading.Thread(target=self.write_games, name="ScoreHistoryWriter", daemon=True)
+        self.writer.start()
+
+    # copies the best score out of the old JsonStore save (popper_pig.json) the first time the history is opened.
+    # It is kept as a game with only a score. Returns True if a score was copied.
+    def migrate_json_store(self, json_path, key="bestScore"):
+        connection = self.connection
+        if connection.execute("SELECT 1 FROM settings WHERE key = 'migrated_json_store'").fetchone():
+            return False
+        best = 0
+        if os.path.exists(json_path):
+            with open(json_path) as json_file:
+                best = int(json.load(json_file).get(key, {}).get("best", 0))
+        with connection:
+            if best > 0:
+                connection.execute("INSERT INTO games (finished_at, score) VALUES (?, ?)",
+                                   (os.path.getmtime(json_path), best))
+            connection.execute("INSERT INTO settings (key, value) VALUES ('migrated_json_store', ?)", (json_path,))
+        self.best = max(self.best, best)
+        return best > 0
+
+    # saves a finished game. It is written by the writer thread, so this never waits on the disk.
+    def record(self, score, misses=None, speed=None, duration=None, seed=None):
+        self.best = max(self.best, score)
+        self.pending.put((time.time(), score, misses, speed, duration, seed))
+
+    # the highest scoring games, best first
+    def top(self, count=10):
+        return [dict(row) for row in self.connection.execute(
+            "SELECT * FROM games ORDER BY score DESC, finished_at DESC LIMIT ?", (count,))]
+
+    # the last games finished, newest first
+    def recent(self, count=10):
+        return [dict(row) for row in self.connection.execute(
+            "SELECT * FROM games ORDER BY finished_at DESC LIMIT ?", (count,))]
+
+    # writes every game still waiting and stops the writer thread
+    def close(self):
+        self.pending.put(None)
+        self.writer.join()
+        self.connection.close()
+
+    # runs on the writer thread. Waits for a game, gathers every game that arrives soon after it, and commits them all
+    # at once.
+    def write_games(self):
+        # sqlite connections belong to the thread that made them, so the writer makes its own
+        connection = connect(self.path)
+        stopping = False
+        while not stopping:
+            game = self.pending.get()
+            if game is None:
+                break
+            batch = [game]
+            deadline = time.monotonic() + BATCH_WAIT
+            while len(batch) < BATCH_SIZE:
+                try:
+                    game = self.pending.get(timeout=max(0., deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if game is None:
+                    stopping = True
+                    break
+                batch.append(game)
+            with connection:
+                connection.executemany("INSERT INTO games (%s) VALUES (?, ?, ?, ?, ?, ?)" % ", ".join(COLUMNS),
+                                       batch)
+        connection.close()
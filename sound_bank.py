@@ -0,0 +1,154 @@
+# Loads every sound effect once when the app starts and plays them from a fixed amount of voices. Loading a sound
+# opens and decodes its file, so doing it on every pop or miss made the game stutter at high pop rates. The random pop
+# pitch is pre-rendered into one file per pitch so changing the pitch costs nothing while playing. Rendering the
+# pitches takes a while the first time the game starts, so it happens on a background thread. Until a pitch is ready
+# its clip plays at the original pitch.
+
+# import os to build the pitch cache paths, threading to render the pitches in the background, time to know when
+# voices finish, and wave to read and write the sounds
+import os
+import threading
+import time
+import wave
+from collections import deque
+
+# import numpy to resample the sounds into pitch variants
+import numpy as np
+
+# import SoundLoader, the logger, and mainthread (which runs a function on the next frame of the app) from kivy
+from kivy.clock import mainthread
+from kivy.core.audio import SoundLoader
+from kivy.logger import Logger
+
+
+# writes a copy of a .wav file played back pitch times faster (which raises its pitch) and returns the copy's path.
+# The copy is only rendered once and reused on later starts.
+def render_pitch_variant(source, pitch, cache_folder):
+    name = os.path.splitext(os.path.basename(source))[0]
+    destination = os.path.join(cache_folder, name + "_" + str(pitch) + ".wav")
+    if os.path.exists(destination):
+        return destination
+    # read the samples of every channel
+    with wave.open(source, "rb") as reader:
+        params = reader.getparams()
+        samples = np.frombuffer(reader.readframes(params.nframes), dtype=np.int16)
+    samples = samples.reshape(-1, params.nchannels)
+    # playing pitch times faster means keeping every pitch-th sample, blending between samples when pitch is not
+    # a whole number
+    positions = np.arange(0, len(samples) - 1, pitch)
+    resampled = np.empty((len(positions), params.nchannels), dtype=np.int16)
+    for channel in range(params.nchannels):
+        resampled[:, channel] = np.interp(positions, np.arange(len(samples)), samples[:, channel])
+    # write the variant with the same sample rate as the original
+    os.makedirs(cache_folder, exist_ok=True)
+    with wave.open(destination, "wb") as writer:
+        writer.setnchannels(params.nchannels)
+        writer.setsampwidth(params.sampwidth)
+        writer.setframerate(params.framerate)
+        writer.writeframes(resampled.tobytes())
+    return destination
+
+
+# every sound effect of the game, each loaded into a few voices that can play at the same time
+class SoundBank:
+    # max_voices is how many sounds may play at once. cache_folder is where pitch variants are written.
+    def __init__(self, cache_folder, max_voices=8):
+        self.cache_folder = cache_folder
+        self.max_voices = max_voices
+        # the voices of every clip by name, then by pitch. Each voice is a loaded kivy Sound.
+        self.clips = {}
+        # which voice of each clip and pitch plays next
+        self.next_voice = {}
+        # the (time it finishes, sound) of every voice that is playing, oldest first
+        self.playing = deque()
+        # how many times a sound was played
+        self.plays = 0
+        # how many playing voices were cut off to make room for a new sound
+        self.dropped = 0
+        # the most voices that played at the same time
+        self.peak_voices = 0
+        # how many pitches are still being rendered
+        self.pending_pitches = 0
+
+    # loads a clip. voices is how many copies of each pitch can play at once. pitches lists the pitches to pre-render.
+    # The original pitch is loaded right away, straight from the source file, and the other pitches are rendered on a
+    # background thread and loaded once they are ready.
+    def load(self, name, source, voices=1, pitches=(1.,)):
+        self.clips[name] = {}
+        self.load_voices(name, 1., source, voices)
+        variants = [pitch for pitch in pitches if pitch != 1.]
+        if variants:
+            self.pending_pitches += len(variants)
+            threading.Thread(target=self.render_variants, args=(name, source, voices, variants),
+                             name="PitchRenderer", daemon=True).start()
+
+    # loads voices copies of the sound at path as the clip's pitch
+    def load_voices(self, name, pitch, path, voices):
+        sounds = []
+        for _ in range(voices):
+            sound = SoundLoader.load(path)
+            # the sound shouldn't play on a loop
+            sound.loop = False
+            sounds.append(sound)
+        self.next_voice[(name, pitch)] = 0
+        self.clips[name][pitch] = sounds
+
+    # runs on a background thread. Renders (or finds in the cache) every pitch of a clip and hands each one to the app's
+    # thread to be loaded.
+    def render_variants(self, name, source, voices, pitches):
+        for pitch in pitches:
+            try:
+                path = render_pitch_variant(source, pitch, self.cache_folder)
+            except OSError as error:
+                # the clip keeps playing at the pitches it has
+                Logger.warning("SoundBank: could not render %s at pitch %s: %s" % (source, pitch, error))
+                self.variant_failed()
+                continue
+            self.variant_ready(name, pitch, path, voices)
+
+    # loads a rendered pitch on the app's thread, since kivy's sounds are loaded there
+    @mainthread
+    def variant_ready(self, name, pitch, path, voices):
+        self.load_voices(name, pitch, path, voices)
+        self.pending_pitches -= 1
+
+    # forgets a pitch that couldn't be rendered
+    @mainthread
+    def variant_failed(self):
+        self.pending_pitches -= 1
+
+    # plays a clip at the pre-rendered pitch closest to pitch
+    def play(self, name, pitch=1., volume=1.):
+        now = time.perf_counter()
+        # forget the voices that finished playing
+        while self.playing and self.playing[0][0] <= now:
+            self.playing.popleft()
+        variants = self.clips[name]
+        pitch = min(variants, key=lambda variant: abs(variant - pitch))
+        # take the next voice of this clip and pitch
+        sounds = variants[pitch]
+        index = self.next_voice[(name, pitch)]
+        self.next_voice[(name, pitch)] = (index + 1) % len(sounds)
+        sound = sounds[index]
+        # if that voice is still playing it is restarted, which cuts it off
+        for entry in self.playing:
+            if entry[1] is sound:
+                self.playing.remove(entry)
+                self.dropped += 1
+                break
+        # if every voice is busy, stop the oldest ones. There can be more than max_voices playing right after it was
+        # lowered.
+        while self.playing and len(self.playing) >= self.max_voices:
+            self.playing.popleft()[1].stop()
+            self.dropped += 1
+        sound.volume = volume
+        sound.play()
+        self.playing.append((now + sound.length, sound))
+        self.plays += 1
+        self.peak_voices = max(self.peak_voices, len(self.playing))
+
+    # the bank's counters as a dictionary
+    def stats(self):
+        return {"plays": self.plays, "dropped": self.dropped, "voices_playing": len(self.playing),
+                "peak_voices": self.peak_voices, "max_voices": self.max_voices,
+                "pending_pitches": self.pending_pitches}
@@ -0,0 +1,48 @@
+# Sprites that are drawn by one Rectangle each without being widgets. A kivy Widget with NumericProperty positions
+# runs the property machinery on every change: the new value is checked, every observer is called, and the kv rules
+# bound to it rebuild the Rectangle's pos and size. A Sprite keeps its position and size as plain floats in __slots__
+# and writes them straight into the Rectangle it owns, so moving it is two attribute writes. Widgets and their
+# properties are left to the HUD and the menus, which change rarely and need touch and layout.
+
+# import Rectangle and Widget from kivy
+from kivy.graphics import Rectangle
+from kivy.uix.widget import Widget
+
+
+# one textured rectangle on the screen
+class Sprite:
+    __slots__ = ("x", "y", "width", "height", "rectangle")
+
+    # texture is the atlas texture and region the u0, v0, u1, v1 part of it the sprite shows
+    def __init__(self, texture, region, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        u0, v0, u1, v1 = region
+        self.rectangle = Rectangle(texture=texture, pos=(x, y), size=(width, height),
+                                   tex_coords=(u0, v0, u1, v0, u1, v1, u0, v1))
+
+    # moves the sprite's bottom-left corner to x, y
+    def move_to(self, x, y):
+        self.x = x
+        self.y = y
+        self.rectangle.pos = (x, y)
+
+    # changes the size of the sprite
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        self.rectangle.size = (width, height)
+
+
+# a widget that draws sprites in the order they were added. It is the only widget the sprites need.
+class SpriteLayer(Widget):
+    # draws a sprite above the ones already in the layer
+    def add(self, sprite):
+        self.canvas.add(sprite.rectangle)
+        return sprite
+
+    # stops drawing a sprite
+    def remove(self, sprite):
+        self.canvas.remove(sprite.rectangle)
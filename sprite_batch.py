@@ -0,0 +1,154 @@
+# Draws many sprites with a single draw call. Instead of giving every balloon, cloud, and pop image its own Rectangle
+# (one canvas instruction, one texture bind, and one draw call each), every sprite of a layer is written as a quad into
+# one Mesh that uses one shared texture. The amount of draw calls stays the same no matter how many sprites are on
+# the screen.
+
+# import Mesh, RenderContext, and the matrix instructions from kivy
+from kivy.graphics import Mesh, PopMatrix, PushMatrix, RenderContext, Translate
+from kivy.uix.widget import Widget
+
+# each vertex is an x and y position, a u and v texture coordinate, and an alpha value so every sprite can have its
+# own opacity
+VERTEX_FORMAT = [(b"vPosition", 2, "float"), (b"vTexCoords0", 2, "float"), (b"vAlpha", 1, "float")]
+# floats per vertex
+STRIDE = 5
+
+# the shader draws the texture like kivy's default shader, but takes its opacity from each vertex instead of from the
+# canvas
+SHADER_VS = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+attribute vec2 vPosition;
+attribute vec2 vTexCoords0;
+attribute float vAlpha;
+uniform mat4 modelview_mat;
+uniform mat4 projection_mat;
+varying vec2 tex_coord0;
+varying float frag_alpha;
+void main(void) {
+    tex_coord0 = vTexCoords0;
+    frag_alpha = vAlpha;
+    gl_Position = projection_mat * modelview_mat * vec4(vPosition.xy, 0.0, 1.0);
+}
+"""
+SHADER_FS = """
+#ifdef GL_ES
+    precision highp float;
+#endif
+varying vec2 tex_coord0;
+varying float frag_alpha;
+uniform sampler2D texture0;
+void main(void) {
+    gl_FragColor = texture2D(texture0, tex_coord0) * vec4(1.0, 1.0, 1.0, frag_alpha);
+}
+"""
+
+
+# a Mesh of textured quads. Every sprite owns a slot in the mesh and is drawn by writing the quad of that slot.
+class SpriteBatch:
+    # texture is shared by every sprite in the batch. capacity is how many quads fit before the batch grows.
+    def __init__(self, texture, capacity=16):
+        self.texture = texture
+        # the vertices of every slot, 4 vertices per quad
+        self.vertices = [0.] * (capacity * 4 * STRIDE)
+        # the slots that have a quad to draw
+        self.quads = set()
+        # True when the vertices changed since the mesh was last uploaded
+        self.dirty = False
+        # moves every quad in the batch at once. Layers that scroll together only change this instead of their
+        # vertices.
+        self.translate = Translate()
+        self.mesh = Mesh(fmt=VERTEX_FORMAT, mode="triangles", texture=texture)
+
+    # how many quads fit in the batch
+    @property
+    def capacity(self):
+        return len(self.vertices) // (4 * STRIDE)
+
+    # writes the quad of a slot. region is the u0, v0, u1, v1 part of the texture to draw.
+    def set_quad(self, slot, x, y, width, height, region, alpha=1.):
+        # double the size of the batch until the slot fits
+        while slot >= self.capacity:
+            self.vertices.extend([0.] * len(self.vertices))
+        u0, v0, u1, v1 = region
+        # the 4 corners of the quad, counter-clockwise from the bottom-left
+        start = slot * 4 * STRIDE
+        self.vertices[start:start + 4 * STRIDE] = [
+            x, y, u0, v0, alpha,
+            x + width, y, u1, v0, alpha,
+            x + width, y + height, u1, v1, alpha,
+            x, y + height, u0, v1, alpha]
+        self.quads.add(slot)
+        self.dirty = True
+
+    # replaces every quad of the batch with the quads in vertices, a flat list of 4 vertices per quad. Used by layers
+    # that rebuild all their quads at once, like the particle emitter.
+    def set_quads(self, vertices):
+        count = len(vertices) // (4 * STRIDE)
+        # the batch keeps at least its capacity so slots written later still fit
+        if len(vertices) < len(self.vertices):
+            vertices = vertices + self.vertices[len(vertices):]
+        self.vertices = vertices
+        self.quads = set(range(count))
+        self.dirty = True
+
+    # stops drawing the quad of a slot
+    def hide_quad(self, slot):
+        self.quads.discard(slot)
+        self.dirty = True
+
+    # stops drawing every quad
+    def clear(self):
+        self.quads.clear()
+        self.dirty = True
+
+    # uploads the vertices to the mesh if they changed. Returns how many vertices were uploaded.
+    def flush(self):
+        if not self.dirty:
+            return 0
+        # two triangles per visible quad
+        indices = []
+        for slot in sorted(self.quads):
+            first = slot * 4
+            indices.extend((first, first + 1, first + 2, first + 2, first + 3, first))
+        self.mesh.vertices = self.vertices
+        self.mesh.indices = indices
+        self.dirty = False
+        return len(self.vertices) // STRIDE
+
+
+# a widget that draws every sprite batch of the game. Batches are drawn in the order they are added, so the first
+# batch is at the back.
+class BatchRenderer(Widget):
+    def __init__(self, texture, **kwargs):
+        # the widget draws with its own shader that reads each sprite's opacity from its vertices
+        self.canvas = RenderContext(use_parent_projection=True, use_parent_modelview=True,
+                                    use_parent_frag_modelview=True)
+        self.canvas.shader.vs = SHADER_VS
+        self.canvas.shader.fs = SHADER_FS
+        super(BatchRenderer, self).__init__(**kwargs)
+        self.texture = texture
+        # every batch by name
+        self.batches = {}
+        # draw calls issued and vertices uploaded during the last flush
+        self.draw_calls = 0
+        self.vertices_uploaded = 0
+
+    # adds a batch of sprites in front of the batches that were already added
+    def add_batch(self, name, capacity=16):
+        batch = SpriteBatch(self.texture, capacity)
+        # each batch has its own translation so it can scroll on its own
+        with self.canvas:
+            PushMatrix()
+            self.canvas.add(batch.translate)
+            self.canvas.add(batch.mesh)
+            PopMatrix()
+        self.batches[name] = batch
+        return batch
+
+    # uploads every batch that changed. Called once per frame after the sprites were moved.
+    def flush(self):
+        self.vertices_uploaded = sum(batch.flush() for batch in self.batches.values())
+        # a batch only issues a draw call if it has something to draw
+        self.draw_calls = sum(1 for batch in self.batches.values() if batch.quads)
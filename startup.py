@@ -0,0 +1,58 @@
+# Times the phases of starting the app, from the first line of main.py to the first frame of the title menu and on to
+# the moment the game can be played. main.py marks the end of each phase (the imports, the app's settings, the
+# textures, the title menu, the first frame, the sounds, and the score history). A phase's time is the time since the
+# mark before it.
+#
+# The marks are always taken since they cost a clock read each. Setting POPPER_PIG_STARTUP_TRACE reports them once the
+# game is loaded: "1" only writes them to the log, anything else is also the file a JSON object of them is added to on
+# every start, so the start up times of many launches (and builds) can be compared.
+
+# import json to write the trace, os to read the environment, and time to time the phases
+import json
+import os
+import time
+
+
+# the time every phase of the start up took
+class StartupTrace:
+    def __init__(self):
+        # the moment the trace was made, which is when main.py started, and the moment of the last mark
+        self.start = time.perf_counter()
+        self.last_mark = self.start
+        # one (phase name, milliseconds) entry per phase, in order
+        self.phases = []
+
+    # ends the phase called name, which started at the last mark
+    def mark(self, name):
+        now = time.perf_counter()
+        self.phases.append((name, (now - self.last_mark) * 1000))
+        self.last_mark = now
+
+    # the milliseconds from the start to the mark of the phase called name, or to the last mark if name is None
+    def elapsed(self, name=None):
+        total = 0.
+        for phase, milliseconds in self.phases:
+            total += milliseconds
+            if phase == name:
+                break
+        return total
+
+    # the phases as a dictionary, with the time to the first frame and the total
+    def report(self):
+        return {"time": time.time(), "phases": {name: round(milliseconds, 1) for name, milliseconds in self.phases},
+                "first_frame_ms": round(self.elapsed("first frame"), 1), "total_ms": round(self.elapsed(), 1)}
+
+    # one line per phase and one for the totals, for the log
+    def lines(self):
+        lines = ["%-16s %8.1f ms" % (name, milliseconds) for name, milliseconds in self.phases]
+        lines.append("first frame after %.1f ms, playable after %.1f ms" % (self.elapsed("first frame"),
+                                                                            self.elapsed()))
+        return lines
+
+    # adds the report to the end of a file of one JSON object per start
+    def write(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "a") as trace:
+            trace.write(json.dumps(self.report()) + "\n")
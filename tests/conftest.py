@@ -0,0 +1,5 @@
+# the tests import the game's modules from the project folder, which isn't a package
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,106 @@
+# BalloonField: growing the ring without losing track of the balloons, and finding the missed and popped balloons by
+# looking at the front of the sorted ring only.
+
+import random
+
+import numpy as np
+
+from balloon_field import BalloonField
+
+
+# spawns a balloon 10 pixels wide and tall at x and y and returns its slot
+def spawn(field, x, y=0., colour=0):
+    slot, moved = field.spawn(x, y, 10., 10., colour)
+    return slot
+
+
+def test_a_full_ring_grows_and_says_where_every_balloon_went():
+    field = BalloonField(4)
+    for x in (-100., -100., 100., 110.):
+        spawn(field, x)
+    # the two balloons at the front are missed, so the ring starts at slot 2 and wraps around into slots 0 and 1
+    popped, missed = field.step(0., 0., 1000., 1., 1.)
+    assert missed == [0, 1]
+    assert (field.head, field.count) == (2, 2)
+    assert spawn(field, 120., colour=1) == 0
+    assert spawn(field, 130., colour=2) == 1
+    old_x = field.x.copy()
+    old_colour = field.colour.copy()
+    slot, moved = field.spawn(140., 0., 10., 10., 3)
+    # the balloons were unrolled oldest first into a ring twice the size
+    assert list(moved) == [2, 3, 0, 1]
+    assert field.capacity == 8
+    assert field.head == 0
+    assert slot == 4
+    for new_slot, old_slot in enumerate(moved):
+        assert field.x[new_slot] == old_x[old_slot]
+        assert field.colour[new_slot] == old_colour[old_slot]
+    assert list(field.x[:5]) == [100., 110., 120., 130., 140.]
+    assert list(field.live_indices()) == [0, 1, 2, 3, 4]
+
+
+def test_only_the_front_of_the_ring_is_missed():
+    field = BalloonField(8)
+    for x in (-30., -20., 5., 50.):
+        spawn(field, x)
+    popped, missed = field.step(0., 1000., 1000., 1., 1.)
+    # a balloon is missed once it is a full width past the left side of the screen
+    assert missed == [0, 1]
+    assert popped == []
+    assert field.live_count() == 2
+    assert (field.head, field.count) == (2, 2)
+
+
+def test_only_the_balloons_up_to_the_right_of_the_pig_are_tested():
+    field = BalloonField(8)
+    for x in (10., 20., 30., 500., 600.):
+        spawn(field, x, y=100.)
+    # the pig's right side is at 40
+    popped, missed = field.step(0., 0., 100., 40., 50.)
+    assert popped == [0, 1, 2]
+    assert field.candidates == 3
+    assert field.live_count() == 2
+
+
+# the collision check every balloon used to get: on the screen, within the pig's left and right, and within its top and
+# bottom
+def brute_force_pops(field, pig_x, pig_y, pig_width, pig_height):
+    slots = field.live_indices()
+    x = field.x[slots]
+    y = field.y[slots]
+    hit = (x >= 0) & (x <= pig_x + pig_width) & (y >= pig_y / 1.1) & (y <= pig_y + pig_height)
+    return sorted(int(slot) for slot in slots[hit])
+
+
+def test_the_sorted_ring_pops_and_misses_what_checking_every_balloon_would():
+    rng = random.Random(7)
+    field = BalloonField(4)
+    next_x = 0.
+    totals = [0, 0]
+    for _ in range(2000):
+        # balloons spawn at the right edge in x order, some steps apart
+        if rng.random() < 0.4:
+            next_x = max(next_x, 400.)
+            spawn(field, next_x, rng.uniform(0., 300.), rng.randint(0, 3))
+            next_x += 12.
+        speed = rng.uniform(1., 8.)
+        next_x -= speed
+        pig = (20., rng.uniform(0., 300.), 40., 30.)
+        live_before = set(int(slot) for slot in field.live_indices())
+        expected_missed = sorted(slot for slot in live_before if field.x[slot] < -field.width[slot])
+        # the pops are checked after the balloons moved and the missed balloons are gone
+        shadow = BalloonField(field.capacity)
+        for name in ("x", "y", "width", "height", "colour", "alive"):
+            setattr(shadow, name, getattr(field, name).copy())
+        shadow.alive[expected_missed] = False
+        shadow.x -= speed
+        expected_popped = brute_force_pops(shadow, *pig)
+        popped, missed = field.step(speed, *pig)
+        assert sorted(missed) == expected_missed
+        assert sorted(popped) == expected_popped
+        assert np.array_equal(field.alive, shadow.alive & ~np.isin(np.arange(field.capacity), expected_popped))
+        totals[0] += len(popped)
+        totals[1] += len(missed)
+    # the ring grew and wrapped around, and both checks found balloons
+    assert field.capacity > 4
+    assert totals[0] > 0 and totals[1] > 0
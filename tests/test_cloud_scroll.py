@@ -0,0 +1,48 @@
+# Ticks a world on the title menu the way the game does, at the full frame rate, then idle, then awake again, and
+# checks the clouds slide a little every tick instead of standing still and jumping.
+
+import math
+
+from cloud_scroll import cloud_position, layer_span
+from timestep import FixedTimestep
+from world import STEP, World
+
+# the front cloud layer of a 1920x1080 screen: it drifts 7.5 pixels per step and repeats every 2160 pixels
+DRIFT = 7.5
+LAYER_WIDTH = 2160.
+WIDTH = 1920.
+
+
+# ticks world every time_passed seconds for ticks ticks and returns the left texture coordinate of the front cloud
+# layer after every tick
+def tick(world, timestep, time_passed, ticks):
+    spans = []
+    for _ in range(ticks):
+        for _ in range(timestep.advance(time_passed)):
+            world.step(False)
+        spans.append(layer_span(*cloud_position(world, timestep.alpha), DRIFT, LAYER_WIDTH, WIDTH)[0])
+    return spans
+
+
+def test_the_clouds_drift_while_idle_and_do_not_jump_when_the_game_wakes_up():
+    world = World(1920, 1080, seed=1)
+    timestep = FixedTimestep()
+    max_steps = timestep.max_steps
+    idle_steps = math.ceil(1. / (10 * STEP)) + 1
+    awake = tick(world, timestep, STEP, 30)
+    # idle at 10 ticks per second for 10 seconds, catching up on every step like the game does
+    timestep.max_steps = idle_steps
+    idle = tick(world, timestep, 0.1, 100)
+    # woken up by a touch half way to the next idle tick
+    woke = tick(world, timestep, 0.05, 1)
+    timestep.max_steps = max_steps
+    after_waking = tick(world, timestep, STEP, 30)
+    # how far the clouds slide per step, in texture coordinates
+    per_step = (world.balloon_speed + DRIFT) / LAYER_WIDTH
+    # a tick never slides the clouds further than the steps it may run, even the tick that woke the game up
+    spans = awake + idle + woke + after_waking
+    for before, after in zip(spans, spans[1:]):
+        assert 0 < (after - before) % 1. <= idle_steps * per_step
+    # once awake again a tick slides them no further than before idling
+    for before, after in zip(after_waking, after_waking[1:]):
+        assert (after - before) % 1. <= max_steps * per_step
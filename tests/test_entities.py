@@ -0,0 +1,141 @@
+# Plays games without a screen through the same RoundEntities the game uses and checks that every entity and callback
+# is gone after each of them.
+
+# import heapq to order the callbacks of the headless clock
+import heapq
+
+from benchmark import scripted_input
+from entities import EntityRegistry, RoundEntities
+from game_events import EventBus, GameOver, RoundReady
+from world import STEP, World
+
+
+# a clock for playing without a screen that runs its callbacks as the steps of a world pass
+class StepClock:
+    def __init__(self):
+        self.time = 0.
+        # the (time it fires, order scheduled, event) of every scheduled callback
+        self.queue = []
+        self.scheduled = 0
+
+    # a callback scheduled on the step clock
+    class Event:
+        def __init__(self, callback):
+            self.callback = callback
+
+        def cancel(self):
+            self.callback = None
+
+    def schedule_once(self, callback, delay):
+        event = StepClock.Event(callback)
+        heapq.heappush(self.queue, (self.time + delay, self.scheduled, event))
+        self.scheduled += 1
+        return event
+
+    # moves time forward and runs every callback that is due
+    def tick(self, time_passed):
+        self.time += time_passed
+        while self.queue and self.queue[0][0] <= self.time:
+            event = heapq.heappop(self.queue)[2]
+            if event.callback is not None:
+                event.callback(time_passed)
+
+
+# stands in for the pop count widget. Counts the times its misses label turned green and back.
+class Hud:
+    def __init__(self):
+        self.flashes = 0
+        self.green = False
+
+    def show_bonus(self):
+        self.flashes += 1
+        self.green = True
+
+    def ungreen_label(self, time_passed):
+        self.green = False
+
+
+# a sprite of the round. Only its kind matters.
+class Sprite:
+    def __init__(self, kind):
+        self.kind = kind
+
+
+# a world with round entities wired to it the way MainGame wires them, and the sprites they put on the screen
+class Game:
+    def __init__(self, seed=1234, width=1920, height=1080):
+        self.clock = StepClock()
+        self.registry = EntityRegistry(self.clock.schedule_once)
+        self.world = World(width, height, seed=seed)
+        self.shown = []
+        self.round_entities = RoundEntities(self.registry, self.world, lambda: Sprite("pig"),
+                                            lambda: Sprite("tap_to_start"), self.shown.append, self.shown.remove)
+        self.bus = EventBus()
+        self.round_entities.subscribe(self.bus)
+        self.hud = Hud()
+        self.world.show_tap_to_start()
+        self.round_entities.start(self.hud)
+        self.frame = 0
+
+    # steps the world once with the scripted player and returns the events of the step
+    def step(self):
+        events = self.world.step(scripted_input(self.world, self.frame))
+        self.bus.publish_all(events)
+        self.round_entities.update()
+        self.clock.tick(STEP)
+        self.frame += 1
+        return events
+
+    # what is on the screen and waiting to fire, and the balloons left in the world
+    def snapshot(self):
+        return (self.registry.stats()["live"], self.registry.pending(), sorted(sprite.kind for sprite in self.shown),
+                self.world.balloons.live_count())
+
+
+def test_games_leave_no_entities_behind():
+    game = Game()
+    baseline = game.snapshot()
+    assert baseline == ({"hud": 1, "pig": 1, "tap_to_start": 1}, 0, ["pig", "tap_to_start"], 0)
+    games = 0
+    while games < 100:
+        if any(isinstance(event, RoundReady) for event in game.step()):
+            games += 1
+            assert game.snapshot() == baseline, "game %d" % games
+    stats = game.registry.stats()
+    # every round removed its pig and its tap to start image, and the bonus lives flashed the HUD
+    assert stats["removed"] == 200
+    assert game.hud.flashes > 0
+    assert stats["fired"] + stats["cancelled"] == game.hud.flashes
+    assert not game.hud.green
+
+
+def test_popped_pig_leaves_the_screen_before_the_next_round():
+    game = Game()
+    while not any(isinstance(event, GameOver) for event in game.step()):
+        pass
+    # the world lets go of the pig on the step after the game is over
+    assert game.round_entities.pig is not None
+    game.step()
+    assert not game.world.pig_alive
+    assert game.round_entities.pig is None
+    assert game.round_entities.update() is None
+    assert [sprite.kind for sprite in game.shown] == []
+    while not any(isinstance(event, RoundReady) for event in game.step()):
+        pass
+    assert game.round_entities.update() is game.round_entities.pig
+    assert sorted(sprite.kind for sprite in game.shown) == ["pig", "tap_to_start"]
+
+
+def test_removing_an_entity_cancels_its_callbacks_once():
+    clock = StepClock()
+    registry = EntityRegistry(clock.schedule_once)
+    removed = []
+    fired = []
+    entity = registry.add(object(), "pig", removed.append)
+    registry.schedule(entity, fired.append, 0.1)
+    assert registry.remove(entity)
+    assert not registry.remove(entity)
+    clock.tick(1.)
+    assert removed == [entity]
+    assert fired == []
+    assert registry.stats()["cancelled"] == 1
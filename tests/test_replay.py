@@ -0,0 +1,58 @@
+# Recording rounds and playing them back: a replay has to end exactly the way its round did.
+
+import glob
+import os
+
+import pytest
+
+from benchmark import scripted_input
+from game_events import GameOver
+from replay import Recorder, load_replay, play, result_of
+from world import World
+
+
+# plays rounds on a world with the scripted player while recorder records them, and returns the result of every round
+def record_rounds(recorder, rounds, seed=1234):
+    world = World(1920, 1080, seed=seed)
+    world.show_tap_to_start()
+    results = []
+    frame = 0
+    while len(results) < rounds:
+        pressed = scripted_input(world, frame)
+        recorder.before_step(world, pressed)
+        events = world.step(pressed)
+        recorder.after_step(world, events)
+        if any(isinstance(event, GameOver) for event in events):
+            results.append(result_of(world))
+        frame += 1
+    return results
+
+
+def test_every_recorded_round_plays_back_the_same(tmp_path):
+    recorder = Recorder(str(tmp_path), keep=10)
+    results = record_rounds(recorder, 3)
+    # the replays are written by the writer thread, which finishes them before it stops
+    recorder.close()
+    replays = [load_replay(path) for path in sorted(glob.glob(os.path.join(str(tmp_path), "replay_*.json")),
+                                                    key=os.path.getmtime)]
+    assert len(replays) == 3
+    assert [replay["result"] for replay in replays] == results
+    for replay in replays:
+        assert result_of(play(replay)) == replay["result"]
+        # and the same again, so nothing of the last playback is kept
+        assert result_of(play(replay)) == replay["result"]
+
+
+def test_only_the_most_recent_replays_are_kept(tmp_path):
+    recorder = Recorder(str(tmp_path), keep=2)
+    record_rounds(recorder, 4)
+    recorder.close()
+    assert len(glob.glob(os.path.join(str(tmp_path), "replay_*.json"))) == 2
+    assert os.path.exists(recorder.last_saved)
+
+
+def test_a_replay_of_another_version_is_refused(tmp_path):
+    path = tmp_path / "replay_old.json"
+    path.write_text('{"version": 0}')
+    with pytest.raises(ValueError):
+        load_replay(str(path))
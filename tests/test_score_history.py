@@ -0,0 +1,71 @@
+# ScoreHistory: moving the best score out of the old JSON save, and reading the top and the recent games back.
+
+import json
+
+from score_history import ScoreHistory
+
+
+def test_the_old_best_score_is_migrated_once(tmp_path):
+    json_path = tmp_path / "popper_pig.json"
+    json_path.write_text(json.dumps({"bestScore": {"best": 42}}))
+    history = ScoreHistory(str(tmp_path / "scores.db"))
+    try:
+        assert history.migrate_json_store(str(json_path))
+        assert history.best == 42
+        assert [game["score"] for game in history.top()] == [42]
+        # the save is only read the first time, even if it changed since
+        json_path.write_text(json.dumps({"bestScore": {"best": 99}}))
+        assert not history.migrate_json_store(str(json_path))
+        assert history.best == 42
+    finally:
+        history.close()
+    # the migrated score is still there once the history is opened again
+    history = ScoreHistory(str(tmp_path / "scores.db"))
+    try:
+        assert history.best == 42
+        assert not history.migrate_json_store(str(json_path))
+    finally:
+        history.close()
+
+
+def test_a_missing_or_empty_save_migrates_nothing(tmp_path):
+    history = ScoreHistory(str(tmp_path / "scores.db"))
+    try:
+        assert not history.migrate_json_store(str(tmp_path / "missing.json"))
+        assert history.best == 0
+        assert history.top() == []
+    finally:
+        history.close()
+    empty = tmp_path / "empty.json"
+    empty.write_text(json.dumps({"bestScore": {"best": 0}}))
+    history = ScoreHistory(str(tmp_path / "other.db"))
+    try:
+        assert not history.migrate_json_store(str(empty))
+        assert history.top() == []
+    finally:
+        history.close()
+
+
+def test_top_and_recent_games(tmp_path):
+    path = str(tmp_path / "scores.db")
+    history = ScoreHistory(path)
+    scores = [5, 30, 12, 30, 1]
+    for seed, score in enumerate(scores):
+        history.record(score, misses=10, speed=6.5, duration=20., seed=seed)
+    # the best score is known before the games are written
+    assert history.best == 30
+    # closing writes every game still waiting
+    history.close()
+    history = ScoreHistory(path)
+    try:
+        assert history.best == 30
+        top = history.top(3)
+        assert [game["score"] for game in top] == [30, 30, 12]
+        # equal scores are ordered newest first
+        assert [game["seed"] for game in top[:2]] == [3, 1]
+        recent = history.recent(2)
+        assert [game["seed"] for game in recent] == [4, 3]
+        assert recent[0]["misses"] == 10 and recent[0]["speed"] == 6.5 and recent[0]["duration"] == 20.
+        assert len(history.recent(100)) == len(scores)
+    finally:
+        history.close()
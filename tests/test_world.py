@@ -0,0 +1,144 @@
+# The rules of World: starting a round, losing it, the bonus lives, and playing the same game from the same seed.
+
+from benchmark import scripted_input
+from game_events import BalloonsCleared, BonusLives, GameOver, RoundReady, RoundStarted
+from world import STEP, World
+
+
+# steps world with the screen pressed or not until an event of event_type happens and returns the events of that step
+def step_until(world, event_type, pressed=False, limit=100000):
+    for _ in range(limit):
+        events = world.step(pressed)
+        if any(isinstance(event, event_type) for event in events):
+            return events
+    raise AssertionError("no %s after %d steps" % (event_type.__name__, limit))
+
+
+# the types of the events of a step. The events without fields are all equal empty tuples, so they are told apart by
+# type.
+def kinds(events):
+    return [type(event) for event in events]
+
+
+# a world waiting on the tap to start screen
+def waiting_world(seed=1234):
+    world = World(1920, 1080, seed=seed)
+    world.show_tap_to_start()
+    return world
+
+
+def test_presses_on_the_title_menu_do_not_start_a_round():
+    world = World(1920, 1080, seed=1234)
+    assert world.step(True) == []
+    assert world.game_stage == "menu"
+
+
+def test_a_press_on_the_tap_to_start_screen_starts_a_round():
+    world = waiting_world()
+    assert kinds(world.step(True)) == [RoundStarted]
+    assert world.game_stage == "inGame"
+    assert not world.waiting_for_tap
+    assert world.balloon_speed == 5 * (world.balloon_width / 48.467)
+    assert world.pig_thrust == "up"
+
+
+def test_too_many_misses_end_the_round_and_the_next_one_is_ready_half_a_second_later():
+    world = waiting_world()
+    # the pig floats still until the screen is pressed, so the balloons fly past it
+    world.start_round()
+    step_until(world, GameOver)
+    assert world.miss_count == world.misses_allowed == 10
+    assert world.game_stage == "endGame"
+    assert world.balloon_speed == 0
+    assert world.final_speed > 0
+    assert world.round_duration > 0
+    steps = 0
+    while True:
+        events = world.step(False)
+        steps += 1
+        if RoundReady in kinds(events):
+            break
+    assert steps * STEP >= 0.5
+    assert BalloonsCleared in kinds(events)
+    assert world.balloons.live_count() == 0
+    assert world.waiting_for_tap
+    assert world.pig_alive
+    assert world.pig_y == world.height / 2
+
+
+def test_flying_off_the_screen_ends_the_round():
+    world = waiting_world()
+    # holding the screen sends the pig up and off the top of the screen
+    step_until(world, GameOver, pressed=True)
+    assert world.pig_y > world.height
+
+
+def test_a_new_best_score_is_kept():
+    world = waiting_world()
+    world.step(True)
+    world.pop_count = 3
+    world.best_pop_count = 2
+    world.miss_count = world.misses_allowed
+    assert GameOver(True) in step_until(world, GameOver)
+    assert world.best_pop_count == 3
+
+
+def test_the_best_label_only_follows_a_score_that_beats_the_best():
+    world = waiting_world()
+    world.step(True)
+    world.best_pop_count = 3
+    world.pop_count = 3
+    # a tie isn't a new best, so the best label keeps the best score
+    assert world.hud_text() == ("3", "0/10", None)
+    world.miss_count = world.misses_allowed
+    assert GameOver(False) in step_until(world, GameOver)
+    assert world.best_pop_count == 3
+    world = waiting_world()
+    world.step(True)
+    world.best_pop_count = 3
+    world.pop_count = 4
+    assert world.hud_text() == ("4", "0/10", "Best:4")
+
+
+def test_every_50_pops_allow_10_more_misses_once():
+    world = waiting_world()
+    world.step(True)
+    world.pop_count = 50
+    world.check_bonus_lives()
+    assert world.misses_allowed == 20
+    assert kinds(world.events) == [RoundStarted, BonusLives]
+    # still 50 pops, so no more lives
+    world.check_bonus_lives()
+    assert world.misses_allowed == 20
+    world.pop_count = 51
+    world.check_bonus_lives()
+    assert not world.added_lives
+    world.pop_count = 100
+    world.check_bonus_lives()
+    assert world.misses_allowed == 30
+    assert kinds(world.events).count(BonusLives) == 2
+
+
+def test_a_new_round_takes_the_bonus_lives_back():
+    world = waiting_world()
+    world.step(True)
+    world.pop_count = 50
+    world.check_bonus_lives()
+    world.start_round()
+    assert world.misses_allowed == 10
+    assert world.pop_count == 0
+    assert not world.added_lives
+
+
+def test_the_same_seed_plays_the_same_games():
+    results = []
+    for _ in range(2):
+        world = waiting_world(seed=99)
+        pops = []
+        for frame in range(20000):
+            for event in world.step(scripted_input(world, frame)):
+                if isinstance(event, GameOver):
+                    pops.append((world.pop_count, world.miss_count, world.seed))
+        results.append(pops)
+    assert results[0]
+    assert results[0] == results[1]
@@ -0,0 +1,48 @@
+# Runs the world at a fixed rate whatever the frame rate of the screen. The time of every frame is added to an
+# accumulator and the world is stepped once for every whole step that fits in it. What is left over tells how far the
+# frame is between the last two steps, so the screen can draw things between where they were and where they are.
+# A slow device runs at most max_steps steps per frame and lets the rest of the time go, so the game slows down
+# instead of falling further and further behind.
+
+# import the length of one world step
+from world import STEP
+
+
+# counts how many world steps each frame should run
+class FixedTimestep:
+    # step_length is the seconds of one world step. max_steps is the most steps one frame may catch up on.
+    def __init__(self, step_length=STEP, max_steps=5):
+        self.step_length = step_length
+        self.max_steps = max_steps
+        # seconds that passed but have not been stepped yet
+        self.accumulator = 0.
+        # how many steps were run and how many were let go because a frame took too long
+        self.steps = 0
+        self.dropped_steps = 0
+
+    # adds the seconds a frame took and returns how many steps the world should run for it
+    def advance(self, time_passed):
+        self.accumulator += time_passed
+        steps = int(self.accumulator / self.step_length)
+        if steps > self.max_steps:
+            # too far behind to catch up. Keep the leftover part of a step so the frame still lands between two steps.
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = self.accumulator % self.step_length + steps * self.step_length
+        self.accumulator -= steps * self.step_length
+        self.steps += steps
+        return steps
+
+    # forgets the time that passed but was not stepped, so the next frame starts on a whole step
+    def reset(self):
+        self.accumulator = 0.
+
+    # how far the frame is between the last step and the next one, from 0 to 1
+    @property
+    def alpha(self):
+        return self.accumulator / self.step_length
+
+
+# the value drawn alpha of the way between where something was before the last step and where it is now
+def interpolate(previous, current, alpha):
+    return previous + (current - previous) * alpha
@@ -0,0 +1,349 @@
+# The rules of Popper Pig without any graphics. Everything that happens in a game (the pig flying, balloons spawning,
+# moving, popping, and being missed, lives being added, and the game ending) happens in World.step. World does not
+# import kivy, so games can be simulated, benchmarked, and tested on a computer with no screen. main.py only draws
+# what the world says and tells it when the screen is touched.
+#
+# Neither does any other module that doesn't draw, load, or play something itself: the balloon field, the events, the
+# entity registry, the particle emitter, the replays, the score history, the profiler, the gc policy, the quality
+# governor, the timestep, the cloud scroll, the start up trace, the batch simulator, and the benchmark. They are
+# handed whatever kivy part they need (a clock, a sprite batch) by main.py.
+
+# import the math and random packages
+import math
+import random
+
+# import the balloon field that moves and collides every balloon at once
+from balloon_field import BalloonField
+# import the events the world makes when something happens
+from game_events import (BalloonMissed, BalloonPopped, BalloonsCleared, BalloonSpawned, BonusLives, GameOver,
+                         RoundReady, RoundStarted)
+
+# the world always advances 1/60th of a second per step, whatever the frame rate of the screen. Everything that moves
+# moves a fixed amount per step, so the game plays at the same speed on every device.
+STEP = 1 / 60.
+
+
+# a game of Popper Pig on a screen of the given width and height. seed makes every random choice repeatable.
+class World:
+    def __init__(self, width, height, seed=None):
+        self.width = width
+        self.height = height
+        # random choices that change the game (where balloons go). Reseeded every round.
+        self.random = random.Random(seed)
+        # random choices that only change how the game looks (clouds and pop pitch), kept apart so they never change
+        # the game
+        self.cosmetic_random = random.Random(seed)
+        # the seed of the current round
+        self.seed = seed
+        # set the balloon height to 6.93% of the screen
+        self.balloon_height = height * 0.0693
+        # persevere the width:height ratio of the balloon.png file
+        self.balloon_width = (87 / 103) * self.balloon_height
+        # sets the height of the pig to be 10.38% of the screen's height. This multiplier was obtained by drawing out
+        # the desired final product in photoshop and calculating how much the pig took up of the screen's height.
+        self.pig_height = height * 0.1038
+        # ensures the width and height of the pig maintain the same ratio as the pig.png file
+        self.pig_width = (234 / 171) * self.pig_height
+        # places the left side of the pig half of a pig's width from the left side of the screen
+        self.pig_x = self.pig_width / 2
+        # sets the starting y position of the pig to the middle
+        self.pig_y = height / 2
+        # where the pig was before the last step
+        self.previous_pig_y = self.pig_y
+        # how fast the pig moves. Positive velocity = up. Negative = down.
+        self.pig_velocity = 0
+        # which way the pig is accelerating: "up" while the screen is pressed, "down" once it is released. None until
+        # the first press so the pig floats still on the tap to start screen.
+        self.pig_thrust = None
+        # False once the pig is popped at the end of a game
+        self.pig_alive = True
+        # balloonSpeed tells the balloons how many pixels it should move per step
+        self.balloon_speed = 5
+        # how far the balloons scrolled left since the world was made
+        self.balloon_scroll = 0
+        # how far they had scrolled before the last step
+        self.previous_balloon_scroll = 0
+        # every balloon on screen
+        self.balloons = BalloonField(64)
+        # the amount of pixels balloons are vertically spaced apart
+        self.balloon_incline = 0
+        # balloons travel toward a y destination set by the balloon spawner. Once a balloon reaches the y destination
+        # a new random destination is selected. This creates a wave of balloons always heading to a destination.
+        # Tells the balloon spawner if the balloon should head "down", "up", or "initialize" the spawner with a
+        # starting direction
+        self.balloon_spawn_heading = "initialize"
+        # the y coordinate the wave of balloons move to
+        self.balloon_y_destination = 0
+        # keeps record of the y position of the last balloon spawned. Starts in the middle of the screen.
+        self.balloon_y_spawn = height / 2
+        # distance since the last balloon spawned. Allows for spacing between balloon spawns.
+        self.dist_since_last_spawn = 0
+        # tells the step if it should ask the balloon spawner for balloons
+        self.spawner_running = False
+        # pops the player accumulates during gameplay by colliding the pig with the balloons
+        self.pop_count = 0
+        # best pop count ever achieved in a single game. Set by whoever saves the scores.
+        self.best_pop_count = 0
+        # amount of balloons missed during gameplay. Raised by balloons moving off the left side of the screen.
+        self.miss_count = 0
+        # number of misses allowed. Once misses reaches this allowance the game ends.
+        self.misses_allowed = 10
+        # every 50 pops, 10 more misses are allowed. True once the lives for the current 50 pops were added.
+        self.added_lives = False
+        # "menu" on the title screen, "inGame" while playing, and "endGame" once a game was lost
+        self.game_stage = "menu"
+        # True while the tap to start screen is waiting for a press to start a round
+        self.waiting_for_tap = False
+        # seconds since the game ended. The screen is cleared for the next round 0.5 seconds after the game ends.
+        self.time_since_game_over = 0
+        # how many steps the world has run. Things that only decorate the screen, like the clouds, move with it.
+        self.steps = 0
+        # the step the current round started on, and the balloon speed and seconds the last round ended with
+        self.round_start_step = 0
+        self.final_speed = 0
+        self.round_duration = 0
+        # True if the screen was pressed during the last step
+        self.was_pressed = False
+        # what happened during the last step, in order, as the events of game_events.py
+        self.events = []
+
+    # leaves the title screen and waits for a press to start the first round
+    def show_tap_to_start(self):
+        self.waiting_for_tap = True
+
+    # starts a round. seed makes the round repeatable; without one the next seed is drawn from the world's random (so
+    # a seeded world plays the same rounds every time) and kept in self.seed.
+    def start_round(self, seed=None):
+        if seed is None:
+            seed = self.random.randrange(2 ** 32)
+        self.seed = seed
+        self.random.seed(seed)
+        # the step the round started on, so the length of the round is known when it ends
+        self.round_start_step = self.steps
+        # reset the balloons to move 5px per step. This portion -> (balloonWidth / 48.467) <- equals 1 in the testing
+        # environment and changes proportional to the size of the screen. This lets the game play the same on
+        # numerous devices.
+        self.balloon_speed = 5 * (self.balloon_width / 48.467)
+        # reset the counters
+        self.pop_count = 0
+        self.miss_count = 0
+        self.misses_allowed = 10
+        self.added_lives = False
+        self.dist_since_last_spawn = 0
+        # allow for the destination to be randomly chosen when the game starts
+        self.balloon_spawn_heading = "initialize"
+        # start spawning
+        self.spawner_running = True
+        self.game_stage = "inGame"
+        self.waiting_for_tap = False
+        self.events.append(RoundStarted())
+
+    # advances the world by one STEP. input_pressed is True while the screen is pressed. Always runs in the same order:
+    # the input, the pig, the balloon spawner, the balloons, and the bonus lives. The bonus lives can only change when
+    # a balloon was popped, so they are only checked then.
+    def step(self, input_pressed):
+        self.events = []
+        # remember where things were before the step so they can be drawn between the two steps
+        self.previous_pig_y = self.pig_y
+        self.previous_balloon_scroll = self.balloon_scroll
+        self.handle_input(input_pressed)
+        if self.pig_alive:
+            self.move_pig()
+        if self.spawner_running:
+            self.ask_balloon_spawner()
+        if self.move_balloons():
+            self.check_bonus_lives()
+        self.steps += 1
+        return self.events
+
+    # a press starts the round on the tap to start screen and makes the pig accelerate up. Letting go makes the pig
+    # accelerate down.
+    def handle_input(self, input_pressed):
+        pressed_now = input_pressed and not self.was_pressed
+        released_now = self.was_pressed and not input_pressed
+        self.was_pressed = input_pressed
+        # presses on the title screen are for the menu, not the game
+        if self.game_stage == "menu" and not self.waiting_for_tap:
+            return
+        if pressed_now and self.waiting_for_tap:
+            self.start_round()
+        # the pig can only be steered while the game is not over
+        if math.floor(self.balloon_speed) != 0:
+            if pressed_now:
+                self.pig_thrust = "up"
+            elif released_now:
+                self.pig_thrust = "down"
+
+    # moves the pig the way it is accelerating
+    def move_pig(self):
+        # the pig floats still until the first press of the round
+        if self.pig_thrust is None:
+            return
+        # if balloonSpeed is 0. (flooring balloonSpeed is required because extra steps could be run making
+        # balloonSpeed actually 0.002ish.
+        if math.floor(self.balloon_speed) == 0:
+            # game must be over. Destroy the pig.
+            self.pig_alive = False
+            self.pig_thrust = None
+            return
+        # Two things impact pig's ability to accelerate: balloonSpeed and screenSize. The first part adds or subtracts
+        # 0.262 at the starting game speed of 5. As the game speeds up, the ability for the pig to accelerate
+        # increases proportionally, allowing for the same game to be played a faster speed. The second part acts as
+        # a cap to how fast the pig can accelerate, otherwise the pig will shoot to the moon or the center of the
+        # earth.
+        if self.pig_thrust == "up":
+            self.pig_velocity = min(self.pig_velocity + (self.balloon_speed / 5) * 0.262,
+                                    (self.balloon_speed / 5) * 10)
+        else:
+            self.pig_velocity = max(self.pig_velocity - (self.balloon_speed / 5) * 0.262,
+                                    (self.balloon_speed / 5) * -10)
+        # now that the new velocity is calculated, add the velocity to y. Velocity can be positive or negative
+        # depending on how far one way the pig was moving.
+        self.pig_y += self.pig_velocity
+
+    # checks if a balloon should be spawned and if the game is over
+    def ask_balloon_spawner(self):
+        # did the player lose by getting too many misses or flying off the screen?
+        if (self.miss_count >= self.misses_allowed) or (self.pig_y < -self.pig_height) or \
+                (self.pig_y > self.height + self.pig_height):
+            # stop spawning and end the game
+            self.spawner_running = False
+            self.end_game()
+        # if the space between the last balloon spawned is greater than 120% of a balloons width
+        if self.dist_since_last_spawn >= self.balloon_width * 1.2 and self.game_stage == "inGame":
+            # then spawn a balloon
+            self.spawn_balloon()
+            # reset the distance since last spawning a balloon back to 0
+            self.dist_since_last_spawn = 0
+        else:
+            # add the distance the balloons moved this step to the distance since a balloon was last spawned
+            self.dist_since_last_spawn += self.balloon_speed
+
+    # spawns a balloon off the right side of the screen at the next height of the wave of balloons
+    def spawn_balloon(self):
+        # check if the balloons surpassed their destination or do not have a target
+        if self.balloon_spawn_heading == "initialize":
+            # not yet defined a direction where their destination is so get a new destination
+            self.get_new_destination()
+        elif (self.balloon_spawn_heading == "up") and (self.balloon_y_spawn > self.balloon_y_destination):
+            # balloon surpassed destination going up so get a new destination
+            self.get_new_destination()
+        elif (self.balloon_spawn_heading == "down") and (self.balloon_y_spawn < self.balloon_y_destination):
+            # balloon surpassed destination going down so get a new target
+            self.get_new_destination()
+        else:
+            # balloon did not surpass a destination so move the balloon Y toward the destination
+            self.move_y_toward_destination()
+        # add the balloon to the field off the right side of the screen. It is 1 of 4 colors (0-3).
+        slot, moved = self.balloons.spawn(self.width, self.balloon_y_spawn, self.balloon_width, self.balloon_height,
+                                          self.random.randint(0, 3))
+        self.events.append(BalloonSpawned(slot, moved))
+
+    # method called when a balloon surpasses its destination or the destination needs initialized
+    def get_new_destination(self):
+        # to get to the next destination how steep should the balloons climb? They can climb from a random number
+        # between 20-80% of the balloon's height
+        self.balloon_incline = self.random.randint(int(self.balloon_height / 5), int(self.balloon_height * 0.8))
+        # sets a new balloon destination
+        self.balloon_y_destination = self.random.randint(math.floor(self.height * 0.2), math.floor(self.height * 0.7))
+        # if the destination is greater than where the balloons are currently spawning, spawn down
+        if self.balloon_y_spawn > self.balloon_y_destination:
+            # balloon is higher than the destination, start spawning down
+            self.balloon_spawn_heading = "down"
+        else:
+            # balloon is lower than the destination, start spawning up
+            self.balloon_spawn_heading = "up"
+
+    # method called when the balloon has not reached its destination yet
+    def move_y_toward_destination(self):
+        # if the balloons are moving up to the destination
+        if self.balloon_spawn_heading == "up":
+            # increase in y position
+            self.balloon_y_spawn += self.balloon_incline
+        # balloons are moving down toward the destination
+        else:
+            # move down in y position
+            self.balloon_y_spawn -= self.balloon_incline
+
+    # moves every balloon, then pops the balloons touching the pig and misses the balloons that flew off the left
+    # side of the screen. Returns how many balloons were popped.
+    def move_balloons(self):
+        field = self.balloons
+        # is the game over?
+        if math.floor(self.balloon_speed) == 0:
+            # count the time since the game ended
+            self.time_since_game_over += STEP
+            # 0.5 seconds after the game ended clear the screen and get ready for the next round
+            if self.time_since_game_over >= 0.5 and self.game_stage == "endGame" and not self.waiting_for_tap:
+                self.clear_balloons()
+                self.build_end_game_menu()
+            return 0
+        # move every balloon and check every balloon against the pig in one go
+        popped, missed = field.step(self.balloon_speed, self.pig_x, self.pig_y, self.pig_width, self.pig_height)
+        self.balloon_scroll += self.balloon_speed
+        # every balloon that flew off the screen was missed
+        for slot in missed:
+            self.miss_count += 1
+            self.events.append(BalloonMissed(slot))
+        # every balloon touching the pig was popped
+        for slot in popped:
+            # speed up the game. Multiplying by balloonWidth ensures the game accelerates proportionally to device
+            # size
+            self.balloon_speed += self.balloon_width * .00025
+            self.pop_count += 1
+            self.events.append(BalloonPopped(slot, float(field.x[slot]), float(field.y[slot]), float(field.width[slot]),
+                                             float(field.height[slot])))
+        return len(popped)
+
+    # removes every balloon without a pop
+    def clear_balloons(self):
+        self.balloons.clear()
+        self.events.append(BalloonsCleared())
+
+    # gain 10 misses allowed every 50 pops
+    def check_bonus_lives(self):
+        if self.pop_count % 50 == 0 and self.pop_count != 0 and not self.added_lives:
+            # prevent extra lives from adding again until another balloon is popped
+            self.added_lives = True
+            # add lives
+            self.misses_allowed += 10
+            self.events.append(BonusLives())
+        # if lives were added and the pop count no longer is a multiple of 50
+        if self.pop_count % 50 != 0 and self.added_lives:
+            # change added lives back to False
+            self.added_lives = False
+
+    # the text of the pop count, misses, and best labels. The best label only follows the pop count once the pop count
+    # beats the best score (a tie isn't a new best, see end_game), so its text is None otherwise.
+    def hud_text(self):
+        best_text = None
+        if self.game_stage == "inGame" and self.pop_count > self.best_pop_count:
+            best_text = "Best:" + str(self.pop_count)
+        return str(self.pop_count), str(self.miss_count) + "/" + str(self.misses_allowed), best_text
+
+    # the game was lost by the pig flying off the screen or getting too many misses
+    def end_game(self):
+        # keep how fast the balloons were going and how long the round lasted for the score history
+        self.final_speed = self.balloon_speed
+        self.round_duration = (self.steps - self.round_start_step) * STEP
+        # stop the balloons from moving (this also tells the rest of the game the player lost)
+        self.balloon_speed = 0
+        # change the game stage to end game
+        self.game_stage = "endGame"
+        self.time_since_game_over = 0
+        # if the user got a new high score update the high score to the pop count
+        new_best = self.pop_count > self.best_pop_count
+        if new_best:
+            self.best_pop_count = self.pop_count
+        self.events.append(GameOver(new_best))
+
+    # puts a new pig in the middle of the screen and waits for a press to start the next round
+    def build_end_game_menu(self):
+        self.pig_y = self.height / 2
+        # the new pig appears in the middle instead of sliding there from where the last pig was
+        self.previous_pig_y = self.pig_y
+        self.pig_velocity = 0
+        self.pig_thrust = None
+        self.pig_alive = True
+        self.waiting_for_tap = True
+        self.events.append(RoundReady())